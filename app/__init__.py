@@ -19,8 +19,10 @@ def register_extensions(app):
     migrate.init_app(app, db)
     csrf.init_app(app)
     cache.init_app(app, config={
-        'CACHE_TYPE': 'simple',
-        'CACHE_DEFAULT_TIMEOUT': 300
+        'CACHE_TYPE': app.config['CACHE_TYPE'],
+        'CACHE_DEFAULT_TIMEOUT': 300,
+        'CACHE_REDIS_URL': app.config.get('CACHE_REDIS_URL'),
+        'CACHE_KEY_PREFIX': app.config.get('CACHE_KEY_PREFIX')
     })
 
     # Add database verification after extensions are initialized
@@ -144,9 +146,21 @@ def register_shell_context(app):
         return {'db': db, 'User': User}
 
 def setup_user_score_listeners():
+    from .utils.job_queue import enqueue, jobs_enabled
+
     def update_user_score(mapper, connection, target):
         if target.author:
             user_id = target.author.id
+            if jobs_enabled():
+                # Queued in the comment's transaction, so it only runs if the
+                # change commits; repeated votes collapse into one queued job
+                enqueue(
+                    'reconcile_user_score',
+                    {'user_id': user_id},
+                    dedupe_key=f"user_score:{user_id}",
+                    connection=connection
+                )
+                return
             with Session(connection) as session:
                 score = (
                     session.execute(
@@ -170,12 +184,47 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    from .utils.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
     setup_logging(app)  # Move logging setup before extensions
+
+    # Size the connection pool before the engine is created
+    from .utils.db_pool import init_app as init_db_pool
+    init_db_pool(app)
+
     register_extensions(app)  # Database verification happens here
     register_blueprints(app)
+
+    # Replica routing for reads, with read-your-writes stickiness
+    from .utils.db_routing import init_app as init_db_routing
+    init_db_routing(app)
+
+    # Notice catalogue syncs applied by the CLI or another worker
+    from .utils.catalogue_sync import init_app as init_catalogue_sync
+    init_catalogue_sync(app)
+
+    # statement_timeout budgets per request class
+    from .utils.query_budget import init_app as init_query_budget
+    init_query_budget(app)
+
+    # Importing the module registers the background jobs so they can be
+    # queued by name; nothing else in the factory uses it
+    from . import tasks  # noqa: F401
+
     register_error_handlers(app)
     register_shell_context(app)
     setup_user_score_listeners()
+
+    # Template fragment caching helpers
+    from .utils.fragment_cache import init_app as init_fragment_cache
+    init_fragment_cache(app)
+
+    # Response compression and fingerprinted static assets
+    from .utils.compression import init_app as init_compression
+    from .utils.assets import init_app as init_assets
+    init_compression(app)
+    init_assets(app)
     
     # Register CLI commands
     from .cli import init_app as init_cli
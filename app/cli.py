@@ -15,6 +15,7 @@ from .utils.extract_normalize import (
     create_course_templates
 )
 from .utils.data_migration_manager import DataMigrationManager
+from .utils.db_routing import use_replica
 from .models.requirement import (
     UTMERequirementTemplate,
     DirectEntryRequirementTemplate,
@@ -415,6 +416,7 @@ def init_app(app):
             
     @app.cli.command('db-analyze-gaps')
     @with_appcontext
+    @use_replica
     def analyze_gaps():
         """Perform detailed analysis of gaps in course IDs"""
         if not wait_for_db_cli():
@@ -592,6 +594,7 @@ def init_app(app):
             
     @app.cli.command('db-gap-report')
     @with_appcontext
+    @use_replica
     def analyze_gap_report():
         """Generate comprehensive gap analysis report"""
         if not wait_for_db_cli():
@@ -688,6 +691,7 @@ def init_app(app):
             
     @app.cli.command('db-analyze-education')
     @with_appcontext
+    @use_replica
     def analyze_education_patterns():
         """Analyze patterns specific to colleges of education"""
         if not wait_for_db_cli():
@@ -1475,4 +1479,255 @@ def init_app(app):
             db.session.rollback()
             raise
         finally:
-            db.session.close()
\ No newline at end of file
+            db.session.close()
+    @app.cli.command('db-catalogue-export')
+    @click.argument('output_path')
+    @with_appcontext
+    def catalogue_export(output_path):
+        """Export the live catalogue as a sync snapshot"""
+        if not wait_for_db_cli():
+            click.echo("Could not establish database connection")
+            return
+
+        try:
+            from .utils.catalogue_sync import export_catalogue
+            snapshot = export_catalogue()
+            with open(output_path, 'w') as f:
+                json.dump(snapshot, f, indent=2, default=str)
+            click.echo(
+                f"Exported {len(snapshot['institutions'])} institutions, "
+                f"{len(snapshot['courses'])} courses and "
+                f"{len(snapshot['requirements'])} requirements to {output_path}"
+            )
+        except Exception as e:
+            click.echo(f"Error exporting catalogue: {str(e)}")
+            raise
+        finally:
+            db.session.close()
+
+    @app.cli.command('db-catalogue-sync')
+    @click.argument('snapshot_path')
+    @click.option('--dry-run', is_flag=True, help='Only report the delta, do not apply it')
+    @with_appcontext
+    def catalogue_sync(snapshot_path, dry_run):
+        """Apply a catalogue snapshot as an incremental diff"""
+        if not wait_for_db_cli():
+            click.echo("Could not establish database connection")
+            return
+
+        try:
+            from .utils.catalogue_sync import sync_catalogue
+            with open(snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+
+            changes = sync_catalogue(snapshot, dry_run=dry_run)
+
+            click.echo(f"\nCatalogue {'plan' if dry_run else 'sync'}:")
+            for entity, summary in changes.get_summary().items():
+                click.echo(
+                    f"{entity.title()}: {summary['inserts']} inserts, "
+                    f"{summary['updates']} updates, {summary['deletes']} deletes"
+                )
+            click.echo(f"Unchanged requirements: {changes.unchanged_requirements}")
+            if changes.is_empty:
+                click.echo("Catalogue already up to date")
+            elif not dry_run:
+                click.echo(f"New catalogue version: {changes.version}")
+        except Exception as e:
+            click.echo(f"Error syncing catalogue: {str(e)}")
+            db.session.rollback()
+            raise
+        finally:
+            db.session.close()
+
+    @app.cli.command('db-recount-courses')
+    @with_appcontext
+    def recount_courses():
+        """Recompute the denormalised university course counts"""
+        if not wait_for_db_cli():
+            click.echo("Could not establish database connection")
+            return
+
+        try:
+            from .utils.db_ops import recompute_course_counts
+            corrected = recompute_course_counts()
+            if corrected:
+                click.echo(f"Corrected course counts for {corrected} universities")
+            else:
+                click.echo("All course counts already match course_requirement")
+        except Exception as e:
+            click.echo(f"Error recomputing course counts: {str(e)}")
+            raise
+        finally:
+            db.session.close()
+
+    @app.cli.command('assets-precompress')
+    @with_appcontext
+    def assets_precompress():
+        """Write gzip/brotli variants of the static assets"""
+        from .utils.assets import precompress_static
+        from .utils.compression import brotli
+
+        results = precompress_static(app.static_folder)
+        original = sum(r[1] for r in results)
+        gzipped = sum(r[2] or r[1] for r in results)
+        click.echo(f"Precompressed {len(results)} assets")
+        click.echo(f"Original: {original:,} bytes")
+        click.echo(f"Gzip: {gzipped:,} bytes ({100 - gzipped * 100 / max(original, 1):.1f}% saved)")
+        if brotli is None:
+            click.echo("Brotli not installed; skipped .br variants")
+        else:
+            brotlied = sum(r[3] or r[1] for r in results)
+            click.echo(f"Brotli: {brotlied:,} bytes ({100 - brotlied * 100 / max(original, 1):.1f}% saved)")
+
+    @app.cli.command('db-snapshot-stats')
+    @with_appcontext
+    def snapshot_stats():
+        """Build the catalogue snapshot and report its memory footprint"""
+        if not wait_for_db_cli():
+            click.echo("Could not establish database connection")
+            return
+
+        try:
+            import resource
+            from .utils.snapshot import build_catalogue_snapshot
+
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            snapshot = build_catalogue_snapshot()
+            rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            usage = snapshot.memory_usage()
+
+            click.echo(f"\nCatalogue snapshot (version {snapshot.version}):")
+            click.echo(f"Universities: {snapshot.university_total}")
+            click.echo(f"Courses: {snapshot.course_total}")
+            click.echo(f"Requirements: {snapshot.requirement_total}")
+            click.echo(f"Array columns: {usage['arrays'] / 1024:.1f} KiB")
+            click.echo(f"Interned strings: {usage['strings'] / 1024:.1f} KiB")
+            click.echo(f"Total: {usage['total'] / 1024:.1f} KiB")
+            click.echo(f"Peak RSS growth while building: {(rss_after - rss_before) / 1024:.1f} MiB")
+
+            click.echo("\nLargest columns:")
+            for name, array in sorted(snapshot.arrays.items(), key=lambda item: -item[1].nbytes)[:5]:
+                click.echo(f"- {name}: {array.nbytes / 1024:.1f} KiB ({array.dtype}, {len(array)} rows)")
+        except Exception as e:
+            click.echo(f"Error building catalogue snapshot: {str(e)}")
+            raise
+        finally:
+            db.session.close()
+
+    @app.cli.command('db-pool-status')
+    @with_appcontext
+    def pool_status_command():
+        """Show the derived pool sizing and server-side connection usage"""
+        if not wait_for_db_cli():
+            click.echo("Could not establish database connection")
+            return
+
+        try:
+            plan = app.extensions['db_pool_plan']
+            click.echo("\nPool plan:")
+            click.echo(f"Mode: {plan['mode']}")
+            click.echo(f"Workers: {plan['workers']} x {plan['concurrency']} concurrent requests")
+            click.echo(f"Page-data threads: {plan['page_data_threads']} per worker")
+            if plan['mode'] == 'pgbouncer':
+                click.echo("Per worker: no in-process pool (external pooler)")
+            else:
+                per_worker = plan['pool_size'] + plan['max_overflow']
+                click.echo(f"Per worker: {plan['pool_size']} + {plan['max_overflow']} overflow")
+                click.echo(f"Worst case total: {per_worker * plan['workers']} connections")
+            if plan['budget']:
+                click.echo(f"Budget (DB_MAX_CONNECTIONS): {plan['budget']}{' - clamped' if plan['clamped'] else ''}")
+
+            max_connections = db.session.execute(text("SHOW max_connections")).scalar()
+            rows = db.session.execute(text("""
+                SELECT COALESCE(state, 'unknown') AS state, COUNT(*)
+                FROM pg_stat_activity
+                WHERE datname = current_database()
+                GROUP BY 1
+                ORDER BY 2 DESC
+            """)).all()
+            click.echo(f"\nServer connections (max_connections = {max_connections}):")
+            for state, count in rows:
+                click.echo(f"- {state}: {count}")
+        except Exception as e:
+            click.echo(f"Error reading pool status: {str(e)}")
+            raise
+        finally:
+            db.session.close()
+
+    @app.cli.command('cache-warm')
+    @click.option('--top', 'top_n', type=int, default=None, help='Number of logged requests to warm')
+    @with_appcontext
+    def cache_warm_command(top_n):
+        """Recompute the most requested cached results now"""
+        if not wait_for_db_cli():
+            click.echo("Could not establish database connection")
+            return
+
+        try:
+            from .utils.cache_warm import cache_warmer
+            result = cache_warmer.warm(top_n or app.config['CACHE_WARM_TOP_N'])
+            for kind, count in sorted(result['warmed'].items()):
+                click.echo(f"- {kind}: {count}")
+            click.echo(f"Warmed {sum(result['warmed'].values())} entries in {result['seconds']}s ({result['failed']} failed)")
+        except Exception as e:
+            click.echo(f"Error warming caches: {str(e)}")
+            raise
+        finally:
+            db.session.close()
+
+    @app.cli.command('jobs-worker')
+    @click.option('--burst', is_flag=True, help='Exit once no jobs are due')
+    @with_appcontext
+    def jobs_worker(burst):
+        """Run background jobs from the queue until stopped"""
+        if not wait_for_db_cli():
+            click.echo("Could not establish database connection")
+            return
+
+        from .utils.job_queue import JobWorker
+        stats = JobWorker(app).run(burst=burst)
+        click.echo(f"Worker stopped: {stats['succeeded']} succeeded, {stats['retried']} retried, {stats['failed']} failed")
+
+    @app.cli.command('jobs-enqueue')
+    @click.argument('name')
+    @click.option('--args', 'args_json', default='{}', help='Job keyword arguments as JSON')
+    @click.option('--delay', type=float, default=0, help='Seconds to wait before running')
+    @with_appcontext
+    def jobs_enqueue(name, args_json, delay):
+        """Queue a background job by name"""
+        if not wait_for_db_cli():
+            click.echo("Could not establish database connection")
+            return
+
+        try:
+            from .utils.job_queue import enqueue
+            job_id = enqueue(name, json.loads(args_json), delay=delay)
+            click.echo(f"Queued {name} as job {job_id}")
+        except Exception as e:
+            click.echo(f"Error queueing job: {str(e)}")
+            raise
+
+    @app.cli.command('jobs-status')
+    @with_appcontext
+    def jobs_status():
+        """Show queue depth, lag and recent outcomes per job"""
+        if not wait_for_db_cli():
+            click.echo("Could not establish database connection")
+            return
+
+        try:
+            from .utils.job_queue import queue_stats
+            stats = queue_stats()
+            click.echo(f"{'Job':24} {'queued':>7} {'due':>5} {'running':>8} {'done 24h':>9} {'failed 24h':>11} {'avg ms':>9} {'lag s':>7}")
+            for name, row in stats['jobs'].items():
+                avg = f"{row['avg_ms']:.0f}" if row['avg_ms'] is not None else '-'
+                click.echo(
+                    f"{name:24} {row['queued']:>7} {row['due']:>5} {row['running']:>8} "
+                    f"{row['done_24h']:>9} {row['failed_24h']:>11} {avg:>9} {row['lag_seconds']:>7}"
+                )
+        except Exception as e:
+            click.echo(f"Error reading job status: {str(e)}")
+            raise
+        finally:
+            db.session.close()
@@ -6,6 +6,16 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+POSTGRES_SCHEMES = ('postgresql://', 'postgresql+psycopg2://', 'postgresql+psycopg://')
+
+
+def with_db_driver(uri, driver):
+    """Point a Postgres URI at the configured DBAPI driver"""
+    if not uri or not uri.startswith(POSTGRES_SCHEMES):
+        return uri
+    return f"postgresql+{driver}://{uri.split('://', 1)[1]}"
+
+
 class Config:
     # -------------------------------
     # Logging Configuration
@@ -38,7 +48,13 @@ class Config:
     if not SQLALCHEMY_DATABASE_URI:
         logging.error("Database URI not found in environment variables!")
         raise ValueError("Database URI must be set in environment variables")
-    
+
+    # DBAPI driver: 'psycopg2' (default) or 'psycopg' for psycopg 3, which
+    # adds pipeline mode for independent queries and binary result transfer
+    DB_DRIVER = os.getenv('DB_DRIVER', 'psycopg2')
+    SQLALCHEMY_DATABASE_URI = with_db_driver(SQLALCHEMY_DATABASE_URI, DB_DRIVER)
+    DB_PIPELINE = os.getenv('DB_PIPELINE', 'true').lower() in ['true', '1', 't']
+    DB_BINARY_PROTOCOL = os.getenv('DB_BINARY_PROTOCOL', 'true').lower() in ['true', '1', 't']
 
     # -------------------------------
     # SQLAlchemy Configuration
@@ -46,20 +62,128 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False  # Disable SQL echo by default
     
-    # Configure connection pool
+    # Configure connection pool; pool_size/max_overflow (or the external
+    # pooler setup) are filled in by app.utils.db_pool from the settings below
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_size': 10,
-        'max_overflow': 20,
         'pool_timeout': 30,
         'pool_recycle': 1800,
         'pool_pre_ping': True,
         'connect_args': {
             'connect_timeout': 10,
+            'keepalives': 1,
+            'keepalives_idle': 30,
+            'keepalives_interval': 10,
+            'keepalives_count': 5,
             # Only require SSL for production database
             'sslmode': 'require' if 'render.com' in os.getenv('SQLALCHEMY_DATABASE_URI', '') else 'disable'
         }
     }
 
+    # Optional streaming replica; GET requests and analysis commands read
+    # from it, writes and anything read-your-writes stays on the primary
+    SQLALCHEMY_REPLICA_URI = with_db_driver(os.getenv('SQLALCHEMY_REPLICA_URI'), DB_DRIVER)
+    SQLALCHEMY_BINDS = {'replica': SQLALCHEMY_REPLICA_URI} if SQLALCHEMY_REPLICA_URI else {}
+    DB_READ_YOUR_WRITES_SECONDS = float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5))
+
+    # statement_timeout per request class; views opt in with
+    # @query_budget, the admin blueprint is 'admin' and the rest 'default'
+    QUERY_BUDGETS_MS = {
+        'autocomplete': int(os.getenv('QUERY_BUDGET_AUTOCOMPLETE_MS', 200)),
+        'search': int(os.getenv('QUERY_BUDGET_SEARCH_MS', 1000)),
+        'admin': int(os.getenv('QUERY_BUDGET_ADMIN_MS', 30000)),
+        'default': int(os.getenv('QUERY_BUDGET_DEFAULT_MS', 10000)),
+    }
+
+    # Run the hot search statements as server-side prepared statements
+    # (psycopg2 with the internal pool only)
+    DB_PREPARE_HOT_QUERIES = os.getenv('DB_PREPARE_HOT_QUERIES', 'true').lower() in ['true', '1', 't']
+
+    # How views load independent queries: 'auto' pipelines on psycopg 3 and
+    # otherwise uses a thread pool; 'threads', 'pipeline' or 'sequential'
+    # force one. The thread pool gets PAGE_DATA_MAX_QUERIES threads per
+    # concurrent request, each with its own pooled connection (see plan_pool).
+    PAGE_DATA_STRATEGY = os.getenv('PAGE_DATA_STRATEGY', 'auto')
+    PAGE_DATA_MAX_QUERIES = int(os.getenv('PAGE_DATA_MAX_QUERIES', 3))  # queries on the busiest page
+
+    # -------------------------------
+    # Connection Pool Sizing
+    # -------------------------------
+    # Worker model, shared with gunicorn.conf.py
+    GUNICORN_WORKERS = int(os.getenv('WEB_CONCURRENCY', 3))
+    GUNICORN_WORKER_CLASS = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 1))
+    GUNICORN_WORKER_CONNECTIONS = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+    # 'internal' pools in each worker; 'pgbouncer' leaves pooling to an
+    # external pooler running in transaction mode
+    DB_POOL_MODE = os.getenv('DB_POOL_MODE', 'internal')
+    DB_POOL_SIZE = os.getenv('DB_POOL_SIZE')  # default: one per concurrent request
+    DB_ASYNC_POOL_SIZE = int(os.getenv('DB_ASYNC_POOL_SIZE', 10))  # default pool for gevent/eventlet workers
+    DB_MAX_OVERFLOW = os.getenv('DB_MAX_OVERFLOW')  # default: 2
+    DB_MAX_CONNECTIONS = os.getenv('DB_MAX_CONNECTIONS')  # server connection budget for all workers
+    DB_POOL_SLOW_CHECKOUT_MS = float(os.getenv('DB_POOL_SLOW_CHECKOUT_MS', 100))
+
+    # -------------------------------
+    # Catalogue Version Configuration
+    # -------------------------------
+    # Seconds a process trusts its copy of the shared catalogue version;
+    # syncs from other processes are picked up within this window
+    CATALOGUE_VERSION_TTL = float(os.getenv('CATALOGUE_VERSION_TTL', 2))
+
+    # -------------------------------
+    # Catalogue Snapshot Configuration
+    # -------------------------------
+    # Directory for published, memory-mapped snapshots shared by all workers;
+    # set to an empty value to keep a private in-process snapshot per worker
+    CATALOGUE_SNAPSHOT_DIR = os.getenv(
+        'CATALOGUE_SNAPSHOT_DIR',
+        os.path.join(INSTANCE_PATH, 'catalogue_snapshot')
+    ) or None
+    CATALOGUE_SNAPSHOT_CHECK_INTERVAL = float(os.getenv('CATALOGUE_SNAPSHOT_CHECK_INTERVAL', 5))  # seconds
+
+    # -------------------------------
+    # Cache Configuration
+    # -------------------------------
+    # 'simple' is per process; a shared backend such as 'RedisCache' lets
+    # workers share cached searches and coalesce identical ones
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'simple')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'ibass:')
+    # Recompute the most requested searches, recommendation pages and
+    # institution details after a deploy or catalogue sync
+    CACHE_WARM_ENABLED = os.getenv('CACHE_WARM_ENABLED', 'True').lower() in ['true', '1', 't']
+    CACHE_WARM_TOP_N = int(os.getenv('CACHE_WARM_TOP_N', 50))
+    CACHE_WARM_COOLDOWN = int(os.getenv('CACHE_WARM_COOLDOWN', 600))  # seconds
+
+    # -------------------------------
+    # Background Jobs Configuration
+    # -------------------------------
+    # With JOBS_ENABLED, emails, score reconciliation and cache warming are
+    # queued for `flask jobs-worker` instead of running in request threads
+    JOBS_ENABLED = os.getenv('JOBS_ENABLED', 'False').lower() in ['true', '1', 't']
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1.0))  # seconds
+    JOB_HEARTBEAT_INTERVAL = float(os.getenv('JOB_HEARTBEAT_INTERVAL', 30))  # seconds
+    JOB_LOCK_TIMEOUT = int(os.getenv('JOB_LOCK_TIMEOUT', 300))  # seconds without a heartbeat before a job is presumed lost
+    JOB_RETRY_BASE_SECONDS = int(os.getenv('JOB_RETRY_BASE_SECONDS', 30))
+    JOB_RETRY_MAX_SECONDS = int(os.getenv('JOB_RETRY_MAX_SECONDS', 3600))
+    JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', 7))
+    # Seconds between runs of each periodic job; 0 turns one off
+    JOB_SCHEDULE = {
+        'refresh_course_view': int(os.getenv('JOB_SCHEDULE_REFRESH_COURSE_VIEW', 3600)),
+        'refresh_search_vectors': int(os.getenv('JOB_SCHEDULE_REFRESH_SEARCH_VECTORS', 3600)),
+        'recount_courses': int(os.getenv('JOB_SCHEDULE_RECOUNT_COURSES', 86400)),
+        'reconcile_user_scores': int(os.getenv('JOB_SCHEDULE_RECONCILE_USER_SCORES', 86400)),
+        'purge_jobs': int(os.getenv('JOB_SCHEDULE_PURGE_JOBS', 86400)),
+    }
+
+    # -------------------------------
+    # Response Compression Configuration
+    # -------------------------------
+    # JSON, scripts and stylesheets only; HTML pages carry CSRF tokens and
+    # are not compressed (BREACH)
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+
     # -------------------------------
     # Mail Configuration
     # -------------------------------
@@ -70,6 +194,17 @@ class Config:
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER')
+    # Delivery: a bounded per-process queue drained in batches over pooled
+    # SMTP sessions (see app/utils/mail_pool.py)
+    MAIL_QUEUE_SIZE = int(os.getenv('MAIL_QUEUE_SIZE', 1000))
+    MAIL_SENDER_THREADS = int(os.getenv('MAIL_SENDER_THREADS', 2))
+    MAIL_POOL_SIZE = int(os.getenv('MAIL_POOL_SIZE', 2))
+    MAIL_POOL_IDLE_SECONDS = int(os.getenv('MAIL_POOL_IDLE_SECONDS', 60))
+    MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', 20))
+    MAIL_MAX_EMAILS = int(os.getenv('MAIL_MAX_EMAILS', 100)) or None  # messages per SMTP session
+    MAIL_TIMEOUT = float(os.getenv('MAIL_TIMEOUT', 10))  # seconds
+    MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS', 3))
+    MAIL_RETRY_BACKOFF = float(os.getenv('MAIL_RETRY_BACKOFF', 0.5))  # seconds, doubled per attempt
 
     if not all([MAIL_USERNAME, MAIL_PASSWORD, MAIL_DEFAULT_SENDER]):
         logging.warning("Mail configuration incomplete. Email features may not work.")
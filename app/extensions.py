@@ -1,12 +1,76 @@
 # app/extensions.py
+from contextvars import ContextVar
+import re
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_login import LoginManager
 from flask_mail import Mail
 from flask_migrate import Migrate
 from flask_wtf import CSRFProtect
 from flask_caching import Cache
+from sqlalchemy import event
 
-db = SQLAlchemy()
+REPLICA_BIND = 'replica'
+
+# Set per request or command by app.utils.db_routing; 'replica' lets reads
+# go to the replica bind when one is configured
+db_route = ContextVar('db_route', default='primary')
+
+# text() statements report is_dml as False, so their verb decides. Anything
+# that is not plainly a read, or that locks rows or bumps a sequence, is a write.
+_READ_SQL = re.compile(r'^\s*(select|with|show|explain|values|table)\b', re.IGNORECASE)
+_WRITE_SQL = re.compile(
+    r'\b(insert|update|delete|merge|truncate|nextval|setval|for\s+(key\s+)?share)\b', re.IGNORECASE
+)
+
+
+def statement_writes(clause) -> bool:
+    """Whether executing a statement changes data or takes row locks"""
+    if clause is None:
+        return False
+    if getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None:
+        return True
+    sql = getattr(clause, 'text', None)
+    if isinstance(sql, str):
+        return not _READ_SQL.match(sql) or bool(_WRITE_SQL.search(sql))
+    return False
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica bind when the route allows it.
+
+    Flushes, DML (ORM, Core or text()), ``SELECT ... FOR UPDATE`` and
+    everything after the session has written stay on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            engines = self._db.engines
+            if REPLICA_BIND in engines:
+                return engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause) -> bool:
+        if db_route.get() != REPLICA_BIND or self._flushing or self.info.get('wrote'):
+            return False
+        return not statement_writes(clause)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_executed_write(orm_execute_state):
+    # Core update()/delete() and text() DML never flush; mark them before they
+    # run so this and later statements, and the sticky cookie, use the primary
+    if (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+            or statement_writes(orm_execute_state.statement)):
+        orm_execute_state.session.info['wrote'] = True
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 mail = Mail()
 migrate = Migrate()
@@ -1,6 +1,6 @@
 # app/models/__init__.py
 from .user import User
-from .university import University, Course, State, ProgrammeType
+from .university import University, Course, State, ProgrammeType, CatalogueVersion
 from .requirement import (
     CourseRequirement, 
     SubjectRequirement,
@@ -15,6 +15,7 @@ from .requirement import (
 )
 from .interaction import Comment, Vote, Bookmark
 from .feedback import Feedback
+from .job import Job
 from .academic import (
     CertificationHierarchy,
     CatchmentArea,
@@ -35,10 +36,12 @@ __all__ = [
     'Course',
     'State',
     'ProgrammeType',
+    'CatalogueVersion',
     'Comment',
     'Vote',
     'Bookmark',
     'Feedback',
+    'Job',
     'CourseRequirement',
     'SubjectRequirement',
     'InstitutionalVariation',
@@ -162,10 +162,12 @@ class SubjectEquivalency(BaseModel):
     
     @classmethod
     def get_equivalents_for_subject(cls, subject_id):
-        """Get all equivalent subjects for a given subject."""
-        return cls.query.filter_by(primary_subject_id=subject_id)\
-            .options(db.joinedload(cls.equivalent_subject))\
-            .all()
+        """Get all subjects transitively equivalent to a given subject."""
+        from .subject import Subjects
+        subject_ids = cls.get_equivalent_subject_ids(subject_id)
+        if not subject_ids:
+            return []
+        return Subjects.query.filter(Subjects.id.in_(subject_ids)).order_by(Subjects.name).all()
     
     @classmethod
     def get_all_with_subjects(cls):
@@ -177,18 +179,14 @@ class SubjectEquivalency(BaseModel):
             )\
             .all()
     
+    @classmethod
+    def get_equivalent_subject_ids(cls, subject_id):
+        """Get ids of all subjects transitively equivalent to a given subject."""
+        from ..utils.equivalency import equivalency_graph
+        return equivalency_graph.equivalents(subject_id)
+    
     @classmethod
     def check_equivalency(cls, subject_id1, subject_id2):
-        """Check if two subjects are equivalent."""
-        return cls.query.filter(
-            db.or_(
-                db.and_(
-                    cls.primary_subject_id == subject_id1,
-                    cls.equivalent_subject_id == subject_id2
-                ),
-                db.and_(
-                    cls.primary_subject_id == subject_id2,
-                    cls.equivalent_subject_id == subject_id1
-                )
-            )
-        ).first() is not None 
\ No newline at end of file
+        """Check if two subjects are equivalent, including transitive equivalencies."""
+        from ..utils.equivalency import equivalency_graph
+        return equivalency_graph.equivalent(subject_id1, subject_id2) 
\ No newline at end of file
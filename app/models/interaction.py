@@ -45,12 +45,12 @@ class Comment(BaseModel):
     
     @hybrid_property
     def reply_count(self):
-        return len(self.replies.all())
+        return self.replies.count()
     
     @reply_count.expression
     def reply_count(cls):
         return (
-            select([func.count(Comment.id)])
+            select(func.count(Comment.id))
             .where(Comment.parent_id == cls.id)
             .correlate_except(Comment)
             .scalar_subquery()
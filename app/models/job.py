@@ -0,0 +1,43 @@
+# app/models/job.py
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import JSONB
+from ..extensions import db
+
+class Job(db.Model):
+    __tablename__ = 'job'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    args = db.Column(JSONB, nullable=False, default=dict, server_default='{}')
+    status = db.Column(db.String(20), nullable=False, default='queued', server_default='queued')  # queued, running, done, failed
+    priority = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    max_attempts = db.Column(db.Integer, nullable=False, default=5, server_default='5')
+    dedupe_key = db.Column(db.String(200), nullable=True)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # refreshed while a worker runs the job
+    finished_at = db.Column(db.DateTime, nullable=True)
+    locked_by = db.Column(db.String(100), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (
+        # Workers claim due jobs from this index with SKIP LOCKED
+        db.Index(
+            'idx_job_queued',
+            db.text('priority DESC'), 'run_at',
+            postgresql_where=db.text("status = 'queued'")
+        ),
+        # At most one queued job per dedupe key
+        db.Index(
+            'uq_job_dedupe_queued',
+            'dedupe_key',
+            unique=True,
+            postgresql_where=db.text("status = 'queued'")
+        ),
+        db.Index('idx_job_name_finished', 'name', 'finished_at'),
+    )
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.name} {self.status}>'
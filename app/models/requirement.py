@@ -75,27 +75,30 @@ class CourseRequirement(BaseModel):
     __table_args__ = (
         db.Index('idx_course_requirement_composite', 'course_id', 'university_id'),
         db.Index('idx_course_requirement_course_id', 'course_id'),
+        db.Index('idx_course_requirement_university_id', 'university_id'),
         db.Index('idx_course_requirement_template_ids', 'utme_template_id', 'de_template_id'),
         db.UniqueConstraint('course_id', 'university_id', name='uq_course_university')
     )
 
     @property
     def utme_requirements(self):
-        """Get UTME requirements text with error handling."""
+        """Get UTME requirements text through the interned template cache."""
         try:
-            return self.utme_template.requirements if self.utme_template else None
+            from ..utils.template_cache import template_cache
+            return template_cache.utme_text(self.utme_template_id)
         except Exception as e:
             logger.error(f"Error accessing UTME requirements: {str(e)}")
-            return None
+            return self.utme_template.requirements if self.utme_template else None
 
     @property
     def direct_entry_requirements(self):
-        """Get Direct Entry requirements text with error handling."""
+        """Get Direct Entry requirements text through the interned template cache."""
         try:
-            return self.de_template.requirements if self.de_template else None
+            from ..utils.template_cache import template_cache
+            return template_cache.de_text(self.de_template_id)
         except Exception as e:
             logger.error(f"Error accessing DE requirements: {str(e)}")
-            return None
+            return self.de_template.requirements if self.de_template else None
 
     def get_subjects(self):
         """Get subject requirements with error handling."""
@@ -58,6 +58,8 @@ class University(BaseModel):
     established = db.Column(db.Integer)
     abbrv = db.Column(db.String(255))  # Added this column to match database schema
     is_featured = db.Column(db.Boolean, default=False, nullable=False)
+    # Distinct courses offered, maintained by a trigger on course_requirement
+    course_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     search_vector = db.Column(TSVECTOR)
     
     # Update relationships to use back_populates instead of backref
@@ -258,4 +260,11 @@ class Course(BaseModel):
         if programme_type_id:
             base_query = base_query.filter(University.programme_type_id == programme_type_id)
         
-        return base_query.distinct().order_by(cls.course_name)
\ No newline at end of file
+        return base_query.distinct().order_by(cls.course_name)
+
+class CatalogueVersion(db.Model):
+    """Single row holding the catalogue version shared by every process."""
+    __tablename__ = 'catalogue_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False)
@@ -1,11 +1,82 @@
+# app/tasks.py
+from datetime import datetime, timedelta
 from flask import current_app
+from sqlalchemy import text
 from .extensions import db
+from .utils.job_queue import job
 
+# Background jobs, run by `flask jobs-worker`. Queue them with
+# app.utils.job_queue.enqueue, or on a timer through JOB_SCHEDULE.
+
+# For one user, both filters are needed: Postgres cannot push a filter on
+# u.id into the grouped subquery, so it would sum every user's comments
+USER_SCORE_SQL = """
+    UPDATE "user" u
+    SET score = COALESCE(totals.score, 0)
+    FROM "user" target
+    LEFT JOIN (
+        SELECT user_id, SUM(COALESCE(likes, 0) - COALESCE(dislikes, 0)) AS score
+        FROM comment
+        {comment_filter}
+        GROUP BY user_id
+    ) totals ON totals.user_id = target.id
+    WHERE u.id = target.id
+    AND u.score IS DISTINCT FROM COALESCE(totals.score, 0)
+    {user_filter}
+"""
+
+@job('refresh_course_view')
 def refresh_course_view():
     """Refresh the course materialized view"""
-    try:
-        db.session.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY course_university_view")
-        db.session.commit()
-    except Exception as e:
-        current_app.logger.error(f"Error refreshing course view: {str(e)}")
-        db.session.rollback() 
\ No newline at end of file
+    db.session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY course_university_view"))
+    db.session.commit()
+
+@job('refresh_search_vectors')
+def refresh_search_vectors():
+    """Fill in search vectors that are missing after imports or edits"""
+    from .utils.search import repair_search_vectors
+    if not repair_search_vectors():
+        raise RuntimeError("Search vector repair failed")
+
+@job('recount_courses')
+def recount_courses():
+    """Recompute the denormalised university course counts"""
+    from .utils.db_ops import recompute_course_counts
+    recompute_course_counts()
+
+@job('warm_caches', max_attempts=2)
+def warm_caches(top_n=None):
+    """Recompute the most requested cached results"""
+    from .utils.cache_warm import cache_warmer
+    cache_warmer.warm(top_n or current_app.config['CACHE_WARM_TOP_N'])
+
+@job('reconcile_user_score', priority=10)
+def reconcile_user_score(user_id):
+    """Recompute one user's score from their comments"""
+    sql = USER_SCORE_SQL.format(comment_filter="WHERE user_id = :user_id", user_filter="AND u.id = :user_id")
+    db.session.execute(text(sql), {'user_id': user_id})
+    db.session.commit()
+
+@job('reconcile_user_scores')
+def reconcile_user_scores():
+    """Recompute every user's score from their comments"""
+    result = db.session.execute(text(USER_SCORE_SQL.format(comment_filter='', user_filter='')))
+    db.session.commit()
+    current_app.logger.info(f"Corrected score on {result.rowcount} users")
+
+@job('send_email', max_attempts=8, priority=20)
+def send_email(subject, recipient, body, html=None):
+    """Send one email over SMTP"""
+    from .utils.email import deliver_email
+    deliver_email(subject, recipient, body, html)
+
+@job('purge_jobs')
+def purge_jobs():
+    """Delete finished jobs older than the retention period"""
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config.get('JOB_RETENTION_DAYS', 7))
+    result = db.session.execute(
+        text("DELETE FROM job WHERE status IN ('done', 'failed') AND finished_at < :cutoff"),
+        {'cutoff': cutoff}
+    )
+    db.session.commit()
+    current_app.logger.info(f"Purged {result.rowcount} finished jobs")
@@ -0,0 +1,115 @@
+# app/utils/admin_data.py
+
+from typing import Dict, List, Optional
+from dataclasses import dataclass
+from sqlalchemy import func, or_
+
+from ..extensions import db, cache
+from ..models.user import User
+from ..models.interaction import Comment
+from ..models.feedback import Feedback
+
+ADMIN_SUMMARY_CACHE_KEY = 'admin:summary'
+ADMIN_SUMMARY_TIMEOUT = 60
+ADMIN_PER_PAGE = 25
+CONTENT_PREVIEW_LENGTH = 300
+
+
+@dataclass
+class AdminPage:
+    """A keyset-paginated, column-projected slice of an admin table."""
+    items: List
+    next_cursor: Optional[int]
+    cursor: Optional[int]
+    search: str
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.cursor is not None
+
+
+def _paginate(query, id_column, cursor: Optional[int], per_page: int, search: str) -> AdminPage:
+    """Apply newest-first keyset pagination on the primary key"""
+    if cursor:
+        query = query.filter(id_column < cursor)
+    rows = query.order_by(id_column.desc()).limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = rows[-1].id
+    return AdminPage(items=rows, next_cursor=next_cursor, cursor=cursor, search=search)
+
+
+def list_users(search: str = '', cursor: Optional[int] = None, per_page: int = ADMIN_PER_PAGE) -> AdminPage:
+    """Get a page of users with only the columns the dashboard shows"""
+    query = db.session.query(
+        User.id,
+        User.username,
+        User.email,
+        User.is_admin,
+        User.is_verified,
+        User.score
+    )
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(or_(User.username.ilike(pattern), User.email.ilike(pattern)))
+    return _paginate(query, User.id, cursor, per_page, search)
+
+
+def list_comments(search: str = '', cursor: Optional[int] = None, per_page: int = ADMIN_PER_PAGE) -> AdminPage:
+    """Get a page of comments with author columns and a content preview"""
+    query = db.session.query(
+        Comment.id,
+        func.left(Comment.content, CONTENT_PREVIEW_LENGTH).label('content'),
+        Comment.date_posted,
+        Comment.likes,
+        Comment.dislikes,
+        User.username.label('author_username'),
+        User.score.label('author_score')
+    ).join(User, Comment.user_id == User.id)
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(or_(Comment.content.ilike(pattern), User.username.ilike(pattern)))
+    return _paginate(query, Comment.id, cursor, per_page, search)
+
+
+def list_feedback(search: str = '', cursor: Optional[int] = None, per_page: int = ADMIN_PER_PAGE) -> AdminPage:
+    """Get a page of feedback messages with a message preview"""
+    query = db.session.query(
+        Feedback.id,
+        Feedback.name,
+        Feedback.email,
+        Feedback.subject,
+        func.left(Feedback.message, CONTENT_PREVIEW_LENGTH).label('message'),
+        Feedback.date_submitted
+    )
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(or_(
+            Feedback.name.ilike(pattern),
+            Feedback.email.ilike(pattern),
+            Feedback.subject.ilike(pattern)
+        ))
+    return _paginate(query, Feedback.id, cursor, per_page, search)
+
+
+def get_admin_summary() -> Dict[str, int]:
+    """Get dashboard totals from a short-lived cached aggregate"""
+    summary = cache.get(ADMIN_SUMMARY_CACHE_KEY)
+    if summary is None:
+        summary = {
+            'users': db.session.query(func.count(User.id)).scalar() or 0,
+            'comments': db.session.query(func.count(Comment.id)).scalar() or 0,
+            'feedback': db.session.query(func.count(Feedback.id)).scalar() or 0
+        }
+        cache.set(ADMIN_SUMMARY_CACHE_KEY, summary, timeout=ADMIN_SUMMARY_TIMEOUT)
+    return summary
+
+
+def invalidate_admin_summary() -> None:
+    """Drop cached dashboard totals after an admin mutation"""
+    cache.delete(ADMIN_SUMMARY_CACHE_KEY)
@@ -0,0 +1,164 @@
+# app/utils/assets.py
+
+from typing import Dict, FrozenSet, List, Tuple
+import hashlib
+import logging
+import mimetypes
+import os
+
+from flask import current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+from .compression import COMPRESSIBLE_MIMETYPES, brotli, choose_encoding, compress_bytes, decompress_bytes
+
+logger = logging.getLogger(__name__)
+
+ASSET_VERSION_ARG = 'v'
+IMMUTABLE_MAX_AGE = 31536000
+PRECOMPRESSED_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt')
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def file_digest(path: str) -> str:
+    """Short content hash used as an asset fingerprint"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def bytes_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def iter_static_files(static_folder: str):
+    """Yield (relative path, absolute path) for every source asset"""
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if name.endswith(tuple(ENCODING_SUFFIXES.values())):
+                continue
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, static_folder).replace(os.sep, '/'), path
+
+
+def build_manifest(static_folder: str) -> Dict[str, str]:
+    """Map every static file to its content fingerprint"""
+    return {relative: file_digest(path) for relative, path in iter_static_files(static_folder)}
+
+
+def precompress_static(static_folder: str, gzip_level: int = 9, brotli_quality: int = 11) -> List[Tuple[str, int, int, int]]:
+    """Write .gz (and .br when available) siblings for text assets.
+
+    Returns (path, original bytes, gzip bytes, brotli bytes) per file.
+    """
+    results = []
+    for relative, path in iter_static_files(static_folder):
+        if not relative.endswith(PRECOMPRESSED_EXTENSIONS):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        sizes = {}
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if encoding == 'br' and brotli is None:
+                continue
+            compressed = compress_bytes(data, encoding, gzip_level=gzip_level, brotli_quality=brotli_quality)
+            if len(compressed) < len(data):
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                sizes[encoding] = len(compressed)
+            elif os.path.exists(path + suffix):
+                # Left over from an earlier version of the file
+                os.remove(path + suffix)
+        results.append((relative, len(data), sizes.get('gzip', 0), sizes.get('br', 0)))
+    return results
+
+
+def verified_variants(static_folder: str, manifest: Dict[str, str]) -> Dict[str, FrozenSet[str]]:
+    """Map each asset to the encodings whose precompressed sibling matches it.
+
+    A sibling left behind by an earlier version of the file would otherwise
+    be served under the new fingerprint and cached as immutable, so each one
+    is decompressed and checked against the manifest once at startup.
+    """
+    variants = {}
+    for relative, fingerprint in manifest.items():
+        if not relative.endswith(PRECOMPRESSED_EXTENSIONS):
+            continue
+        encodings = set()
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            path = os.path.join(static_folder, relative + suffix)
+            if (encoding == 'br' and brotli is None) or not os.path.isfile(path):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    data = decompress_bytes(f.read(), encoding)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable {path}: {str(e)}")
+                continue
+            if bytes_digest(data) == fingerprint:
+                encodings.add(encoding)
+            else:
+                logger.warning(f"Ignoring stale {path}; run flask assets-precompress")
+        if encodings:
+            variants[relative] = frozenset(encodings)
+    return variants
+
+
+def serve_static(filename):
+    """Serve static files, preferring precompressed variants.
+
+    Requests carrying the current fingerprint are cached as immutable;
+    anything else gets a short revalidating lifetime.
+    """
+    static_folder = current_app.static_folder
+    manifest = current_app.extensions['asset_manifest']
+    fingerprint = manifest.get(filename)
+    immutable = fingerprint is not None and request.args.get(ASSET_VERSION_ARG) == fingerprint
+    max_age = IMMUTABLE_MAX_AGE if immutable else current_app.get_send_file_max_age(filename)
+
+    response = None
+    mimetype = mimetypes.guess_type(filename)[0]
+
+    if mimetype in COMPRESSIBLE_MIMETYPES:
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding in current_app.extensions['asset_variants'].get(filename, ()):
+            source = safe_join(static_folder, filename)
+            compressed = source + ENCODING_SUFFIXES[encoding] if source else None
+            if compressed and os.path.isfile(compressed):
+                response = send_from_directory(
+                    static_folder,
+                    filename + ENCODING_SUFFIXES[encoding],
+                    mimetype=mimetype,
+                    max_age=max_age
+                )
+                response.headers['Content-Encoding'] = encoding
+
+    if response is None:
+        response = send_from_directory(static_folder, filename, max_age=max_age)
+
+    if mimetype in COMPRESSIBLE_MIMETYPES:
+        response.vary.add('Accept-Encoding')
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+def init_app(app):
+    """Fingerprint static assets and serve them with long-lived caching"""
+    if not app.static_folder or not os.path.isdir(app.static_folder):
+        return
+
+    manifest = build_manifest(app.static_folder)
+    app.extensions['asset_manifest'] = manifest
+    app.extensions['asset_variants'] = verified_variants(app.static_folder, manifest)
+    logger.info(f"Fingerprinted {len(manifest)} static assets")
+
+    @app.url_defaults
+    def add_asset_fingerprint(endpoint, values):
+        if endpoint == 'static' and ASSET_VERSION_ARG not in values:
+            fingerprint = manifest.get(values.get('filename'))
+            if fingerprint:
+                values[ASSET_VERSION_ARG] = fingerprint
+
+    app.view_functions['static'] = serve_static
@@ -0,0 +1,201 @@
+# app/utils/cache_warm.py
+
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+from flask_caching.backends import NullCache, SimpleCache
+
+from ..extensions import db, cache
+from .catalogue_sync import get_catalogue_version, register_change_listener
+from .job_queue import enqueue, jobs_enabled
+
+logger = logging.getLogger(__name__)
+
+KIND_SEARCH = 'search'
+KIND_API_SEARCH = 'api_search'
+KIND_RECOMMEND = 'recommend'
+KIND_INSTITUTION = 'institution'
+
+LOG_KEY_PREFIX = 'cache_warm:log'
+WARM_LOCK_KEY = 'cache_warm:lock'
+
+# Backends that live inside one process: other workers never see what they hold
+PROCESS_LOCAL_BACKENDS = (SimpleCache, NullCache)
+
+
+def cache_is_shared() -> bool:
+    """Whether other processes read this cache, and with it the query log"""
+    return not isinstance(cache.cache, PROCESS_LOCAL_BACKENDS)
+
+
+class QueryLog:
+    """Rolling popularity counts of cacheable requests, kept in the cache.
+
+    Each worker counts requests locally and merges them into the current
+    time bucket in the shared cache every flush_interval seconds. Buckets
+    expire once they leave the window, and each keeps only its most common
+    entries, so the log stays a few kilobytes however busy the site is.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600, buckets: int = 24,
+                 max_entries: int = 500, flush_interval: float = 30):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._flushed_at = time.monotonic()
+
+    def _bucket_key(self, bucket: int) -> str:
+        return f"{LOG_KEY_PREFIX}:{bucket}"
+
+    def record(self, kind: str, *args: Any) -> None:
+        """Count one request; args must be JSON-serialisable and canonical"""
+        entry = json.dumps([kind, *args], separators=(',', ':'))
+        with self._lock:
+            self._pending[entry] += 1
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Merge this worker's counts into the shared current bucket"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+        key = self._bucket_key(int(time.time() // self.bucket_seconds))
+        try:
+            # Concurrent flushes can lose a few counts; popularity only
+            # needs to be approximate
+            counts = Counter(cache.get(key) or {})
+            counts.update(pending)
+            cache.set(
+                key,
+                dict(counts.most_common(self.max_entries)),
+                timeout=self.bucket_seconds * (self.buckets + 1)
+            )
+        except Exception as e:
+            logger.warning(f"Could not flush the cache warming log: {str(e)}")
+
+    def top(self, n: int) -> List[Tuple[List, int]]:
+        """Most requested entries across the window, as ([kind, *args], count)"""
+        self.flush()
+        current = int(time.time() // self.bucket_seconds)
+        keys = [self._bucket_key(bucket) for bucket in range(current - self.buckets + 1, current + 1)]
+        totals: Counter = Counter()
+        for counts in cache.get_many(*keys):
+            if counts:
+                totals.update(counts)
+        return [(json.loads(entry), count) for entry, count in totals.most_common(n)]
+
+
+class CacheWarmer:
+    """Recomputes the most requested cached results in the background."""
+
+    def __init__(self):
+        self._handlers: Dict[str, Callable[..., None]] = {}
+        self._lock = threading.Lock()
+        self._running = False
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    def register(self, kind: str, handler: Callable[..., None]) -> None:
+        """Register the function that recomputes and caches one entry of a kind"""
+        self._handlers[kind] = handler
+
+    def warm(self, top_n: int) -> Dict[str, Any]:
+        """Recompute the top entries now, in the calling thread"""
+        start = time.perf_counter()
+        warmed = Counter()
+        failed = 0
+        for (kind, *args), _ in query_log.top(top_n):
+            handler = self._handlers.get(kind)
+            if handler is None:
+                continue
+            try:
+                handler(*args)
+                warmed[kind] += 1
+            except Exception as e:
+                failed += 1
+                db.session.rollback()
+                logger.warning(f"Could not warm {kind} {args!r}: {str(e)}")
+        result = {
+            'warmed': dict(warmed),
+            'failed': failed,
+            'seconds': round(time.perf_counter() - start, 3),
+            'finished_at': int(time.time())
+        }
+        self._last_run = result
+        logger.info(f"Cache warming finished: {result}")
+        return result
+
+    def warm_in_background(self, reason: str) -> bool:
+        """Warm in a thread, or on the job queue, unless disabled, running or recently done"""
+        app = current_app._get_current_object()
+        if not app.config.get('CACHE_WARM_ENABLED', True):
+            return False
+        if not cache_is_shared():
+            # A fresh worker or CLI process has an empty log of its own, and
+            # nothing it warms would reach the other processes
+            logger.debug(f"Skipping cache warming after {reason}: the cache is not shared")
+            return False
+        queued = jobs_enabled()
+        with self._lock:
+            if self._running:
+                return False
+            # One warmer per catalogue version at a time across workers that
+            # share a cache; the lock expires rather than being released, so
+            # restarts shortly after a warm do not repeat it
+            lock_key = f"{WARM_LOCK_KEY}:{get_catalogue_version()}"
+            if not cache.add(lock_key, os.getpid(), timeout=app.config.get('CACHE_WARM_COOLDOWN', 600)):
+                return False
+            self._running = not queued
+
+        if queued:
+            # The job worker warms the shared cache instead of a web worker
+            enqueue('warm_caches', dedupe_key='warm_caches')
+            return True
+
+        def run():
+            try:
+                with app.app_context():
+                    try:
+                        logger.info(f"Warming caches after {reason}")
+                        self.warm(app.config.get('CACHE_WARM_TOP_N', 50))
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                logger.error(f"Cache warming failed: {str(e)}")
+            finally:
+                self._running = False
+
+        # Not a daemon: a catalogue sync run from the CLI waits for it to finish
+        threading.Thread(target=run, name='cache-warm').start()
+        return True
+
+    def on_catalogue_change(self, *args) -> None:
+        """Catalogue change listener: the versioned caches are now all cold"""
+        try:
+            self.warm_in_background('catalogue change')
+        except Exception as e:
+            logger.error(f"Could not start cache warming: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self._running,
+            'handlers': sorted(self._handlers),
+            'last_run': self._last_run
+        }
+
+
+query_log = QueryLog()
+cache_warmer = CacheWarmer()
+register_change_listener(cache_warmer.on_catalogue_change)
@@ -0,0 +1,654 @@
+# app/utils/catalogue_sync.py
+
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from sqlalchemy import event, insert, update, delete, select, text, or_
+from sqlalchemy.exc import SQLAlchemyError
+from flask import current_app
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from ..extensions import db
+from ..models.university import University, Course, State, ProgrammeType
+from ..models.interaction import Bookmark
+from ..models.academic import SubjectEquivalency
+from ..models.subject import Subjects
+from ..models.requirement import (
+    CourseRequirement,
+    SubjectRequirement,
+    UTMERequirementTemplate,
+    DirectEntryRequirementTemplate
+)
+
+logger = logging.getLogger(__name__)
+
+INSTITUTION_FIELDS = ('state', 'programme_type', 'website', 'established', 'abbrv')
+COURSE_FIELDS = ('code',)
+REQUIREMENT_FIELDS = ('utme_requirements', 'direct_entry_requirements', 'subjects')
+
+_change_listeners: List[Callable[['CatalogueChangeSet'], None]] = []
+
+# The version lives in the single catalogue_version row so a sync run from
+# the CLI or a job worker moves it for every web worker too. Each process
+# keeps its own copy and re-reads the row at most every CATALOGUE_VERSION_TTL
+# seconds, so hot paths never wait on the database.
+SELECT_VERSION = text("SELECT version FROM catalogue_version WHERE id = 1")
+BUMP_VERSION = text("""
+    INSERT INTO catalogue_version (id, version) VALUES (1, :now)
+    ON CONFLICT (id) DO UPDATE
+    SET version = GREATEST(catalogue_version.version + 1, EXCLUDED.version)
+    RETURNING version
+""")
+
+# ORM writes to any of these move the version when they are flushed, so
+# admin edits invalidate the same caches as a sync
+CATALOGUE_MODELS = (
+    University,
+    Course,
+    State,
+    ProgrammeType,
+    CourseRequirement,
+    SubjectRequirement,
+    UTMERequirementTemplate,
+    DirectEntryRequirementTemplate,
+    Subjects,
+    SubjectEquivalency
+)
+
+_version_lock = threading.Lock()
+_version: Optional[int] = None
+_version_read_at = 0.0
+_published_version: Optional[int] = None
+
+
+def _read_version(fallback: Optional[int]) -> int:
+    try:
+        with db.engine.connect() as conn:
+            version = conn.execute(SELECT_VERSION).scalar()
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not read the catalogue version: {str(e)}")
+        version = None
+    if version is None:
+        return fallback if fallback is not None else 0
+    return version
+
+
+def get_catalogue_version() -> int:
+    """Get the current catalogue version used to key derived caches"""
+    global _version, _version_read_at
+    ttl = current_app.config.get('CATALOGUE_VERSION_TTL', 2)
+    if _version is not None and time.monotonic() - _version_read_at < ttl:
+        return _version
+    with _version_lock:
+        if _version is None or time.monotonic() - _version_read_at >= ttl:
+            _version = _read_version(_version)
+            _version_read_at = time.monotonic()
+        return _version
+
+
+def _remember_version(version: int) -> None:
+    """Adopt a version this process wrote; its listeners are run directly"""
+    global _version, _version_read_at, _published_version
+    with _version_lock:
+        _version = _published_version = version
+        _version_read_at = time.monotonic()
+
+
+def bump_catalogue_version(session=None) -> int:
+    """Move the catalogue to a new version so derived caches are rebuilt.
+
+    Runs in the session's transaction, so the new version becomes visible to
+    other processes together with the catalogue rows it describes. The
+    version is moved once per transaction and the change listeners run when
+    it commits.
+    """
+    session = session if session is not None else db.session()
+    version = session.info.get('catalogue_version')
+    if version is None:
+        version = session.execute(BUMP_VERSION, {'now': int(time.time() * 1000)}).scalar()
+        session.info['catalogue_version'] = version
+    return version
+
+
+def _touches_catalogue(session) -> bool:
+    for obj in session.new | session.deleted:
+        if isinstance(obj, CATALOGUE_MODELS):
+            return True
+    return any(
+        isinstance(obj, CATALOGUE_MODELS) and session.is_modified(obj, include_collections=False)
+        for obj in session.dirty
+    )
+
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_on_catalogue_flush(session, flush_context, instances) -> None:
+    if 'catalogue_version' not in session.info and _touches_catalogue(session):
+        bump_catalogue_version(session)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _remember_committed_version(session) -> None:
+    version = session.info.pop('catalogue_version', None)
+    changes = session.info.pop('catalogue_changes', None)
+    if version is not None:
+        session.info['catalogue_committed'] = (version, changes or CatalogueChangeSet())
+
+
+@event.listens_for(db.session, 'after_transaction_end')
+def _publish_committed_version(session, transaction) -> None:
+    # Listeners may query, which a committed transaction no longer allows
+    if transaction.parent is not None or 'catalogue_committed' not in session.info:
+        return
+    version, changes = session.info.pop('catalogue_committed')
+    changes.version = version
+    _remember_version(version)
+    publish_changes(changes)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _forget_rolled_back_version(session) -> None:
+    session.info.pop('catalogue_version', None)
+    session.info.pop('catalogue_changes', None)
+
+
+def check_catalogue_version() -> None:
+    """Run this process's change listeners if another process moved the version"""
+    global _published_version
+    version = get_catalogue_version()
+    with _version_lock:
+        previous, _published_version = _published_version, version
+    if previous is not None and previous != version:
+        logger.info(f"Catalogue version moved from {previous} to {version} in another process")
+        publish_changes(CatalogueChangeSet(version=version, remote=True))
+
+
+def init_app(app):
+    """Pick up catalogue syncs applied by other processes at the start of each request"""
+    app.before_request(check_catalogue_version)
+
+
+def register_change_listener(callback: Callable[['CatalogueChangeSet'], None]) -> None:
+    """Register a callback that receives the change set of every applied sync"""
+    if callback not in _change_listeners:
+        _change_listeners.append(callback)
+
+
+def publish_changes(changes: 'CatalogueChangeSet') -> None:
+    """Notify cache and search-index layers about an applied change set"""
+    for callback in list(_change_listeners):
+        try:
+            callback(changes)
+        except Exception as e:
+            logger.error(f"Catalogue change listener {callback!r} failed: {str(e)}")
+
+
+def record_hash(record: Dict, fields: Tuple[str, ...]) -> str:
+    """Stable content hash of the given fields of a catalogue record"""
+    payload = json.dumps(
+        [record.get(name) for name in fields],
+        sort_keys=True,
+        default=str,
+        separators=(',', ':')
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class EntityChanges:
+    """Keys inserted, updated and deleted for one catalogue entity."""
+    inserts: List = field(default_factory=list)
+    updates: List = field(default_factory=list)
+    deletes: List = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'inserts': len(self.inserts),
+            'updates': len(self.updates),
+            'deletes': len(self.deletes)
+        }
+
+
+@dataclass
+class CatalogueChangeSet:
+    """Delta between the live catalogue tables and a snapshot."""
+    institutions: EntityChanges = field(default_factory=EntityChanges)
+    courses: EntityChanges = field(default_factory=EntityChanges)
+    requirements: EntityChanges = field(default_factory=EntityChanges)
+    version: Optional[int] = None
+    unchanged_requirements: int = 0
+    # Set when another process applied the sync; only the version is known
+    remote: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.institutions.total or self.courses.total or self.requirements.total)
+
+    @property
+    def affected_university_names(self) -> set:
+        """Institution names whose page content may have changed."""
+        names = set(self.institutions.inserts + self.institutions.updates + self.institutions.deletes)
+        for key in self.requirements.inserts + self.requirements.updates + self.requirements.deletes:
+            names.add(key[0])
+        return names
+
+    @property
+    def affected_course_names(self) -> set:
+        """Course names whose listings may have changed."""
+        names = set(self.courses.inserts + self.courses.updates + self.courses.deletes)
+        for key in self.requirements.inserts + self.requirements.updates + self.requirements.deletes:
+            names.add(key[1])
+        return names
+
+    def get_summary(self) -> Dict[str, Dict[str, int]]:
+        return {
+            'institutions': self.institutions.summary(),
+            'courses': self.courses.summary(),
+            'requirements': self.requirements.summary()
+        }
+
+
+def load_current_catalogue() -> Dict[str, Dict]:
+    """Load the live catalogue keyed by natural keys with column-only queries"""
+    institutions = {}
+    rows = db.session.execute(
+        select(
+            University.id,
+            University.university_name,
+            State.name.label('state'),
+            ProgrammeType.name.label('programme_type'),
+            University.website,
+            University.established,
+            University.abbrv
+        )
+        .outerjoin(State, University.state_id == State.id)
+        .outerjoin(ProgrammeType, University.programme_type_id == ProgrammeType.id)
+    ).mappings().all()
+    for row in rows:
+        institutions[row['university_name']] = dict(row)
+
+    courses = {}
+    for row in db.session.execute(
+        select(Course.id, Course.course_name, Course.code)
+    ).mappings().all():
+        courses[row['course_name']] = dict(row)
+
+    requirements = {}
+    rows = db.session.execute(
+        select(
+            CourseRequirement.id,
+            University.university_name,
+            Course.course_name,
+            UTMERequirementTemplate.requirements.label('utme_requirements'),
+            DirectEntryRequirementTemplate.requirements.label('direct_entry_requirements'),
+            SubjectRequirement.subjects
+        )
+        .join(University, CourseRequirement.university_id == University.id)
+        .join(Course, CourseRequirement.course_id == Course.id)
+        .outerjoin(UTMERequirementTemplate, CourseRequirement.utme_template_id == UTMERequirementTemplate.id)
+        .outerjoin(DirectEntryRequirementTemplate, CourseRequirement.de_template_id == DirectEntryRequirementTemplate.id)
+        .outerjoin(SubjectRequirement, SubjectRequirement.course_requirement_id == CourseRequirement.id)
+    ).mappings().all()
+    for row in rows:
+        requirements[(row['university_name'], row['course_name'])] = dict(row)
+
+    return {
+        'institutions': institutions,
+        'courses': courses,
+        'requirements': requirements
+    }
+
+
+def index_snapshot(snapshot: Dict) -> Dict[str, Dict]:
+    """Index a snapshot document by the same natural keys as the live tables"""
+    institutions = {}
+    for record in snapshot.get('institutions', []):
+        name = (record.get('university_name') or record.get('name') or '').strip()
+        if not name:
+            raise ValueError(f"Institution record without a name: {record}")
+        institutions[name] = dict(record, university_name=name)
+
+    courses = {}
+    for record in snapshot.get('courses', []):
+        name = (record.get('course_name') or '').strip()
+        if not name:
+            raise ValueError(f"Course record without a name: {record}")
+        courses[name] = dict(record, course_name=name)
+
+    requirements = {}
+    for record in snapshot.get('requirements', []):
+        key = (
+            (record.get('university_name') or record.get('university') or '').strip(),
+            (record.get('course_name') or record.get('course') or '').strip()
+        )
+        if not all(key):
+            raise ValueError(f"Requirement record without institution/course: {record}")
+        if key[0] not in institutions:
+            raise ValueError(f"Requirement references unknown institution: {key[0]}")
+        if key[1] not in courses:
+            courses[key[1]] = {'course_name': key[1], 'code': None}
+        requirements[key] = dict(record, university_name=key[0], course_name=key[1])
+
+    return {
+        'institutions': institutions,
+        'courses': courses,
+        'requirements': requirements
+    }
+
+
+def _diff(current: Dict, incoming: Dict, fields: Tuple[str, ...]) -> EntityChanges:
+    changes = EntityChanges()
+    for key, record in incoming.items():
+        existing = current.get(key)
+        if existing is None:
+            changes.inserts.append(key)
+        elif record_hash(existing, fields) != record_hash(record, fields):
+            changes.updates.append(key)
+    changes.deletes = [key for key in current if key not in incoming]
+    return changes
+
+
+def compute_changes(current: Dict[str, Dict], incoming: Dict[str, Dict]) -> CatalogueChangeSet:
+    """Compute inserts, updates and deletes between live tables and a snapshot"""
+    changes = CatalogueChangeSet(
+        institutions=_diff(current['institutions'], incoming['institutions'], INSTITUTION_FIELDS),
+        courses=_diff(current['courses'], incoming['courses'], COURSE_FIELDS),
+        requirements=_diff(current['requirements'], incoming['requirements'], REQUIREMENT_FIELDS)
+    )
+    changes.unchanged_requirements = (
+        len(incoming['requirements'])
+        - len(changes.requirements.inserts)
+        - len(changes.requirements.updates)
+    )
+    return changes
+
+
+class CatalogueSync:
+    """Applies a catalogue snapshot to the live tables as a minimal delta."""
+
+    def __init__(self, snapshot: Dict):
+        self.incoming = index_snapshot(snapshot)
+        self.current = None
+        self.changes = None
+
+    def plan(self) -> CatalogueChangeSet:
+        """Compute the change set without touching the database"""
+        self.current = load_current_catalogue()
+        self.changes = compute_changes(self.current, self.incoming)
+        return self.changes
+
+    def apply(self, dry_run: bool = False) -> CatalogueChangeSet:
+        """Apply the delta in one transaction and publish the change list"""
+        changes = self.plan()
+        if dry_run or changes.is_empty:
+            return changes
+
+        try:
+            self._apply_deletes(changes)
+            self._apply_lookups()
+            institution_ids = self._apply_institutions(changes)
+            course_ids = self._apply_courses(changes)
+            self._apply_requirements(changes, institution_ids, course_ids)
+            self._refresh_search_vectors(changes, institution_ids, course_ids)
+            changes.version = bump_catalogue_version()
+            # Published with the version once the transaction commits
+            db.session.info['catalogue_changes'] = changes
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Catalogue sync failed, nothing was applied: {str(e)}")
+            raise
+
+        logger.info(f"Catalogue sync applied: {changes.get_summary()} (version {changes.version})")
+        return changes
+
+    def _apply_deletes(self, changes: CatalogueChangeSet) -> None:
+        requirement_ids = [self.current['requirements'][key]['id'] for key in changes.requirements.deletes]
+        if requirement_ids:
+            db.session.execute(
+                delete(SubjectRequirement).where(SubjectRequirement.course_requirement_id.in_(requirement_ids))
+            )
+            db.session.execute(
+                delete(CourseRequirement).where(CourseRequirement.id.in_(requirement_ids))
+            )
+
+        # Institutions and courses go through the ORM, like the admin delete
+        # views, so the model cascades (comments and replies, special and
+        # institutional requirements, affiliations ...) and the comment
+        # listeners run. Deletions are rare, so loading the rows is cheap.
+        university_ids = [self.current['institutions'][key]['id'] for key in changes.institutions.deletes]
+        course_ids = [self.current['courses'][key]['id'] for key in changes.courses.deletes]
+        if not (university_ids or course_ids):
+            return
+
+        # Bookmarks cascade in the database but not in the ORM, which would
+        # try to null their foreign keys
+        db.session.execute(
+            delete(Bookmark).where(or_(
+                Bookmark.university_id.in_(university_ids),
+                Bookmark.course_id.in_(course_ids)
+            ))
+        )
+        for model, ids in ((University, university_ids), (Course, course_ids)):
+            if ids:
+                for row in db.session.scalars(select(model).where(model.id.in_(ids))).unique():
+                    db.session.delete(row)
+        db.session.flush()
+
+    def _apply_lookups(self) -> None:
+        """Ensure every state and programme type named in the snapshot exists"""
+        self.state_ids = dict(db.session.execute(select(State.name, State.id)).all())
+        self.programme_type_ids = dict(db.session.execute(select(ProgrammeType.name, ProgrammeType.id)).all())
+
+        new_states = {
+            r['state'] for r in self.incoming['institutions'].values()
+            if r.get('state') and r['state'] not in self.state_ids
+        }
+        if new_states:
+            rows = db.session.execute(
+                insert(State).returning(State.name, State.id),
+                [{'name': name} for name in sorted(new_states)]
+            ).all()
+            self.state_ids.update(dict(rows))
+
+        new_types = {
+            r['programme_type'] for r in self.incoming['institutions'].values()
+            if r.get('programme_type') and r['programme_type'] not in self.programme_type_ids
+        }
+        if new_types:
+            rows = db.session.execute(
+                insert(ProgrammeType).returning(ProgrammeType.name, ProgrammeType.id),
+                [{'name': name} for name in sorted(new_types)]
+            ).all()
+            self.programme_type_ids.update(dict(rows))
+
+    def _institution_values(self, record: Dict) -> Dict:
+        return {
+            'university_name': record['university_name'],
+            'state_id': self.state_ids.get(record.get('state')),
+            'programme_type_id': self.programme_type_ids.get(record.get('programme_type')),
+            'website': record.get('website'),
+            'established': record.get('established'),
+            'abbrv': record.get('abbrv')
+        }
+
+    def _apply_institutions(self, changes: CatalogueChangeSet) -> Dict[str, int]:
+        deleted = set(changes.institutions.deletes)
+        ids = {
+            name: row['id'] for name, row in self.current['institutions'].items()
+            if name not in deleted
+        }
+        if changes.institutions.inserts:
+            rows = db.session.execute(
+                insert(University).returning(University.university_name, University.id),
+                [self._institution_values(self.incoming['institutions'][name])
+                 for name in changes.institutions.inserts]
+            ).all()
+            ids.update(dict(rows))
+        if changes.institutions.updates:
+            db.session.execute(
+                update(University),
+                [dict(self._institution_values(self.incoming['institutions'][name]), id=ids[name])
+                 for name in changes.institutions.updates]
+            )
+        return ids
+
+    def _apply_courses(self, changes: CatalogueChangeSet) -> Dict[str, int]:
+        deleted = set(changes.courses.deletes)
+        ids = {
+            name: row['id'] for name, row in self.current['courses'].items()
+            if name not in deleted
+        }
+        if changes.courses.inserts:
+            rows = db.session.execute(
+                insert(Course).returning(Course.course_name, Course.id),
+                [{'course_name': name, 'code': self.incoming['courses'][name].get('code')}
+                 for name in changes.courses.inserts]
+            ).all()
+            ids.update(dict(rows))
+        if changes.courses.updates:
+            db.session.execute(
+                update(Course),
+                [{'id': ids[name], 'code': self.incoming['courses'][name].get('code')}
+                 for name in changes.courses.updates]
+            )
+        return ids
+
+    def _template_ids(self, model, texts: set) -> Dict[str, int]:
+        """Resolve requirement texts to template ids, creating missing templates"""
+        if not texts:
+            return {}
+        ids = dict(db.session.execute(
+            select(model.requirements, model.id).where(model.requirements.in_(texts))
+        ).all())
+        missing = texts - set(ids)
+        if missing:
+            rows = db.session.execute(
+                insert(model).returning(model.requirements, model.id),
+                [{'requirements': text_value} for text_value in sorted(missing)]
+            ).all()
+            ids.update(dict(rows))
+        return ids
+
+    def _apply_requirements(self, changes: CatalogueChangeSet,
+                            institution_ids: Dict[str, int], course_ids: Dict[str, int]) -> None:
+        touched = changes.requirements.inserts + changes.requirements.updates
+        if not touched:
+            return
+
+        records = [self.incoming['requirements'][key] for key in touched]
+        utme_ids = self._template_ids(
+            UTMERequirementTemplate,
+            {r['utme_requirements'] for r in records if r.get('utme_requirements')}
+        )
+        de_ids = self._template_ids(
+            DirectEntryRequirementTemplate,
+            {r['direct_entry_requirements'] for r in records if r.get('direct_entry_requirements')}
+        )
+
+        def values(record):
+            return {
+                'university_id': institution_ids[record['university_name']],
+                'course_id': course_ids[record['course_name']],
+                'utme_template_id': utme_ids.get(record.get('utme_requirements')),
+                'de_template_id': de_ids.get(record.get('direct_entry_requirements'))
+            }
+
+        requirement_ids = {}
+        if changes.requirements.inserts:
+            rows = db.session.execute(
+                insert(CourseRequirement).returning(
+                    CourseRequirement.university_id,
+                    CourseRequirement.course_id,
+                    CourseRequirement.id
+                ),
+                [values(self.incoming['requirements'][key]) for key in changes.requirements.inserts]
+            ).all()
+            by_ids = {(row[0], row[1]): row[2] for row in rows}
+            for key in changes.requirements.inserts:
+                requirement_ids[key] = by_ids[(institution_ids[key[0]], course_ids[key[1]])]
+
+        if changes.requirements.updates:
+            updates = []
+            for key in changes.requirements.updates:
+                requirement_ids[key] = self.current['requirements'][key]['id']
+                updates.append(dict(values(self.incoming['requirements'][key]), id=requirement_ids[key]))
+            db.session.execute(update(CourseRequirement), updates)
+            db.session.execute(
+                delete(SubjectRequirement).where(
+                    SubjectRequirement.course_requirement_id.in_(
+                        [requirement_ids[key] for key in changes.requirements.updates]
+                    )
+                )
+            )
+
+        subject_rows = [
+            {'course_requirement_id': requirement_ids[key],
+             'subjects': self.incoming['requirements'][key]['subjects']}
+            for key in touched
+            if self.incoming['requirements'][key].get('subjects')
+        ]
+        if subject_rows:
+            db.session.execute(insert(SubjectRequirement), subject_rows)
+
+    def _refresh_search_vectors(self, changes: CatalogueChangeSet,
+                                institution_ids: Dict[str, int], course_ids: Dict[str, int]) -> None:
+        """Rebuild the search vectors of inserted and updated rows, as init-search does"""
+        university_ids = [institution_ids[name] for name in changes.institutions.inserts + changes.institutions.updates]
+        if university_ids:
+            db.session.execute(text("""
+                UPDATE university u
+                SET search_vector = to_tsvector('english',
+                    COALESCE(u.university_name, '') || ' ' ||
+                    COALESCE((SELECT s.name FROM state s WHERE s.id = u.state_id), '') || ' ' ||
+                    COALESCE((SELECT pt.name FROM programme_type pt WHERE pt.id = u.programme_type_id), '')
+                )
+                WHERE u.id = ANY(:ids)
+            """), {'ids': university_ids})
+
+        changed_course_ids = [course_ids[name] for name in changes.courses.inserts + changes.courses.updates]
+        if changed_course_ids:
+            db.session.execute(text("""
+                UPDATE course
+                SET search_vector = to_tsvector('english',
+                    COALESCE(course_name, '') || ' ' ||
+                    COALESCE(code, '')
+                )
+                WHERE id = ANY(:ids)
+            """), {'ids': changed_course_ids})
+
+
+def export_catalogue() -> Dict:
+    """Export the live catalogue in the snapshot format accepted by CatalogueSync"""
+    current = load_current_catalogue()
+    return {
+        'institutions': [
+            {name: row.get(name) for name in ('university_name',) + INSTITUTION_FIELDS}
+            for row in current['institutions'].values()
+        ],
+        'courses': [
+            {name: row.get(name) for name in ('course_name',) + COURSE_FIELDS}
+            for row in current['courses'].values()
+        ],
+        'requirements': [
+            {name: row.get(name) for name in ('university_name', 'course_name') + REQUIREMENT_FIELDS}
+            for row in current['requirements'].values()
+        ]
+    }
+
+
+def sync_catalogue(snapshot: Dict, dry_run: bool = False) -> CatalogueChangeSet:
+    """Diff a catalogue snapshot against the live tables and apply the delta"""
+    start_time = time.time()
+    changes = CatalogueSync(snapshot).apply(dry_run=dry_run)
+    current_app.logger.info(
+        f"Catalogue sync {'planned' if dry_run else 'completed'} in "
+        f"{time.time() - start_time:.2f}s: {changes.get_summary()}"
+    )
+    return changes
@@ -0,0 +1,212 @@
+# app/utils/comment_tree.py
+
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime
+from sqlalchemy import text
+import base64
+import logging
+
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THREADS_PER_PAGE = 20
+# None loads every reply; a number stops the tree at that depth and reports
+# how many replies were left out below each boundary comment.
+MAX_REPLY_DEPTH = None
+
+# Page of top-level threads plus their descendants, with authors, in one round trip.
+# One root beyond the page is located to tell whether another page exists, but
+# only its position is used - its replies are never loaded.
+COMMENT_TREE_SQL = text("""
+    WITH RECURSIVE roots AS (
+        SELECT c.id, row_number() OVER (ORDER BY c.date_posted DESC, c.id DESC) AS position
+        FROM comment c
+        WHERE c.parent_id IS NULL
+        AND (
+            (CAST(:university_id AS INTEGER) IS NULL AND c.university_id IS NULL)
+            OR c.university_id = :university_id
+        )
+        AND (
+            CAST(:cursor_date AS TIMESTAMP) IS NULL
+            OR (c.date_posted, c.id) < (CAST(:cursor_date AS TIMESTAMP), :cursor_id)
+        )
+        ORDER BY c.date_posted DESC, c.id DESC
+        LIMIT :per_page + 1
+    ),
+    thread AS (
+        SELECT c.id, c.content, c.date_posted, c.user_id, c.university_id,
+               c.parent_id, c.likes, c.dislikes, 0 AS depth
+        FROM comment c
+        JOIN roots r ON r.id = c.id
+        WHERE r.position <= :per_page
+        UNION ALL
+        SELECT c.id, c.content, c.date_posted, c.user_id, c.university_id,
+               c.parent_id, c.likes, c.dislikes, t.depth + 1
+        FROM comment c
+        JOIN thread t ON c.parent_id = t.id
+        WHERE CAST(:max_depth AS INTEGER) IS NULL OR t.depth < CAST(:max_depth AS INTEGER)
+    )
+    SELECT t.*, u.username, u.is_admin, u.score,
+           CASE WHEN t.depth = CAST(:max_depth AS INTEGER)
+                THEN (SELECT count(*) FROM comment r WHERE r.parent_id = t.id)
+                ELSE 0
+           END AS hidden_replies,
+           (SELECT count(*) FROM roots) > :per_page AS has_more
+    FROM thread t
+    JOIN "user" u ON u.id = t.user_id
+    ORDER BY t.depth, t.date_posted, t.id
+""")
+
+
+@dataclass
+class CommentAuthor:
+    """Author columns needed to render a comment."""
+    id: int
+    username: str
+    is_admin: int
+    score: int
+
+
+@dataclass
+class CommentNode:
+    """A comment with its already-loaded replies.
+
+    Mirrors the attributes templates read from ``Comment`` so it can be
+    rendered in its place without triggering lazy loads.
+    """
+    id: int
+    content: str
+    date_posted: datetime
+    user_id: int
+    university_id: Optional[int]
+    parent_id: Optional[int]
+    likes: int
+    dislikes: int
+    depth: int
+    author: CommentAuthor
+    replies: List['CommentNode'] = field(default_factory=list)
+    reply_count: int = 0
+    hidden_replies: int = 0
+    descendant_count: int = 0
+
+    @property
+    def score(self):
+        return (self.likes or 0) - (self.dislikes or 0)
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'content': self.content,
+            'author': self.author.username,
+            'author_is_admin': bool(self.author.is_admin),
+            'author_score': self.author.score,
+            'date_posted': self.date_posted.strftime('%Y-%m-%d %H:%M:%S'),
+            'user_id': self.user_id,
+            'parent_id': self.parent_id,
+            'likes': self.likes or 0,
+            'dislikes': self.dislikes or 0,
+            'reply_count': self.reply_count,
+            'hidden_replies': self.hidden_replies,
+            'replies': [reply.to_dict() for reply in self.replies]
+        }
+
+
+@dataclass
+class CommentPage:
+    """One keyset-paginated page of top-level threads."""
+    threads: List[CommentNode]
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(date_posted: datetime, comment_id: int) -> str:
+    """Encode the keyset position after a top-level comment"""
+    raw = f"{date_posted.isoformat()}|{comment_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+    """Decode a keyset cursor, ignoring malformed values"""
+    if not cursor:
+        return None, None
+    try:
+        date_part, id_part = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(date_part).isoformat(), int(id_part)
+    except (ValueError, UnicodeDecodeError) as e:
+        logger.warning(f"Ignoring invalid comment cursor {cursor!r}: {str(e)}")
+        return None, None
+
+
+def build_comment_tree(rows) -> List[CommentNode]:
+    """Assemble flat rows ordered by depth into threads with precomputed counts"""
+    nodes: Dict[int, CommentNode] = {}
+    roots: List[CommentNode] = []
+
+    for row in rows:
+        node = CommentNode(
+            id=row.id,
+            content=row.content,
+            date_posted=row.date_posted,
+            user_id=row.user_id,
+            university_id=row.university_id,
+            parent_id=row.parent_id,
+            likes=row.likes,
+            dislikes=row.dislikes,
+            depth=row.depth,
+            author=CommentAuthor(
+                id=row.user_id,
+                username=row.username,
+                is_admin=row.is_admin,
+                score=row.score
+            ),
+            reply_count=row.hidden_replies,
+            hidden_replies=row.hidden_replies
+        )
+        nodes[node.id] = node
+        parent = nodes.get(node.parent_id) if node.depth else None
+        if parent is None:
+            roots.append(node)
+        else:
+            parent.replies.append(node)
+            parent.reply_count += 1
+
+    # Rows arrive parents-first, so walking backwards accumulates subtree sizes
+    for node in reversed(list(nodes.values())):
+        parent = nodes.get(node.parent_id) if node.depth else None
+        if parent is not None:
+            parent.descendant_count += node.descendant_count + 1
+
+    roots.sort(key=lambda node: (node.date_posted, node.id), reverse=True)
+    return roots
+
+
+def load_comment_page(university_id: Optional[int] = None, cursor: Optional[str] = None,
+                      per_page: int = DEFAULT_THREADS_PER_PAGE,
+                      max_depth: Optional[int] = MAX_REPLY_DEPTH) -> CommentPage:
+    """Load a page of top-level threads with their replies in a single query.
+
+    ``university_id=None`` loads the general (contact page) discussion. Replies
+    deeper than ``max_depth`` are not loaded; their parents keep the full
+    ``reply_count`` and report the missing ones in ``hidden_replies``.
+    """
+    cursor_date, cursor_id = decode_cursor(cursor)
+    rows = db.session.execute(COMMENT_TREE_SQL, {
+        'university_id': university_id,
+        'cursor_date': cursor_date,
+        'cursor_id': cursor_id,
+        'per_page': per_page,
+        'max_depth': max_depth
+    }).all()
+
+    threads = build_comment_tree(rows)
+    next_cursor = None
+    if rows and rows[0].has_more:
+        last = threads[-1]
+        next_cursor = encode_cursor(last.date_posted, last.id)
+
+    return CommentPage(threads=threads, next_cursor=next_cursor)
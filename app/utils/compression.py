@@ -0,0 +1,106 @@
+# app/utils/compression.py
+
+from typing import Optional
+import gzip
+
+from flask import current_app, g, request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# text/html is left out on purpose: every page carries a CSRF token and
+# several reflect the query string, which is what BREACH needs to recover
+# the token from compressed response sizes
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/css',
+    'text/javascript',
+    'text/plain',
+    'text/xml',
+}
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """Pick the best content coding the client accepts, preferring brotli"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_bytes(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """Compress a body with the given content coding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    # mtime=0 keeps the output deterministic for identical bodies
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def decompress_bytes(data: bytes, encoding: str) -> bytes:
+    """Reverse compress_bytes"""
+    if encoding == 'br':
+        return brotli.decompress(data)
+    return gzip.decompress(data)
+
+
+def carries_csrf_token() -> bool:
+    """Whether a CSRF token was generated for, and so may be in, this response"""
+    return current_app.config.get('WTF_CSRF_FIELD_NAME', 'csrf_token') in g
+
+
+def compress_response(response):
+    """Compress buffered JSON, script and stylesheet responses above COMPRESS_MIN_SIZE"""
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or carries_csrf_token():
+        return response
+    response.vary.add('Accept-Encoding')
+
+    if (
+        not 200 <= response.status_code < 300
+        or response.status_code == 204
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+    ):
+        return response
+
+    config = current_app.config
+    data = response.get_data()
+    if len(data) < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    compressed = compress_bytes(
+        data,
+        encoding,
+        gzip_level=config['COMPRESS_GZIP_LEVEL'],
+        brotli_quality=config['COMPRESS_BROTLI_QUALITY']
+    )
+    if len(compressed) >= len(data):
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+
+    # The encoded bytes differ from the identity representation, so a strong
+    # validator must not be shared between them
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """Register response compression"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BROTLI_QUALITY', 4)
+    app.after_request(compress_response)
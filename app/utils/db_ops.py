@@ -205,4 +205,29 @@ def verify_migration_results():
         
     except Exception as e:
         current_app.logger.error(f"Verification query failed: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+
+def recompute_course_counts():
+    """Recompute university.course_count from course_requirement, returning rows corrected"""
+    try:
+        result = db.session.execute(text("""
+            UPDATE university u
+            SET course_count = COALESCE(counts.course_count, 0)
+            FROM university target
+            LEFT JOIN (
+                SELECT university_id, COUNT(DISTINCT course_id) AS course_count
+                FROM course_requirement
+                GROUP BY university_id
+            ) counts ON counts.university_id = target.id
+            WHERE u.id = target.id
+            AND u.course_count IS DISTINCT FROM COALESCE(counts.course_count, 0)
+        """))
+        db.session.commit()
+        current_app.logger.info(f"Corrected course_count on {result.rowcount} universities")
+        return result.rowcount
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error recomputing course counts: {str(e)}")
+        raise
@@ -0,0 +1,278 @@
+# app/utils/db_pool.py
+
+from collections import deque
+from typing import Any, Dict, Optional
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+POOL_MODE_INTERNAL = 'internal'
+POOL_MODE_PGBOUNCER = 'pgbouncer'
+ASYNC_WORKER_CLASSES = ('gevent', 'eventlet')
+WAIT_SAMPLE_SIZE = 1024
+# Pool size for gevent/eventlet workers when DB_POOL_SIZE is not set; their
+# worker_connections (1000 by default) counts sockets, not database work
+DEFAULT_ASYNC_POOL_SIZE = 10
+# Queries on the busiest page loaded through load_page_data (/institutions)
+DEFAULT_PAGE_DATA_MAX_QUERIES = 3
+
+
+def is_async_worker(worker_class: str) -> bool:
+    worker_class = (worker_class or 'sync').rsplit('.', 1)[-1].lower()
+    return any(name in worker_class for name in ASYNC_WORKER_CLASSES)
+
+
+def worker_concurrency(worker_class: str, threads: int, worker_connections: int) -> int:
+    """Number of requests one gunicorn worker can serve at the same time"""
+    if is_async_worker(worker_class):
+        return max(worker_connections, 1)
+    # gunicorn switches sync workers to gthread as soon as threads > 1
+    return max(threads, 1)
+
+
+def page_data_uses_threads(config: Dict[str, Any]) -> bool:
+    """Whether load_page_data can fan out onto its own pooled connections"""
+    strategy = (config.get('PAGE_DATA_STRATEGY') or 'auto').lower()
+    if strategy == 'auto':
+        # psycopg 3 pipelines on the request's own connection instead
+        uri = config.get('SQLALCHEMY_DATABASE_URI') or ''
+        return not (uri and make_url(uri).get_driver_name() == 'psycopg' and config.get('DB_PIPELINE', True))
+    return strategy == 'threads'
+
+
+def plan_pool(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Work out per-worker pool sizing from the gunicorn worker model.
+
+    Each worker gets one connection per request it can run concurrently,
+    one per page-data thread, and a little overflow for background threads,
+    clamped to its share of DB_MAX_CONNECTIONS when a server-wide budget is
+    configured. Async workers default to DB_ASYNC_POOL_SIZE requests;
+    requests beyond it wait for a connection.
+
+    Page-data threads are sized so every in-flight request can run its
+    largest page (PAGE_DATA_MAX_QUERIES) at once, and cut back to what the
+    pool can hold beyond the request connections when it is clamped or set
+    explicitly.
+    """
+    mode = (config.get('DB_POOL_MODE') or POOL_MODE_INTERNAL).lower()
+    workers = max(int(config.get('GUNICORN_WORKERS') or 1), 1)
+    concurrency = worker_concurrency(
+        config.get('GUNICORN_WORKER_CLASS'),
+        int(config.get('GUNICORN_THREADS') or 1),
+        int(config.get('GUNICORN_WORKER_CONNECTIONS') or 1)
+    )
+
+    if is_async_worker(config.get('GUNICORN_WORKER_CLASS')):
+        request_connections = min(concurrency, int(config.get('DB_ASYNC_POOL_SIZE') or DEFAULT_ASYNC_POOL_SIZE))
+    else:
+        request_connections = concurrency
+    page_data_threads = 0
+    if page_data_uses_threads(config):
+        max_queries = config.get('PAGE_DATA_MAX_QUERIES')
+        max_queries = int(max_queries) if max_queries not in (None, '') else DEFAULT_PAGE_DATA_MAX_QUERIES
+        page_data_threads = max(max_queries, 0) * request_connections
+
+    pool_size = config.get('DB_POOL_SIZE')
+    if pool_size not in (None, ''):
+        pool_size = int(pool_size)
+    else:
+        pool_size = request_connections + page_data_threads
+    max_overflow = config.get('DB_MAX_OVERFLOW')
+    max_overflow = int(max_overflow) if max_overflow not in (None, '') else 2
+
+    budget = config.get('DB_MAX_CONNECTIONS')
+    budget = int(budget) if budget not in (None, '') else None
+    clamped = False
+    if budget and mode == POOL_MODE_INTERNAL:
+        per_worker = max(budget // workers, 1)
+        if pool_size + max_overflow > per_worker:
+            clamped = True
+            pool_size = min(pool_size, per_worker)
+            max_overflow = per_worker - pool_size
+    page_data_threads = max(min(page_data_threads, pool_size + max_overflow - request_connections), 0)
+
+    return {
+        'mode': mode,
+        'workers': workers,
+        'concurrency': concurrency,
+        'page_data_threads': page_data_threads,
+        'pool_size': max(pool_size, 1),
+        'max_overflow': max(max_overflow, 0),
+        'budget': budget,
+        'clamped': clamped
+    }
+
+
+def build_engine_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Final SQLALCHEMY_ENGINE_OPTIONS for this process"""
+    plan = plan_pool(config)
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    connect_args = dict(options.get('connect_args') or {})
+
+    if plan['mode'] == POOL_MODE_PGBOUNCER:
+        # pgbouncer owns the pooling; a connection "open" is a cheap handshake
+        # with the local pooler, and holding server connections here would
+        # defeat transaction-mode multiplexing
+        options['poolclass'] = InstrumentedNullPool
+        for key in ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping'):
+            options.pop(key, None)
+        # Transaction mode hands each transaction to any server connection, so
+        # server-side prepared statements must stay off. psycopg2 never
+        # prepares server-side; psycopg 3 does after prepare_threshold runs.
+        uri = config.get('SQLALCHEMY_DATABASE_URI') or ''
+        if uri and make_url(uri).get_driver_name() == 'psycopg':
+            connect_args['prepare_threshold'] = None
+    else:
+        options['poolclass'] = InstrumentedQueuePool
+        options['pool_size'] = plan['pool_size']
+        options['max_overflow'] = plan['max_overflow']
+
+    options['connect_args'] = connect_args
+    return options
+
+
+class PoolStats:
+    """Per-process connection pool counters and checkout wait samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.slow_checkouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def record_wait(self, seconds: float, slow_threshold: Optional[float] = None):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.waits.append(seconds)
+            if slow_threshold is not None and seconds >= slow_threshold:
+                self.slow_checkouts += 1
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self.waits)
+            measured = len(waits)
+            return {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'slow_checkouts': self.slow_checkouts,
+                'wait_avg_ms': round(sum(waits) / measured * 1000, 3) if measured else 0.0,
+                'wait_p95_ms': round(waits[min(int(measured * 0.95), measured - 1)] * 1000, 3) if measured else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3)
+            }
+
+
+pool_stats = PoolStats()
+SLOW_CHECKOUT_SECONDS = 0.1
+
+
+class _CheckoutTimingMixin:
+    """Time how long callers wait for a connection from the pool."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.incr('timeouts')
+            logger.warning(f"Connection pool exhausted after {time.perf_counter() - start:.1f}s ({self.status()})")
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            pool_stats.record_wait(waited, SLOW_CHECKOUT_SECONDS)
+            if waited >= SLOW_CHECKOUT_SECONDS:
+                logger.info(f"Slow connection checkout: {waited * 1000:.1f}ms ({self.status()})")
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """QueuePool that records checkout latency."""
+
+
+class InstrumentedNullPool(_CheckoutTimingMixin, NullPool):
+    """NullPool (external pooler) that records connect latency."""
+
+
+def _on_connect(dbapi_connection, connection_record):
+    pool_stats.incr('connects')
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_stats.incr('checkouts')
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    pool_stats.incr('checkins')
+
+
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_stats.incr('invalidations')
+
+
+for _pool_class in (InstrumentedQueuePool, InstrumentedNullPool):
+    event.listen(_pool_class, 'connect', _on_connect)
+    event.listen(_pool_class, 'checkout', _on_checkout)
+    event.listen(_pool_class, 'checkin', _on_checkin)
+    event.listen(_pool_class, 'invalidate', _on_invalidate)
+
+
+def pool_status(engine) -> Dict[str, Any]:
+    """Current pool occupancy plus counters for this worker process"""
+    pool = engine.pool
+    status = {'pid': os.getpid(), 'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+        })
+    status.update(pool_stats.summary())
+    return status
+
+
+def init_app(app):
+    """Size the pool for this deployment before the engine is created"""
+    global SLOW_CHECKOUT_SECONDS
+    SLOW_CHECKOUT_SECONDS = app.config.get('DB_POOL_SLOW_CHECKOUT_MS', 100) / 1000
+    plan = plan_pool(app.config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config)
+    app.extensions['db_pool_plan'] = plan
+
+    if plan['mode'] == POOL_MODE_PGBOUNCER:
+        app.logger.info("Database pool: external pooler (pgbouncer), no in-process pooling")
+    else:
+        app.logger.info(
+            f"Database pool: {plan['pool_size']} + {plan['max_overflow']} overflow per worker "
+            f"({plan['workers']} workers, {plan['concurrency']} concurrent requests and "
+            f"{plan['page_data_threads']} page-data threads each)"
+        )
+        if plan['clamped']:
+            app.logger.warning(
+                f"Pool sizing clamped to DB_MAX_CONNECTIONS={plan['budget']}; "
+                f"requests may queue for connections under full load"
+            )
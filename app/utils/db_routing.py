@@ -0,0 +1,90 @@
+# app/utils/db_routing.py
+
+from contextlib import contextmanager
+from functools import wraps
+import time
+
+from flask import current_app, has_request_context, request
+
+from ..extensions import REPLICA_BIND, db, db_route
+
+ROUTE_PRIMARY = 'primary'
+ROUTE_REPLICA = REPLICA_BIND
+STICKY_COOKIE = 'db_primary_until'
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def replica_enabled(app=None) -> bool:
+    config = (app or current_app).config
+    return bool(config.get('SQLALCHEMY_BINDS', {}).get(REPLICA_BIND))
+
+
+def _sticky() -> bool:
+    """Whether this client wrote recently enough that the replica may lag it"""
+    if not has_request_context():
+        return False
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+@contextmanager
+def route_to(route: str):
+    """Route session reads to the primary or the replica inside the block"""
+    if route == ROUTE_REPLICA and _sticky():
+        route = ROUTE_PRIMARY
+    token = db_route.set(route)
+    try:
+        yield
+    finally:
+        db_route.reset(token)
+
+
+def _routed(route: str):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            with route_to(route):
+                return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+# Read-only POST endpoints and analysis commands
+use_replica = _routed(ROUTE_REPLICA)
+# GET endpoints that write, and loaders whose result is stamped with the
+# catalogue version (a lagging replica would pin stale data to the new version)
+use_primary = _routed(ROUTE_PRIMARY)
+
+
+def init_app(app):
+    """Send safe-method requests to the replica, with read-your-writes stickiness"""
+    if not replica_enabled(app):
+        return
+    app.logger.info("Read replica configured; GET traffic reads from the replica")
+
+    @app.before_request
+    def choose_db_route():
+        route = ROUTE_REPLICA if request.method in READ_METHODS else ROUTE_PRIMARY
+        if route == ROUTE_REPLICA and _sticky():
+            route = ROUTE_PRIMARY
+        db_route.set(route)
+
+    @app.after_request
+    def stick_to_primary(response):
+        # Keep this client's reads on the primary until the replica catches up
+        if db.session.info.get('wrote'):
+            window = app.config['DB_READ_YOUR_WRITES_SECONDS']
+            response.set_cookie(
+                STICKY_COOKIE,
+                f"{time.time() + window:.3f}",
+                max_age=int(window) + 1,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    @app.teardown_request
+    def reset_db_route(exc=None):
+        db_route.set(ROUTE_PRIMARY)
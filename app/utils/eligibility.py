@@ -0,0 +1,312 @@
+# app/utils/eligibility.py
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from flask import current_app
+from sqlalchemy import select
+import logging
+import threading
+import time
+import numpy as np
+
+from ..extensions import db
+from ..models.university import University, Course, State, ProgrammeType
+from ..models.requirement import CourseRequirement, SubjectRequirement
+from .catalogue_sync import get_catalogue_version, register_change_listener
+from .db_routing import use_primary
+from .template_cache import template_cache, UTME
+from .equivalency import equivalency_graph
+
+logger = logging.getLogger(__name__)
+
+CREDIT_GRADES = {'A1', 'B2', 'B3', 'C4', 'C5', 'C6', 'A', 'B', 'C'}
+WORD_BITS = 64
+
+
+class SubjectVocabulary:
+    """Maps normalised subject names to bit positions."""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+
+    def bit(self, name: str) -> int:
+        key = name.strip().lower()
+        if key not in self.index:
+            self.index[key] = len(self.index)
+        return self.index[key]
+
+    def lookup(self, name: str) -> Optional[int]:
+        return self.index.get(name.strip().lower())
+
+    @property
+    def words(self) -> int:
+        return max(1, (len(self.index) + WORD_BITS - 1) // WORD_BITS)
+
+
+def to_mask(bits: Iterable[int], words: int) -> np.ndarray:
+    """Pack bit positions into a fixed-width uint64 word vector"""
+    mask = np.zeros(words, dtype=np.uint64)
+    for bit in bits:
+        mask[bit // WORD_BITS] |= np.uint64(1) << np.uint64(bit % WORD_BITS)
+    return mask
+
+
+@dataclass
+class CandidateProfile:
+    """A student's O'level credits, sittings and UTME subject combination."""
+    olevel_subjects: Set[str] = field(default_factory=set)
+    utme_subjects: Set[str] = field(default_factory=set)
+    sittings: int = 1
+    state: Optional[str] = None
+    programme_type: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CandidateProfile':
+        """Build a profile from an API payload.
+
+        O'level entries may be plain subject names (assumed credit passes) or
+        ``{"subject": ..., "grade": ...}`` objects; only credit grades count.
+        """
+        olevel = set()
+        for entry in data.get('olevel_subjects') or data.get('olevel') or []:
+            if isinstance(entry, dict):
+                grade = (entry.get('grade') or '').strip().upper()
+                if grade and grade not in CREDIT_GRADES:
+                    continue
+                entry = entry.get('subject')
+            if entry and str(entry).strip():
+                olevel.add(str(entry).strip())
+
+        utme = {str(s).strip() for s in data.get('utme_subjects') or [] if s and str(s).strip()}
+
+        try:
+            sittings = int(data.get('sittings', 1))
+        except (TypeError, ValueError):
+            raise ValueError("sittings must be a number")
+        if sittings < 1:
+            raise ValueError("sittings must be at least 1")
+
+        return cls(
+            olevel_subjects=olevel,
+            utme_subjects=utme,
+            sittings=sittings,
+            state=data.get('state') or None,
+            programme_type=data.get('programme_type') or None
+        )
+
+
+@dataclass(frozen=True)
+class CompiledRequirements:
+    """Every array one catalogue version compiles to, swapped in as a unit."""
+    version: object
+    vocabulary: SubjectVocabulary
+    words: int
+    size: int
+    mandatory_masks: np.ndarray
+    optional_masks: np.ndarray
+    utme_masks: np.ndarray
+    min_credits: np.ndarray
+    max_sittings: np.ndarray
+    state_codes: Dict[str, int]
+    type_codes: Dict[str, int]
+    state_column: np.ndarray
+    type_column: np.ndarray
+    records: List[Tuple]
+
+    def __post_init__(self):
+        for array in (self.mandatory_masks, self.optional_masks, self.utme_masks, self.min_credits,
+                      self.max_sittings, self.state_column, self.type_column):
+            array.flags.writeable = False
+
+
+class EligibilityEngine:
+    """Precompiled, vectorised eligibility matching over every CourseRequirement.
+
+    Each requirement is compiled once per catalogue version into uint64
+    bitmasks of mandatory/optional O'level subjects and required UTME
+    subjects, plus credit and sitting limits. A candidate profile is then
+    evaluated against the whole catalogue with a handful of numpy operations.
+
+    Readers never take the lock: they grab the current CompiledRequirements
+    once and use only that, so a recompile can't pair new masks with old rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compiled: Optional[CompiledRequirements] = None
+
+    def normalise(self, subject: str) -> str:
+        """Normalise a subject name the same way requirement text is parsed"""
+        extractor = template_cache.get_extractor().subject_extractor
+        return extractor.normalize_subject_name(subject) or subject.strip().title()
+
+    def expand(self, subjects: Set[str]) -> Set[str]:
+        """Close candidate subjects under the subject equivalency graph"""
+        return equivalency_graph.expand_names(subjects)
+
+    def _parse_utme_subjects(self, subjects_text: Optional[str], cache: Dict) -> Set[str]:
+        if not subjects_text:
+            return set()
+        if subjects_text not in cache:
+            extractor = template_cache.get_extractor().subject_extractor
+            cache[subjects_text] = extractor.extract_subjects_from_text(subjects_text)
+        return cache[subjects_text]
+
+    def _ensure_compiled(self) -> CompiledRequirements:
+        version = get_catalogue_version()
+        compiled = self._compiled
+        if compiled is not None and compiled.version == version:
+            return compiled
+        with self._lock:
+            compiled = self._compiled
+            if compiled is None or compiled.version != version:
+                compiled = self._compile(version)
+                self._compiled = compiled
+            return compiled
+
+    @use_primary
+    def _compile(self, version) -> CompiledRequirements:
+        start_time = time.time()
+        rows = db.session.execute(
+            select(
+                CourseRequirement.id,
+                CourseRequirement.course_id,
+                CourseRequirement.university_id,
+                CourseRequirement.utme_template_id,
+                SubjectRequirement.subjects,
+                Course.course_name,
+                University.university_name,
+                State.name.label('state'),
+                ProgrammeType.name.label('programme_type')
+            )
+            .join(Course, CourseRequirement.course_id == Course.id)
+            .join(University, CourseRequirement.university_id == University.id)
+            .outerjoin(State, University.state_id == State.id)
+            .outerjoin(ProgrammeType, University.programme_type_id == ProgrammeType.id)
+            .outerjoin(SubjectRequirement, SubjectRequirement.course_requirement_id == CourseRequirement.id)
+            .order_by(CourseRequirement.id)
+        ).all()
+
+        vocabulary = SubjectVocabulary()
+        compiled = []
+        subjects_cache = {}
+        for row in rows:
+            parsed = template_cache.parsed(UTME, row.utme_template_id) or {}
+            mandatory = {vocabulary.bit(s) for s in parsed.get('mandatory_subjects', ())}
+            optional = {vocabulary.bit(s) for s in parsed.get('optional_subjects', ())}
+            utme = {vocabulary.bit(s) for s in self._parse_utme_subjects(row.subjects, subjects_cache)}
+            compiled.append((
+                mandatory, optional, utme,
+                parsed.get('min_credits', 5), parsed.get('max_sittings', 2)
+            ))
+
+        words = vocabulary.words
+        size = len(compiled)
+        mandatory_masks = np.zeros((size, words), dtype=np.uint64)
+        optional_masks = np.zeros((size, words), dtype=np.uint64)
+        utme_masks = np.zeros((size, words), dtype=np.uint64)
+        min_credits = np.zeros(size, dtype=np.int16)
+        max_sittings = np.zeros(size, dtype=np.int16)
+        for i, (mandatory, optional, utme, credits, sittings) in enumerate(compiled):
+            mandatory_masks[i] = to_mask(mandatory, words)
+            optional_masks[i] = to_mask(optional, words)
+            utme_masks[i] = to_mask(utme, words)
+            min_credits[i] = credits
+            max_sittings[i] = sittings
+
+        states = sorted({row.state for row in rows if row.state})
+        programme_types = sorted({row.programme_type for row in rows if row.programme_type})
+        state_codes = {name: i for i, name in enumerate(states)}
+        type_codes = {name: i for i, name in enumerate(programme_types)}
+
+        compiled_requirements = CompiledRequirements(
+            version=version,
+            vocabulary=vocabulary,
+            words=words,
+            size=size,
+            mandatory_masks=mandatory_masks,
+            optional_masks=optional_masks,
+            utme_masks=utme_masks,
+            min_credits=min_credits,
+            max_sittings=max_sittings,
+            state_codes=state_codes,
+            type_codes=type_codes,
+            state_column=np.array([state_codes.get(row.state, -1) for row in rows], dtype=np.int32),
+            type_column=np.array([type_codes.get(row.programme_type, -1) for row in rows], dtype=np.int32),
+            records=[
+                (row.id, row.course_id, row.course_name, row.university_id,
+                 row.university_name, row.state, row.programme_type)
+                for row in rows
+            ]
+        )
+        current_app.logger.info(
+            f"Compiled {size} course requirements over {len(vocabulary.index)} subjects "
+            f"in {time.time() - start_time:.2f}s (catalogue version {version})"
+        )
+        return compiled_requirements
+
+    def invalidate(self, *args) -> None:
+        """Force recompilation on the next evaluation"""
+        self._compiled = None
+
+    def _candidate_mask(self, compiled: CompiledRequirements, subjects: Set[str]) -> np.ndarray:
+        bits = set()
+        for subject in self.expand({self.normalise(s) for s in subjects}):
+            bit = compiled.vocabulary.lookup(subject)
+            if bit is not None:
+                bits.add(bit)
+        return to_mask(bits, compiled.words)
+
+    def evaluate(self, profile: CandidateProfile, limit: Optional[int] = None) -> Dict:
+        """Evaluate a candidate profile against every compiled requirement"""
+        compiled = self._ensure_compiled()
+        start_time = time.perf_counter()
+
+        olevel = self._candidate_mask(compiled, profile.olevel_subjects)
+        utme = self._candidate_mask(compiled, profile.utme_subjects)
+        missing_olevel = ~olevel
+        missing_utme = ~utme
+
+        eligible = ~(compiled.mandatory_masks & missing_olevel).any(axis=1)
+        eligible &= ~(compiled.utme_masks & missing_utme).any(axis=1)
+        eligible &= compiled.min_credits <= len(profile.olevel_subjects)
+        eligible &= compiled.max_sittings >= profile.sittings
+
+        if profile.state:
+            eligible &= compiled.state_column == compiled.state_codes.get(profile.state, -2)
+        if profile.programme_type:
+            eligible &= compiled.type_column == compiled.type_codes.get(profile.programme_type, -2)
+
+        indices = np.flatnonzero(eligible)
+        # Signed so that negating for a descending sort cannot wrap around
+        optional_matched = np.bitwise_count(compiled.optional_masks[indices] & olevel).sum(axis=1, dtype=np.int64)
+        order = np.argsort(-optional_matched, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+
+        results = []
+        for position in order:
+            index = int(indices[position])
+            requirement_id, course_id, course_name, university_id, university_name, state, programme_type = \
+                compiled.records[index]
+            results.append({
+                'requirement_id': requirement_id,
+                'course_id': course_id,
+                'course_name': course_name,
+                'university_id': university_id,
+                'university_name': university_name,
+                'state': state,
+                'programme_type': programme_type,
+                'optional_matched': int(optional_matched[position])
+            })
+
+        return {
+            'total': int(indices.size),
+            'evaluated': compiled.size,
+            'elapsed_ms': round((time.perf_counter() - start_time) * 1000, 3),
+            'results': results
+        }
+
+
+eligibility_engine = EligibilityEngine()
+register_change_listener(eligibility_engine.invalidate)
@@ -1,33 +1,39 @@
 # app/utils/email.py
 from flask import current_app, url_for
 from flask_mail import Message
-from ..extensions import mail
-from threading import Thread
+from .job_queue import enqueue, jobs_enabled
+from .mail_pool import mail_dispatcher, smtp_pool
 import logging
 
-def send_async_email(app, msg):
-    with app.app_context():
-        try:
-            mail.send(msg)
-            logging.info(f"Email sent successfully to {msg.recipients}")
-        except Exception as e:
-            logging.error(f"Failed to send email: {str(e)}")
+def build_message(subject, recipient, body, html=None):
+    msg = Message(
+        subject,
+        sender=current_app.config['MAIL_DEFAULT_SENDER'],
+        recipients=[recipient]
+    )
+    msg.body = body
+    if html:
+        msg.html = html
+    return msg
+
+def deliver_email(subject, recipient, body, html=None):
+    """Send an email now over a pooled SMTP session, raising on failure so the job worker can retry it"""
+    error = smtp_pool.send_batch([build_message(subject, recipient, body, html)])[0]
+    if error is not None:
+        raise error
+    logging.info(f"Email sent successfully to {recipient}")
 
 def send_email(subject, recipient, body, html=None):
     try:
-        msg = Message(
-            subject,
-            sender=current_app.config['MAIL_DEFAULT_SENDER'],
-            recipients=[recipient]
-        )
-        msg.body = body
-        if html:
-            msg.html = html
-        
-        Thread(
-            target=send_async_email,
-            args=(current_app._get_current_object(), msg)
-        ).start()
+        if jobs_enabled():
+            # Retried with backoff by the job worker if SMTP is unavailable
+            enqueue('send_email', {'subject': subject, 'recipient': recipient, 'body': body, 'html': html})
+            return
+
+        # Handed to the per-process sender threads; never waits on SMTP. A
+        # full queue drops the email (logged and counted) rather than failing
+        # the request
+        mail_dispatcher.submit(build_message(subject, recipient, body, html))
         
     except Exception as e:
         logging.error(f"Error creating email message: {str(e)}")
@@ -45,4 +51,4 @@ def send_verification_email(user_email, token):
         send_email("Verify Your Email", user_email, "Please verify your email", html)
     except Exception as e:
         logging.error(f"Error in send_verification_email: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,168 @@
+# app/utils/equivalency.py
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Union
+from sqlalchemy import select
+import logging
+import threading
+
+from ..extensions import db
+from ..models.academic import SubjectEquivalency
+from ..models.subject import Subjects
+from .catalogue_sync import get_catalogue_version, register_change_listener
+from .db_routing import use_primary
+
+logger = logging.getLogger(__name__)
+
+SubjectRef = Union[int, str]
+
+
+class UnionFind:
+    """Disjoint-set forest with path halving and union by size."""
+
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+        self.size: Dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        parent = self.parent.setdefault(item, item)
+        while parent != item:
+            grandparent = self.parent.setdefault(parent, parent)
+            self.parent[item] = grandparent
+            item, parent = parent, grandparent
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size.get(root_a, 1) < self.size.get(root_b, 1):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] = self.size.get(root_a, 1) + self.size.get(root_b, 1)
+
+
+@dataclass(frozen=True)
+class EquivalencyClosure:
+    """Components and name lookups for one catalogue version, swapped in as a unit."""
+    version: object
+    component: Dict[int, int]
+    members: Dict[int, FrozenSet[int]]
+    ids_by_name: Dict[str, int]
+    names_by_id: Dict[int, str]
+
+
+class EquivalencyGraph:
+    """Transitive closure of subject equivalencies.
+
+    Connected components are computed once per catalogue version, so
+    A ≡ B ≡ C resolves A ≡ C and every lookup is a dictionary access.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._closure: Optional[EquivalencyClosure] = None
+
+    def _ensure_loaded(self) -> EquivalencyClosure:
+        version = get_catalogue_version()
+        closure = self._closure
+        if closure is not None and closure.version == version:
+            return closure
+        with self._lock:
+            closure = self._closure
+            if closure is None or closure.version != version:
+                closure = self._load(version)
+                self._closure = closure
+            return closure
+
+    @use_primary
+    def _load(self, version) -> EquivalencyClosure:
+        subjects = db.session.execute(select(Subjects.id, Subjects.name)).all()
+        pairs = db.session.execute(
+            select(SubjectEquivalency.primary_subject_id, SubjectEquivalency.equivalent_subject_id)
+        ).all()
+
+        forest = UnionFind()
+        for primary_id, equivalent_id in pairs:
+            if primary_id is not None and equivalent_id is not None:
+                forest.union(primary_id, equivalent_id)
+
+        members: Dict[int, Set[int]] = {}
+        for subject_id in list(forest.parent):
+            members.setdefault(forest.find(subject_id), set()).add(subject_id)
+
+        component = {}
+        frozen = {}
+        for root, group in members.items():
+            group = frozenset(group)
+            frozen[root] = group
+            for subject_id in group:
+                component[subject_id] = root
+
+        logger.info(
+            f"Built subject equivalency closure: {len(pairs)} pairs, "
+            f"{len(frozen)} components (catalogue version {version})"
+        )
+        return EquivalencyClosure(
+            version=version,
+            component=component,
+            members=frozen,
+            ids_by_name={name.strip().lower(): subject_id for subject_id, name in subjects if name},
+            names_by_id={subject_id: name for subject_id, name in subjects}
+        )
+
+    def invalidate(self, *args) -> None:
+        """Force the closure to be rebuilt on the next lookup"""
+        self._closure = None
+
+    @staticmethod
+    def _resolve(closure: EquivalencyClosure, subject: SubjectRef) -> Optional[int]:
+        if isinstance(subject, int):
+            return subject
+        if subject is None:
+            return None
+        return closure.ids_by_name.get(str(subject).strip().lower())
+
+    def equivalent(self, a: SubjectRef, b: SubjectRef) -> bool:
+        """Check whether two subjects (ids or names) are in the same component"""
+        closure = self._ensure_loaded()
+        id_a, id_b = self._resolve(closure, a), self._resolve(closure, b)
+        if id_a is None or id_b is None:
+            return False
+        if id_a == id_b:
+            return True
+        root_a = closure.component.get(id_a)
+        return root_a is not None and root_a == closure.component.get(id_b)
+
+    def _equivalents(self, closure: EquivalencyClosure, subject: SubjectRef) -> FrozenSet[int]:
+        subject_id = self._resolve(closure, subject)
+        root = closure.component.get(subject_id)
+        if root is None:
+            return frozenset()
+        return closure.members[root] - {subject_id}
+
+    def equivalents(self, subject: SubjectRef) -> FrozenSet[int]:
+        """Get the ids of every subject equivalent to the given one (excluding itself)"""
+        return self._equivalents(self._ensure_loaded(), subject)
+
+    def equivalent_names(self, subject: SubjectRef) -> Set[str]:
+        """Get the names of every subject equivalent to the given one"""
+        closure = self._ensure_loaded()
+        return {
+            closure.names_by_id[subject_id]
+            for subject_id in self._equivalents(closure, subject)
+            if subject_id in closure.names_by_id
+        }
+
+    def expand_names(self, names: Iterable[str]) -> Set[str]:
+        """Close a set of subject names under equivalency"""
+        expanded = set(names)
+        for name in list(expanded):
+            expanded.update(self.equivalent_names(name))
+        return expanded
+
+
+equivalency_graph = EquivalencyGraph()
+# Committed edits to subjects or equivalencies move the catalogue version
+# (see CATALOGUE_MODELS), so every worker reloads on its next lookup
+register_change_listener(equivalency_graph.invalidate)
@@ -0,0 +1,72 @@
+# app/utils/featured.py
+
+from typing import Dict, List
+import logging
+import random
+
+from sqlalchemy import select
+
+from ..extensions import db, cache
+from ..models.university import University, State, ProgrammeType
+from .catalogue_sync import register_change_listener
+from .db_routing import use_primary
+
+logger = logging.getLogger(__name__)
+
+FEATURED_POOL_CACHE_KEY = 'featured:pool'
+FEATURED_POOL_TIMEOUT = 600
+FEATURED_LIMIT = 6
+
+
+@use_primary
+def load_featured_pool() -> List[Dict]:
+    """Load every featured institution with its course count in one query"""
+    rows = db.session.execute(
+        select(
+            University.id,
+            University.university_name,
+            State.name.label('state'),
+            ProgrammeType.name.label('programme_type'),
+            University.course_count.label('courses_count')
+        )
+        .join(State, University.state_id == State.id)
+        .join(ProgrammeType, University.programme_type_id == ProgrammeType.id)
+        .where(University.is_featured.is_(True))
+        .order_by(University.id)
+    ).all()
+
+    return [{
+        'id': row.id,
+        'name': row.university_name,
+        'state': row.state or 'Unknown',
+        'type': row.programme_type or 'Unknown',
+        'courses_count': row.courses_count
+    } for row in rows]
+
+
+def get_featured_pool() -> List[Dict]:
+    """Get the cached featured set, loading it on a miss"""
+    pool = cache.get(FEATURED_POOL_CACHE_KEY)
+    if pool is None:
+        pool = load_featured_pool()
+        cache.set(FEATURED_POOL_CACHE_KEY, pool, timeout=FEATURED_POOL_TIMEOUT)
+        logger.info(f"Cached featured pool of {len(pool)} institutions")
+    return pool
+
+
+def pick_featured(limit: int = FEATURED_LIMIT) -> List[Dict]:
+    """Pick a random rotation of featured institutions from the cached pool"""
+    pool = get_featured_pool()
+    if len(pool) <= limit:
+        picked = list(pool)
+        random.shuffle(picked)
+        return picked
+    return random.sample(pool, limit)
+
+
+def invalidate_featured(*args) -> None:
+    """Drop the cached featured set after a featured flag or catalogue change"""
+    cache.delete(FEATURED_POOL_CACHE_KEY)
+
+
+register_change_listener(invalidate_featured)
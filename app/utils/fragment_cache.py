@@ -0,0 +1,46 @@
+# app/utils/fragment_cache.py
+
+from typing import Any, Optional
+import hashlib
+
+from flask_caching.jinja2ext import make_template_fragment_key
+from flask_login import current_user
+from markupsafe import Markup
+
+from ..extensions import cache
+from .catalogue_sync import get_catalogue_version
+
+FRAGMENT_TIMEOUT = 600
+
+
+def viewer_state() -> str:
+    """Describe the viewer for fragments whose markup depends on login state"""
+    return 'auth' if current_user.is_authenticated else 'anon'
+
+
+def fragment_vary(*parts: Any) -> str:
+    """Build a compact vary key from the catalogue version and the given parts.
+
+    Catalogue changes bump the version, so stale fragments are never reused
+    and simply expire. Anything personalised (viewer state, bookmark flags)
+    must be passed in explicitly.
+    """
+    raw = '|'.join([str(get_catalogue_version())] + [repr(part) for part in parts])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def get_fragment(name: str, vary: str) -> Optional[Markup]:
+    """Get an already rendered ``{% cache %}`` fragment, or None on a miss"""
+    html = cache.get(make_template_fragment_key(name, vary_on=[vary]))
+    return Markup(html) if html is not None else None
+
+
+def init_app(app):
+    """Expose fragment cache helpers to templates"""
+    @app.context_processor
+    def inject_fragment_helpers():
+        return {
+            'FRAGMENT_TIMEOUT': FRAGMENT_TIMEOUT,
+            'fragment_vary': fragment_vary,
+            'viewer_state': viewer_state
+        }
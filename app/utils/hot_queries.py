@@ -0,0 +1,177 @@
+# app/utils/hot_queries.py
+
+from typing import Any, Dict, List, Optional
+import logging
+import re
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy.sql.elements import TextClause
+
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Same rule SQLAlchemy uses for :name bind parameters in text()
+BIND_PARAM = re.compile(r'(?<![:\w\x5c]):(\w+)(?!:)')
+
+# SQLSTATE classes meaning the statement itself can never be prepared
+# (syntax or type errors, feature not supported). Anything else, such as a
+# statement timeout or a dropped connection, is retried on a later call.
+UNPREPARABLE_SQLSTATE_CLASSES = ('0A', '42')
+
+
+def _sqlstate(error: BaseException) -> Optional[str]:
+    """The SQLSTATE of a database error raised by psycopg2 or psycopg 3"""
+    orig = getattr(error, 'orig', error)
+    return getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+
+
+class HotQuery:
+    """A hot statement built once at import and executed through the registry.
+
+    Raw SQL with declared parameter types can also run as a server-side
+    prepared statement (``PREPARE`` once per connection, then ``EXECUTE``)
+    where the deployment allows it; everything else relies on SQLAlchemy's
+    compiled cache, which a statement built once always hits.
+    """
+
+    def __init__(self, name: str, statement, param_types: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.statement = statement
+        self.param_types = param_types
+        self.preparable = isinstance(statement, TextClause) and param_types is not None
+        self._lock = threading.Lock()
+        self._compiled_for = set()
+        self.compile_seconds = 0.0
+        self.calls = 0
+        self.execute_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.prepares = 0
+        self.prepare_seconds = 0.0
+        self.prepared_calls = 0
+
+        if self.preparable:
+            names = []
+            for match in BIND_PARAM.finditer(statement.text):
+                if match.group(1) not in names:
+                    names.append(match.group(1))
+            positional = BIND_PARAM.sub(lambda m: f"${names.index(m.group(1)) + 1}", statement.text)
+            self.param_names = names
+            self.prepared_name = f"hq_{name}"
+            self.prepare_sql = (
+                f"PREPARE {self.prepared_name} ({', '.join(param_types[n] for n in names)}) AS {positional}"
+            )
+            self.execute_sql = f"EXECUTE {self.prepared_name} ({', '.join(f'%({n})s' for n in names)})"
+
+    @property
+    def sql(self) -> str:
+        return self.statement.text if isinstance(self.statement, TextClause) else str(self.statement)
+
+    def _record_compile(self, dialect) -> None:
+        """Time one compile per dialect, for reporting next to execute time"""
+        if dialect.name in self._compiled_for:
+            return
+        start = time.perf_counter()
+        self.statement.compile(dialect=dialect)
+        with self._lock:
+            self.compile_seconds += time.perf_counter() - start
+            self._compiled_for.add(dialect.name)
+
+    def execute(self, params: Optional[Dict[str, Any]] = None):
+        conn = db.session.connection()
+        self._record_compile(conn.dialect)
+        start = time.perf_counter()
+        if self.preparable and hot_queries.prepare_enabled(conn):
+            result = self._execute_prepared(conn, params or {})
+            prepared = result is not None
+        else:
+            prepared = False
+        if not prepared:
+            result = db.session.execute(self.statement, params)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.calls += 1
+            self.execute_seconds += elapsed
+            if prepared:
+                self.prepared_calls += 1
+            else:
+                cache_hit = getattr(result.context, 'cache_hit', None)
+                if cache_hit is conn.dialect.CACHE_HIT:
+                    self.cache_hits += 1
+                elif cache_hit is conn.dialect.CACHE_MISS:
+                    self.cache_misses += 1
+        return result
+
+    def _execute_prepared(self, conn, params: Dict[str, Any]):
+        # Prepared statements belong to the DBAPI connection; the info dict
+        # lives exactly as long as it does
+        prepared = conn.connection.info.setdefault('hot_queries', set())
+        if self.prepared_name not in prepared:
+            start = time.perf_counter()
+            try:
+                with conn.begin_nested():
+                    conn.exec_driver_sql(self.prepare_sql)
+            except Exception as e:
+                code = _sqlstate(e)
+                if code and code.startswith(UNPREPARABLE_SQLSTATE_CLASSES):
+                    logger.warning(f"Hot query {self.name} cannot be prepared, using plain execution: {str(e)}")
+                    self.preparable = False
+                else:
+                    logger.warning(f"Could not prepare hot query {self.name}, will retry: {str(e)}")
+                return None
+            prepared.add(self.prepared_name)
+            with self._lock:
+                self.prepares += 1
+                self.prepare_seconds += time.perf_counter() - start
+        return conn.exec_driver_sql(self.execute_sql, {n: params.get(n) for n in self.param_names})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'name': self.name,
+                'calls': self.calls,
+                'prepared_calls': self.prepared_calls,
+                'compile_ms': round(self.compile_seconds * 1000, 3),
+                'prepares': self.prepares,
+                'prepare_ms': round(self.prepare_seconds * 1000, 3),
+                'execute_avg_ms': round(self.execute_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses
+            }
+
+
+class HotQueryRegistry:
+    """Named hot statements for the search, listing and facet paths."""
+
+    def __init__(self):
+        self._queries: Dict[str, HotQuery] = {}
+
+    def register(self, name: str, statement, param_types: Optional[Dict[str, str]] = None) -> HotQuery:
+        if name in self._queries:
+            raise ValueError(f"Hot query {name} is already registered")
+        query = HotQuery(name, statement, param_types)
+        self._queries[name] = query
+        return query
+
+    def prepare_enabled(self, conn) -> bool:
+        """Server-side PREPARE only where prepared statements stay on one connection.
+
+        psycopg 3 prepares repeated statements itself, and behind a
+        transaction-mode pooler the next transaction may land elsewhere.
+        """
+        config = current_app.config
+        return (
+            config.get('DB_PREPARE_HOT_QUERIES', True)
+            and config.get('DB_POOL_MODE', 'internal') == 'internal'
+            and conn.dialect.driver == 'psycopg2'
+        )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [query.stats() for query in self._queries.values()]
+
+
+hot_queries = HotQueryRegistry()
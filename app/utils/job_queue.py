@@ -0,0 +1,370 @@
+# app/utils/job_queue.py
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from .catalogue_sync import check_catalogue_version
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+class JobSpec(NamedTuple):
+    """A registered job function and its queueing defaults."""
+    name: str
+    func: Callable[..., Any]
+    max_attempts: int
+    priority: int
+
+
+_registry: Dict[str, JobSpec] = {}
+
+
+def job(name: Optional[str] = None, max_attempts: int = 5, priority: int = 0):
+    """Register a function as a background job; its kwargs must be JSON-serialisable"""
+    def decorator(f):
+        spec = JobSpec(name or f.__name__, f, max_attempts, priority)
+        _registry[spec.name] = spec
+        f.job_name = spec.name
+        return f
+    return decorator
+
+
+def get_job(name: str) -> Optional[JobSpec]:
+    return _registry.get(name)
+
+
+def registered_jobs() -> List[str]:
+    return sorted(_registry)
+
+
+def jobs_enabled() -> bool:
+    """Whether request code should hand work to the job worker"""
+    return current_app.config.get('JOBS_ENABLED', False)
+
+
+ENQUEUE = text("""
+    INSERT INTO job (name, args, priority, max_attempts, dedupe_key, run_at, created_at)
+    VALUES (:name, CAST(:args AS JSONB), :priority, :max_attempts, :dedupe_key, :run_at, :now)
+    ON CONFLICT (dedupe_key) WHERE status = 'queued' DO NOTHING
+    RETURNING id
+""")
+
+CLAIM = text("""
+    UPDATE job
+    SET status = 'running', attempts = attempts + 1, started_at = :now,
+        heartbeat_at = :now, finished_at = NULL, locked_by = :worker
+    WHERE id = (
+        SELECT id FROM job
+        WHERE status = 'queued' AND run_at <= :now
+        ORDER BY priority DESC, run_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, name, args, attempts, max_attempts
+""")
+
+# Every update by the worker running a job checks that it still holds it;
+# one that was recovered as stale belongs to whoever claimed it next
+COMPLETE = text("""
+    UPDATE job
+    SET status = 'done', finished_at = :now, locked_by = NULL, last_error = NULL
+    WHERE id = :id AND status = 'running' AND locked_by = :worker
+    RETURNING id
+""")
+
+HEARTBEAT = text("""
+    UPDATE job
+    SET heartbeat_at = :now
+    WHERE id = :id AND status = 'running' AND locked_by = :worker
+""")
+
+# A retry is dropped when an identical job is already queued; that job
+# does the same work
+_RETRY_OR_FAIL_SQL = """
+    UPDATE job
+    SET status = CASE
+            WHEN attempts < max_attempts AND NOT EXISTS (
+                SELECT 1 FROM job queued
+                WHERE queued.dedupe_key = job.dedupe_key AND queued.status = 'queued'
+            ) THEN 'queued'
+            ELSE 'failed'
+        END,
+        run_at = :retry_at, finished_at = :now, locked_by = NULL, last_error = :error
+    WHERE id = :id AND status = 'running' AND locked_by = :worker {condition}
+    RETURNING status
+"""
+RETRY_OR_FAIL = text(_RETRY_OR_FAIL_SQL.format(condition=''))
+# Postgres re-checks the heartbeat on a row updated concurrently, so a job
+# whose worker beat in the meantime is left alone
+RECOVER_STALE = text(_RETRY_OR_FAIL_SQL.format(
+    condition="AND COALESCE(heartbeat_at, started_at) < :stale_before"
+))
+
+MARK_FAILED = text("""
+    UPDATE job
+    SET status = 'failed', finished_at = :now, locked_by = NULL, last_error = :error
+    WHERE id = :id AND status = 'running' AND locked_by = :worker
+""")
+
+# Jobs whose worker stopped sending heartbeats
+STALE_JOBS = text("""
+    SELECT id, attempts, locked_by FROM job
+    WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < :stale_before
+""")
+
+
+def enqueue(name: str, args: Optional[Dict[str, Any]] = None, *, delay: float = 0,
+            run_at: Optional[datetime] = None, priority: Optional[int] = None,
+            max_attempts: Optional[int] = None, dedupe_key: Optional[str] = None,
+            connection=None) -> Optional[int]:
+    """Queue a job and return its id, or None if an identical one is already queued.
+
+    Without a connection the job is committed straight away. Pass the
+    connection of an open transaction to queue it only if that commits.
+    """
+    spec = get_job(name)
+    if spec is None:
+        raise ValueError(f"Unknown job: {name}")
+    now = datetime.utcnow()
+    params = {
+        'name': name,
+        'args': json.dumps(args or {}),
+        'priority': spec.priority if priority is None else priority,
+        'max_attempts': spec.max_attempts if max_attempts is None else max_attempts,
+        'dedupe_key': dedupe_key,
+        'run_at': run_at or now + timedelta(seconds=delay),
+        'now': now
+    }
+    if connection is not None:
+        return connection.execute(ENQUEUE, params).scalar()
+    with db.engine.begin() as conn:
+        return conn.execute(ENQUEUE, params).scalar()
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped"""
+    base = current_app.config.get('JOB_RETRY_BASE_SECONDS', 30)
+    cap = current_app.config.get('JOB_RETRY_MAX_SECONDS', 3600)
+    return min(base * 2 ** (attempts - 1), cap) * random.uniform(0.8, 1.2)
+
+
+def _retry_or_fail(job_id: int, attempts: int, worker: str, error: str,
+                   stale_before: Optional[datetime] = None) -> Optional[str]:
+    """Requeue or fail a job held by ``worker``; None if it no longer holds it.
+
+    With ``stale_before``, only if its heartbeat is older than that.
+    """
+    now = datetime.utcnow()
+    params = {
+        'id': job_id,
+        'worker': worker,
+        'now': now,
+        'retry_at': now + timedelta(seconds=retry_delay(attempts)),
+        'error': error[:2000],
+        'stale_before': stale_before
+    }
+    statement = RETRY_OR_FAIL if stale_before is None else RECOVER_STALE
+    try:
+        with db.engine.begin() as conn:
+            return conn.execute(statement, params).scalar()
+    except IntegrityError:
+        # An identical job was queued while this one was being retried
+        with db.engine.begin() as conn:
+            conn.execute(MARK_FAILED, params)
+        return STATUS_FAILED
+
+
+def queue_stats() -> Dict[str, Any]:
+    """Queue depth, lag and the last day's outcomes and durations per job"""
+    now = datetime.utcnow()
+    rows = db.session.execute(text("""
+        SELECT name,
+               COUNT(*) FILTER (WHERE status = 'queued') AS queued,
+               COUNT(*) FILTER (WHERE status = 'queued' AND run_at <= :now) AS due,
+               COUNT(*) FILTER (WHERE status = 'running') AS running,
+               COUNT(*) FILTER (WHERE status = 'done' AND finished_at > :since) AS done_24h,
+               COUNT(*) FILTER (WHERE status = 'failed' AND finished_at > :since) AS failed_24h,
+               AVG(EXTRACT(EPOCH FROM finished_at - started_at) * 1000)
+                   FILTER (WHERE status = 'done' AND finished_at > :since) AS avg_ms,
+               MAX(EXTRACT(EPOCH FROM finished_at - started_at) * 1000)
+                   FILTER (WHERE status = 'done' AND finished_at > :since) AS max_ms,
+               EXTRACT(EPOCH FROM :now - MIN(run_at) FILTER (WHERE status = 'queued' AND run_at <= :now)) AS lag_seconds
+        FROM job
+        GROUP BY name
+        ORDER BY name
+    """), {'now': now, 'since': now - timedelta(days=1)}).mappings().all()
+
+    return {
+        'jobs': {
+            row['name']: {
+                'queued': row['queued'],
+                'due': row['due'],
+                'running': row['running'],
+                'done_24h': row['done_24h'],
+                'failed_24h': row['failed_24h'],
+                'avg_ms': round(float(row['avg_ms']), 1) if row['avg_ms'] is not None else None,
+                'max_ms': round(float(row['max_ms']), 1) if row['max_ms'] is not None else None,
+                'lag_seconds': round(float(row['lag_seconds']), 1) if row['lag_seconds'] is not None else 0
+            }
+            for row in rows
+        },
+        'registered': registered_jobs(),
+        'schedule': current_app.config.get('JOB_SCHEDULE', {})
+    }
+
+
+class JobWorker:
+    """Claims due jobs one at a time and runs them until stopped.
+
+    Several workers, on one or more hosts, can share the queue: claims use
+    FOR UPDATE SKIP LOCKED, so each job is handed to exactly one of them.
+    """
+
+    def __init__(self, app, worker_id: Optional[str] = None):
+        self.app = app
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = app.config.get('JOB_POLL_INTERVAL', 1.0)
+        self._stopping = False
+        self._maintained_at = 0.0
+        self.stats = {'succeeded': 0, 'retried': 0, 'failed': 0, 'lost': 0}
+
+    def stop(self, *args) -> None:
+        """Finish the current job, then exit"""
+        self._stopping = True
+
+    def run(self, burst: bool = False) -> Dict[str, int]:
+        """Run jobs until stopped; with burst, only until the queue is empty"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info(f"Job worker {self.worker_id} started with {len(_registry)} job types")
+
+        while not self._stopping:
+            with self.app.app_context():
+                try:
+                    check_catalogue_version()
+                    self._maintain()
+                    claimed = self._claim()
+                    if claimed is not None:
+                        self._run(claimed)
+                except Exception as e:
+                    # Lost database connections and the like; back off and carry on
+                    logger.error(f"Job worker error: {str(e)}")
+                    claimed = None
+                    time.sleep(self.poll_interval)
+                finally:
+                    db.session.remove()
+
+            if claimed is None:
+                if burst:
+                    break
+                time.sleep(self.poll_interval)
+
+        logger.info(f"Job worker {self.worker_id} stopped: {self.stats}")
+        return self.stats
+
+    def _claim(self):
+        with db.engine.begin() as conn:
+            return conn.execute(CLAIM, {'now': datetime.utcnow(), 'worker': self.worker_id}).mappings().first()
+
+    @contextmanager
+    def _heartbeat(self, job_id: int):
+        """Keep the claim on a job fresh while it runs, so it is not recovered as stale"""
+        engine = db.engine
+        interval = self.app.config.get('JOB_HEARTBEAT_INTERVAL', 30)
+        done = threading.Event()
+
+        def beat():
+            while not done.wait(interval):
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(HEARTBEAT, {'id': job_id, 'worker': self.worker_id, 'now': datetime.utcnow()})
+                except Exception as e:
+                    logger.warning(f"Heartbeat for job {job_id} failed: {str(e)}")
+
+        thread = threading.Thread(target=beat, name=f'job-heartbeat-{job_id}', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def _run(self, claimed) -> None:
+        spec = get_job(claimed['name'])
+        start = time.perf_counter()
+        try:
+            if spec is None:
+                raise LookupError(f"Unknown job: {claimed['name']}")
+            with self._heartbeat(claimed['id']):
+                spec.func(**claimed['args'])
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            status = _retry_or_fail(
+                claimed['id'], claimed['attempts'], self.worker_id, f"{type(e).__name__}: {str(e)}"
+            )
+            if status is None:
+                self.stats['lost'] += 1
+            else:
+                self.stats['retried' if status == STATUS_QUEUED else 'failed'] += 1
+            logger.error(
+                f"Job {claimed['id']} {claimed['name']} failed on attempt "
+                f"{claimed['attempts']}/{claimed['max_attempts']} ({status or 'taken over'}): {str(e)}"
+            )
+            return
+
+        with db.engine.begin() as conn:
+            completed = conn.execute(
+                COMPLETE, {'id': claimed['id'], 'worker': self.worker_id, 'now': datetime.utcnow()}
+            ).scalar()
+        if completed is None:
+            self.stats['lost'] += 1
+            logger.warning(f"Job {claimed['id']} {claimed['name']} finished after another worker took it over")
+            return
+        self.stats['succeeded'] += 1
+        logger.info(f"Job {claimed['id']} {claimed['name']} done in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def _maintain(self) -> None:
+        """Queue scheduled jobs and requeue jobs whose worker died"""
+        interval = self.app.config.get('JOB_MAINTENANCE_INTERVAL', 10)
+        if time.monotonic() - self._maintained_at < interval:
+            return
+        self._maintained_at = time.monotonic()
+
+        now = time.time()
+        for name, every in self.app.config.get('JOB_SCHEDULE', {}).items():
+            if not every or get_job(name) is None:
+                continue
+            # The next slot is the same on every worker, and the dedupe key
+            # keeps it queued once
+            slot = (int(now // every) + 1) * every
+            enqueue(name, run_at=datetime.utcfromtimestamp(slot), dedupe_key=f"schedule:{name}")
+
+        stale_before = datetime.utcnow() - timedelta(seconds=self.app.config.get('JOB_LOCK_TIMEOUT', 300))
+        with db.engine.begin() as conn:
+            stale = conn.execute(STALE_JOBS, {'stale_before': stale_before}).all()
+        for job_id, attempts, worker in stale:
+            status = _retry_or_fail(
+                job_id, attempts, worker, 'Worker stopped before the job finished', stale_before=stale_before
+            )
+            if status is not None:
+                logger.warning(f"Recovered stale job {job_id} from {worker} ({status})")
@@ -0,0 +1,274 @@
+# app/utils/mail_pool.py
+
+from typing import Any, Dict, List, Optional
+import atexit
+import logging
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+
+from flask import current_app
+from flask_mail import Connection, Message
+
+logger = logging.getLogger(__name__)
+
+# Replies that will not succeed on a retry: bad recipient, sender or content
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPNotSupportedError)
+
+
+def is_permanent(error: BaseException) -> bool:
+    if isinstance(error, PERMANENT_ERRORS):
+        return True
+    code = getattr(error, 'smtp_code', None)
+    return isinstance(code, int) and 500 <= code < 600
+
+
+class PooledConnection(Connection):
+    """Flask-Mail connection that stays open across sends and times out."""
+
+    def __init__(self, state, timeout: float):
+        super().__init__(state)
+        self.timeout = timeout
+        self.opened_at = time.monotonic()
+        self.used_at = self.opened_at
+
+    def configure_host(self):
+        # Flask-Mail opens sockets without a timeout; a stalled server would
+        # hang the sending thread forever. Also called by Flask-Mail itself
+        # when a session reaches MAIL_MAX_EMAILS.
+        mail_stats.incr('connections_opened')
+        if self.mail.use_ssl:
+            host = smtplib.SMTP_SSL(self.mail.server, self.mail.port, timeout=self.timeout)
+        else:
+            host = smtplib.SMTP(self.mail.server, self.mail.port, timeout=self.timeout)
+        host.set_debuglevel(int(self.mail.debug))
+        if self.mail.use_tls:
+            host.starttls()
+        if self.mail.username and self.mail.password:
+            host.login(self.mail.username, self.mail.password)
+        return host
+
+    def close(self) -> None:
+        try:
+            if self.host is not None:
+                self.host.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.host = None
+
+
+class MailStats:
+    """Per-process delivery counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {
+            'submitted': 0, 'sent': 0, 'failed': 0, 'overflow': 0, 'retries': 0,
+            'batches': 0, 'connections_opened': 0, 'send_ms_total': 0.0
+        }
+
+    def incr(self, name: str, amount=1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        send_ms = counts.pop('send_ms_total')
+        counts['avg_send_ms'] = round(send_ms / counts['sent'], 2) if counts['sent'] else None
+        counts['avg_batch_size'] = round(counts['sent'] / counts['batches'], 2) if counts['batches'] else None
+        return counts
+
+
+mail_stats = MailStats()
+
+
+class SMTPPool:
+    """Keeps SMTP sessions open so messages skip the connect, TLS and login.
+
+    Idle sessions are closed after MAIL_POOL_IDLE_SECONDS, before the
+    server drops them; Flask-Mail starts a new session every MAIL_MAX_EMAILS
+    messages if that is set.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle: List[PooledConnection] = []
+        self._pid = os.getpid()
+
+    def _open(self) -> PooledConnection:
+        connection = PooledConnection(current_app.extensions['mail'], current_app.config.get('MAIL_TIMEOUT', 10))
+        connection.__enter__()
+        return connection
+
+    def checkout(self) -> PooledConnection:
+        idle_limit = current_app.config.get('MAIL_POOL_IDLE_SECONDS', 60)
+        with self._lock:
+            if self._pid != os.getpid():
+                # Sessions inherited across a fork belong to the parent
+                self._idle, self._pid = [], os.getpid()
+            while self._idle:
+                connection = self._idle.pop()
+                if time.monotonic() - connection.used_at < idle_limit:
+                    return connection
+                connection.close()
+        return self._open()
+
+    def checkin(self, connection: PooledConnection) -> None:
+        connection.used_at = time.monotonic()
+        with self._lock:
+            if len(self._idle) < current_app.config.get('MAIL_POOL_SIZE', 2):
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def close_idle(self) -> None:
+        """Close sessions that have been idle too long"""
+        idle_limit = current_app.config.get('MAIL_POOL_IDLE_SECONDS', 60)
+        with self._lock:
+            expired = [c for c in self._idle if time.monotonic() - c.used_at >= idle_limit]
+            self._idle = [c for c in self._idle if c not in expired]
+        for connection in expired:
+            connection.close()
+
+    def send_batch(self, messages: List[Message]) -> List[Optional[BaseException]]:
+        """Send messages over one pooled session, retrying transient failures.
+
+        Returns one entry per message: None when sent, else the final error.
+        """
+        max_attempts = current_app.config.get('MAIL_MAX_ATTEMPTS', 3)
+        backoff = current_app.config.get('MAIL_RETRY_BACKOFF', 0.5)
+        results: List[Optional[BaseException]] = [None] * len(messages)
+        pending = list(range(len(messages)))
+        attempt = 1
+        mail_stats.incr('batches')
+
+        while pending:
+            connection = None
+            try:
+                connection = self.checkout()
+                while pending:
+                    start = time.perf_counter()
+                    try:
+                        connection.send(messages[pending[0]])
+                    except Exception as e:
+                        if not is_permanent(e):
+                            raise
+                        results[pending[0]] = e
+                        mail_stats.incr('failed')
+                        logger.error(f"Email to {messages[pending[0]].recipients} rejected: {str(e)}")
+                    else:
+                        mail_stats.incr('sent')
+                        mail_stats.incr('send_ms_total', (time.perf_counter() - start) * 1000)
+                    pending.pop(0)
+                self.checkin(connection)
+            except Exception as e:
+                # The session is in an unknown state; drop it
+                if connection is not None:
+                    connection.close()
+                if attempt >= max_attempts:
+                    for index in pending:
+                        results[index] = e
+                    mail_stats.incr('failed', len(pending))
+                    logger.error(f"Giving up on {len(pending)} emails after {attempt} attempts: {str(e)}")
+                    break
+                mail_stats.incr('retries')
+                delay = backoff * 2 ** (attempt - 1) * random.uniform(0.8, 1.2)
+                logger.warning(f"SMTP error, retrying {len(pending)} emails in {delay:.2f}s: {str(e)}")
+                time.sleep(delay)
+                attempt += 1
+        return results
+
+
+smtp_pool = SMTPPool()
+
+
+class MailDispatcher:
+    """Bounded in-process queue drained in batches by a few sender threads.
+
+    submit() never waits on the mail server, so a request's latency does
+    not depend on SMTP. When the queue is full the message is refused
+    rather than blocking the request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._pid = None
+        self._threads: List[threading.Thread] = []
+
+    def _ensure_started(self, app) -> queue.Queue:
+        with self._lock:
+            if self._queue is None or self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=app.config.get('MAIL_QUEUE_SIZE', 1000))
+                self._pid = os.getpid()
+                self._threads = [
+                    threading.Thread(target=self._sender, args=(app, self._queue), name=f'mail-sender-{i}', daemon=True)
+                    for i in range(app.config.get('MAIL_SENDER_THREADS', 2))
+                ]
+                for thread in self._threads:
+                    thread.start()
+                atexit.register(self.drain, app.config.get('MAIL_DRAIN_SECONDS', 5))
+            return self._queue
+
+    def submit(self, message: Message) -> bool:
+        """Queue a message for delivery; False if the queue is full"""
+        pending = self._ensure_started(current_app._get_current_object())
+        try:
+            pending.put_nowait(message)
+        except queue.Full:
+            mail_stats.incr('overflow')
+            logger.error(f"Mail queue full, dropping email to {message.recipients}")
+            return False
+        mail_stats.incr('submitted')
+        return True
+
+    def _sender(self, app, pending: queue.Queue) -> None:
+        batch_size = app.config.get('MAIL_BATCH_SIZE', 20)
+        idle_seconds = app.config.get('MAIL_POOL_IDLE_SECONDS', 60)
+        with app.app_context():
+            while True:
+                try:
+                    batch = [pending.get(timeout=idle_seconds)]
+                except queue.Empty:
+                    smtp_pool.close_idle()
+                    continue
+                # Whatever else is already waiting goes over the same session
+                while len(batch) < batch_size:
+                    try:
+                        batch.append(pending.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    smtp_pool.send_batch(batch)
+                except Exception as e:
+                    logger.error(f"Mail sender error: {str(e)}")
+                finally:
+                    for _ in batch:
+                        pending.task_done()
+
+    def drain(self, timeout: float) -> None:
+        """Give queued messages a chance to go out before the process exits"""
+        pending = self._queue
+        deadline = time.monotonic() + timeout
+        while pending is not None and pending.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        pending = self._queue
+        return dict(
+            mail_stats.summary(),
+            pid=os.getpid(),
+            queued=pending.qsize() if pending is not None and self._pid == os.getpid() else 0,
+            idle_connections=smtp_pool.idle_count()
+        )
+
+
+mail_dispatcher = MailDispatcher()
@@ -0,0 +1,131 @@
+# app/utils/page_data.py
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+
+from ..extensions import db
+from .db_pool import plan_pool
+from .hot_queries import HotQuery
+from .pipeline import pipeline_enabled, run_pipelined
+from .query_budget import current_budget_ms, record_overrun
+
+logger = logging.getLogger('query_timing')
+
+STRATEGY_AUTO = 'auto'
+STRATEGY_PIPELINE = 'pipeline'
+STRATEGY_THREADS = 'threads'
+STRATEGY_SEQUENTIAL = 'sequential'
+
+
+class PageQuery(NamedTuple):
+    """One independent query a view needs, and how to shape its rows."""
+    name: str
+    statement: Any  # Select, TextClause or HotQuery
+    params: Optional[Dict[str, Any]] = None
+    shape: str = 'all'  # 'all', 'scalars', 'scalar' or 'dict'
+
+
+def _shape(rows: List, shape: str) -> Any:
+    if shape == 'scalars':
+        return [row[0] for row in rows]
+    if shape == 'scalar':
+        return rows[0][0] if rows else None
+    if shape == 'dict':
+        return {row[0]: row[1] for row in rows}
+    return rows
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_executor_pid = None
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Process-wide executor, created lazily so forked workers get their own"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='page-data')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _run_on_own_connection(engine, statement, params, budget_ms):
+    """Run one read on a separately pooled connection, fetching every row"""
+    with engine.begin() as conn:
+        if budget_ms is not None:
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(budget_ms)}")
+        return conn.execute(statement, params).all()
+
+
+def page_data_threads() -> int:
+    """Executor size budgeted for this worker by the pool plan"""
+    plan = current_app.extensions.get('db_pool_plan') or plan_pool(current_app.config)
+    return plan['page_data_threads']
+
+
+def choose_strategy(queries: Sequence[PageQuery]) -> str:
+    session = db.session()
+    if len(queries) < 2 or session.info.get('wrote') or session.new or session.dirty or session.deleted:
+        # Other connections cannot see this session's uncommitted writes
+        return STRATEGY_SEQUENTIAL
+    strategy = current_app.config.get('PAGE_DATA_STRATEGY', STRATEGY_AUTO)
+    if strategy == STRATEGY_AUTO:
+        strategy = STRATEGY_PIPELINE if pipeline_enabled(session.get_bind()) else STRATEGY_THREADS
+    if strategy == STRATEGY_THREADS and not page_data_threads():
+        # The pool has no connections to spare beyond the requests' own
+        return STRATEGY_SEQUENTIAL
+    return strategy
+
+
+def load_page_data(queries: Sequence[PageQuery]) -> Dict[str, Any]:
+    """Run a view's independent queries together and return results by name.
+
+    On psycopg 3 they are pipelined over the session's connection. Otherwise
+    they run concurrently on separate pooled connections, so page latency
+    is roughly the slowest query rather than the sum of all of them.
+    """
+    strategy = choose_strategy(queries)
+    start = time.perf_counter()
+
+    if strategy == STRATEGY_PIPELINE:
+        results = run_pipelined([(q.statement, q.params) for q in queries])
+        rows = [result.all() for result in results]
+    elif strategy == STRATEGY_THREADS:
+        rows = _load_concurrently(queries)
+    else:
+        rows = [
+            (q.statement.execute(q.params) if isinstance(q.statement, HotQuery)
+             else db.session.execute(q.statement, q.params)).all()
+            for q in queries
+        ]
+
+    logger.debug(f"Loaded {len(queries)} page queries ({strategy}) in {(time.perf_counter() - start) * 1000:.1f}ms")
+    return {q.name: _shape(r, q.shape) for q, r in zip(queries, rows)}
+
+
+def _load_concurrently(queries: Sequence[PageQuery]) -> List[List]:
+    executor = _get_executor(page_data_threads())
+    # Context variables do not follow work into the pool: resolve the bind
+    # (primary or replica) and the statement budget here
+    budget_ms = current_budget_ms()
+    futures = []
+    for q in queries:
+        statement = q.statement.statement if isinstance(q.statement, HotQuery) else q.statement
+        engine = db.session.get_bind(clause=statement)
+        futures.append(executor.submit(_run_on_own_connection, engine, statement, q.params, budget_ms))
+
+    rows = []
+    for future in futures:
+        try:
+            rows.append(future.result())
+        except Exception as e:
+            record_overrun(getattr(e, 'orig', e), getattr(e, 'statement', None))
+            raise
+    return rows
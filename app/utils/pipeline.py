@@ -0,0 +1,81 @@
+# app/utils/pipeline.py
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from flask import current_app
+
+from ..extensions import db
+from .hot_queries import HotQuery
+from .query_budget import record_overrun
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineResult:
+    """Rows from one pipelined statement, with the Result accessors views use."""
+
+    __slots__ = ('rows',)
+
+    def __init__(self, rows: List[Tuple]):
+        self.rows = rows
+
+    def all(self) -> List[Tuple]:
+        return self.rows
+
+    def scalars(self) -> 'PipelineResult':
+        return PipelineResult([row[0] for row in self.rows])
+
+    def scalar(self) -> Any:
+        return self.rows[0][0] if self.rows else None
+
+
+def pipeline_enabled(bind) -> bool:
+    """Whether statements on this connection or engine can be pipelined"""
+    return bind.dialect.driver == 'psycopg' and current_app.config.get('DB_PIPELINE', True)
+
+
+def compile_statement(statement, params: Optional[Dict[str, Any]], dialect) -> Tuple[str, Dict[str, Any]]:
+    """Compile to driver SQL with expanding (IN) parameters rendered"""
+    expanded = statement.compile(dialect=dialect).construct_expanded_state(params or None)
+    return expanded.statement, expanded.parameters
+
+
+def run_pipelined(queries: Sequence[Tuple[Any, Optional[Dict[str, Any]]]]) -> List[Any]:
+    """Run independent read statements with one round trip where possible.
+
+    Takes (statement or HotQuery, params) pairs. On psycopg 3 they are sent
+    together in pipeline mode on the session's connection and awaited once;
+    on other drivers they run one after another. Results come back in order.
+    """
+    conn = db.session.connection()
+    if not pipeline_enabled(conn):
+        return [
+            query.execute(params) if isinstance(query, HotQuery) else db.session.execute(query, params)
+            for query, params in queries
+        ]
+
+    compiled = [
+        compile_statement(query.statement if isinstance(query, HotQuery) else query, params, conn.dialect)
+        for query, params in queries
+    ]
+    driver_connection = conn.connection.driver_connection
+    binary = current_app.config.get('DB_BINARY_PROTOCOL', True)
+
+    cursors = []
+    try:
+        with driver_connection.pipeline():
+            for sql, params in compiled:
+                cursor = driver_connection.cursor(binary=binary)
+                cursor.execute(sql, params)
+                cursors.append(cursor)
+    except Exception as e:
+        # Driver errors bypass the engine's handle_error hook
+        record_overrun(e, '; '.join(sql for sql, _ in compiled))
+        raise
+    # Leaving the block syncs the pipeline; every result is now buffered
+    results = []
+    for cursor in cursors:
+        results.append(PipelineResult(cursor.fetchall()))
+        cursor.close()
+    return results
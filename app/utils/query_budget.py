@@ -0,0 +1,133 @@
+# app/utils/query_budget.py
+
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..extensions import RoutingSession, db
+
+logger = logging.getLogger('query_timing')
+
+QUERY_CANCELED = '57014'  # SQLSTATE raised when statement_timeout fires
+DEGRADED_HEADER = 'X-Degraded'
+
+_budget_ms: ContextVar[Optional[int]] = ContextVar('query_budget_ms', default=None)
+
+
+class BudgetStats:
+    """Per-process request, overrun and fallback counts by budget class."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {'requests': 0, 'overruns': 0, 'fallbacks': 0})
+
+    def incr(self, budget: str, name: str):
+        with self._lock:
+            self._counts[budget][name] += 1
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {budget: dict(counts) for budget, counts in self._counts.items()}
+
+
+budget_stats = BudgetStats()
+
+
+def query_budget(name: str, fallback: Optional[Callable[..., Any]] = None):
+    """Run a view under the named statement_timeout budget.
+
+    When a statement overruns and the view ends in a server error, the
+    optional fallback is called with the view's arguments and its response
+    is served instead, marked with an ``X-Degraded`` header.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            response = current_app.make_response(f(*args, **kwargs))
+            if fallback is None or not g.get('query_budget_overrun') or response.status_code < 500:
+                return response
+
+            # The timed-out transaction is aborted; start clean for the fallback
+            db.session.rollback()
+            try:
+                degraded = current_app.make_response(fallback(*args, **kwargs))
+            except Exception as e:
+                current_app.logger.error(f"Fallback for {request.endpoint} failed: {str(e)}")
+                return response
+            budget_stats.incr(name, 'fallbacks')
+            degraded.headers[DEGRADED_HEADER] = 'statement-timeout'
+            return degraded
+
+        decorated_function.query_budget = name
+        return decorated_function
+    return decorator
+
+
+def current_budget_ms() -> Optional[int]:
+    """statement_timeout budget of the current request, if any"""
+    return _budget_ms.get()
+
+
+def budget_exceeded(exception: BaseException) -> bool:
+    """Whether a DBAPI error is Postgres cancelling a statement on timeout"""
+    code = getattr(exception, 'pgcode', None) or getattr(exception, 'sqlstate', None)
+    return code == QUERY_CANCELED
+
+
+def _apply_budget(session, transaction, connection):
+    budget = _budget_ms.get()
+    if budget is not None:
+        # SET LOCAL ends with the transaction, so it is also safe behind a
+        # transaction-mode pooler
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(budget)}")
+
+
+def record_overrun(exception: BaseException, statement: Optional[str] = None) -> bool:
+    """Count a statement_timeout cancellation against the current request's budget"""
+    if not has_request_context() or not budget_exceeded(exception):
+        return False
+    name = g.get('query_budget', 'default')
+    g.query_budget_overrun = True
+    budget_stats.incr(name, 'overruns')
+    logger.warning(
+        f"Query budget '{name}' ({_budget_ms.get()}ms) exceeded on {request.endpoint}: "
+        f"{(statement or '')[:200]}"
+    )
+    return True
+
+
+def _record_overrun(context):
+    record_overrun(context.original_exception, context.statement)
+
+
+def init_app(app):
+    """Give every request a statement_timeout from its budget class"""
+    budgets = app.config['QUERY_BUDGETS_MS']
+
+    if not event.contains(RoutingSession, 'after_begin', _apply_budget):
+        event.listen(RoutingSession, 'after_begin', _apply_budget)
+    if not event.contains(Engine, 'handle_error', _record_overrun):
+        event.listen(Engine, 'handle_error', _record_overrun)
+
+    @app.before_request
+    def choose_query_budget():
+        if request.endpoint == 'static':
+            return
+        view = app.view_functions.get(request.endpoint)
+        name = getattr(view, 'query_budget', None)
+        if name is None:
+            name = 'admin' if request.blueprint == 'admin' else 'default'
+        g.query_budget = name
+        budget_stats.incr(name, 'requests')
+        _budget_ms.set(budgets.get(name, budgets['default']))
+
+    @app.teardown_request
+    def reset_query_budget(exc=None):
+        _budget_ms.set(None)
@@ -0,0 +1,97 @@
+# app/utils/query_normalize.py
+
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import threading
+
+# Words that never narrow a course or institution search. plainto_tsquery
+# already drops these, so stripping them only affects the ILIKE match and
+# the cache key.
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'at', 'by', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'
+})
+
+_synonyms: Optional[Dict[Tuple[str, ...], Tuple[str, ...]]] = None
+_synonyms_lock = threading.Lock()
+_longest_alias = 1
+
+
+def _build_synonyms() -> Dict[Tuple[str, ...], Tuple[str, ...]]:
+    """Map alias token sequences to their standard subject name.
+
+    Only aliases that spell out the same subject are used (maths, econs,
+    eng lang). Bare prefixes such as eng or bio are skipped because a
+    substring match already finds the full name and they also start other
+    subjects (engineering, biochemistry); aliases for a different subject
+    (agric, commerce) are skipped because they would change the results.
+    """
+    from .extract_normalize import SubjectExtractor
+
+    # The aliases do not depend on the classification data
+    extractor = SubjectExtractor(json_data={'subject_classifications': {}})
+    synonyms = {}
+    for standard_name, aliases in extractor.subject_aliases.items():
+        standard = standard_name.replace('_', ' ')
+        for alias in aliases:
+            alias = alias.casefold()
+            if alias[:3] != standard[:3] or standard.startswith(alias) or alias == standard:
+                continue
+            # Queries lose their stopwords before synonyms are matched
+            key = tuple(token for token in alias.split() if token not in STOPWORDS)
+            synonyms[key] = tuple(standard.split())
+    return synonyms
+
+
+def _get_synonyms() -> Dict[Tuple[str, ...], Tuple[str, ...]]:
+    global _synonyms, _longest_alias
+    if _synonyms is None:
+        with _synonyms_lock:
+            if _synonyms is None:
+                synonyms = _build_synonyms()
+                _longest_alias = max((len(alias) for alias in synonyms), default=1)
+                _synonyms = synonyms
+    return _synonyms
+
+
+def query_tokens(query: Optional[str]) -> List[str]:
+    """Case-fold, split, drop stopwords and map subject aliases to standard names"""
+    tokens = (query or '').casefold().split()
+    kept = [token for token in tokens if token not in STOPWORDS]
+    if not kept:
+        # A query made only of stopwords still has to match something
+        kept = tokens
+
+    synonyms = _get_synonyms()
+    result = []
+    i = 0
+    while i < len(kept):
+        for size in range(min(_longest_alias, len(kept) - i), 0, -1):
+            standard = synonyms.get(tuple(kept[i:i + size]))
+            if standard is not None:
+                result.extend(standard)
+                i += size
+                break
+        else:
+            result.append(kept[i])
+            i += 1
+    return result
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """Canonical form of a search query, e.g. ' The  MATHS ' -> 'mathematics'"""
+    return ' '.join(query_tokens(query))
+
+
+def like_pattern(query: Optional[str]) -> str:
+    """ILIKE pattern for a normalised query that tolerates the stripped stopwords"""
+    return '%' + '%'.join(query_tokens(query)) + '%'
+
+
+def search_key(namespace: str, query: Optional[str], *filters: Any) -> str:
+    """Hashed cache key shared by every spelling of the same logical search.
+
+    The query is normalised; filters are passed as-is and should already be
+    in a canonical order (sort multi-value filters).
+    """
+    raw = '|'.join([normalize_query(query)] + [repr(value) for value in filters])
+    return f"{namespace}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
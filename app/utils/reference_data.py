@@ -0,0 +1,144 @@
+# app/utils/reference_data.py
+
+from typing import Dict, Optional
+from dataclasses import dataclass
+from flask import Response, request
+import hashlib
+import logging
+import threading
+
+from .catalogue_sync import get_catalogue_version, register_change_listener
+from .serialization import encode_json
+from .snapshot import get_catalogue_snapshot
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_MAX_AGE = 3600
+
+
+@dataclass(frozen=True)
+class EncodedPayload:
+    """A pre-serialised JSON body with its strong ETag."""
+    body: bytes
+    etag: str
+    status: int = 200
+
+
+def encode_payload(payload, status: int = 200) -> EncodedPayload:
+    """Serialise a payload once and derive a strong ETag from its bytes"""
+    body = encode_json(payload)
+    return EncodedPayload(
+        body=body,
+        etag=hashlib.sha1(body).hexdigest(),
+        status=status
+    )
+
+
+def encoded_response(encoded: EncodedPayload, max_age: int = REFERENCE_MAX_AGE) -> Response:
+    """Serve pre-encoded bytes, answering conditional requests with 304.
+
+    Uses weak comparison so compressed variants of the body still validate.
+    """
+    if encoded.status == 200 and request.if_none_match.contains_weak(encoded.etag):
+        response = Response(status=304)
+    else:
+        response = Response(encoded.body, status=encoded.status, mimetype='application/json')
+    if encoded.status == 200:
+        response.set_etag(encoded.etag)
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    return response
+
+
+class ReferenceData:
+    """Locations and programme type payloads, encoded once per catalogue version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._locations: Optional[EncodedPayload] = None
+        self._programme_types: Optional[EncodedPayload] = None
+        self._programme_types_by_state: Dict[str, EncodedPayload] = {}
+
+    def _ensure_loaded(self) -> None:
+        version = get_catalogue_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            self._load(version)
+
+    def _load(self, version) -> None:
+        # Read from the catalogue snapshot, which every worker maps from the
+        # same published files, rather than querying per worker
+        snapshot = get_catalogue_snapshot()
+        states = [name for name in snapshot.strings['state_names'] if name]
+        if states:
+            locations = encode_payload(["ALL"] + states)
+        else:
+            locations = encode_payload({
+                "status": "error",
+                "message": "No states available in the database"
+            }, status=404)
+
+        def programme_type(code):
+            return {
+                'name': snapshot.strings['type_names'][code],
+                'category': snapshot.strings['type_categories'][code],
+                'institution_type': snapshot.strings['type_institution_types'][code]
+            }
+
+        type_total = len(snapshot.strings['type_names'])
+        if type_total:
+            all_types = encode_payload({
+                "status": "success",
+                "data": [programme_type(code) for code in range(type_total)]
+            })
+        else:
+            all_types = encode_payload({
+                "status": "error",
+                "message": "No programme types available"
+            }, status=404)
+
+        grouped = snapshot.programme_types_by_state()
+        by_state = {}
+        for state in states:
+            codes = grouped.get(state)
+            if codes:
+                by_state[state.lower()] = encode_payload({
+                    "status": "success",
+                    "data": [programme_type(code) for code in codes]
+                })
+            else:
+                by_state[state.lower()] = encode_payload({
+                    "status": "error",
+                    "message": f"No programme types available for {state}"
+                }, status=404)
+
+        self._locations = locations
+        self._programme_types = all_types
+        self._programme_types_by_state = by_state
+        self._version = version
+        logger.info(f"Encoded reference data for {len(states)} states (catalogue version {version})")
+
+    def invalidate(self, *args) -> None:
+        """Force the payloads to be rebuilt on the next request"""
+        with self._lock:
+            self._version = None
+
+    def locations(self) -> EncodedPayload:
+        self._ensure_loaded()
+        return self._locations
+
+    def programme_types(self) -> EncodedPayload:
+        self._ensure_loaded()
+        return self._programme_types
+
+    def programme_types_for_state(self, state: str) -> Optional[EncodedPayload]:
+        """Get the payload for a state name (case-insensitive), or None if unknown"""
+        self._ensure_loaded()
+        return self._programme_types_by_state.get(state.strip().lower())
+
+
+reference_data = ReferenceData()
+register_change_listener(reference_data.invalidate)
@@ -6,7 +6,13 @@ from sqlalchemy import func, text
 from sqlalchemy.exc import SQLAlchemyError
 from flask import current_app
 import time
-import psycopg2.extras
+from .template_cache import template_cache
+from .hot_queries import hot_queries
+from .single_flight import search_flight
+from .query_normalize import normalize_query, like_pattern, search_key
+from .cache_warm import cache_warmer, query_log, KIND_SEARCH
+
+SEARCH_TIMEOUT = 300  # Cache for 5 minutes
 
 def verify_search_vector_integrity():
     """Verify search vector data integrity"""
@@ -117,174 +123,66 @@ def init_search_vectors():
         current_app.logger.error(f"Error initializing search vectors: {str(e)}")
         return False
 
-def perform_search(query_text, state=None, program_type=None, page=1, per_page=10):
-    """Unified search function with caching and optimized queries"""
-    cache_key = f'search:{query_text}:{state}:{program_type}:{page}'
-    results = cache.get(cache_key)
-    
-    if results is None:
-        try:
-            # Calculate pagination
-            offset = (page - 1) * per_page
-            
-            # Enhanced university query with better join handling
-            universities = execute_university_search(
-                query_text, state, program_type, per_page, offset
-            )
-            total_unis = get_university_count(query_text, state, program_type)
-            
-            # Enhanced course query with better join handling
-            courses = execute_course_search(
-                query_text, state, program_type, per_page, offset
-            )
-            total_courses = get_course_count(query_text, state, program_type)
-            
-            # Create paginated results with properly mapped fields
-            results = {
-                'universities': {
-                    'items': [{
-                        'id': uni['id'],
-                        'university_name': uni['university_name'],
-                        'state': uni['state_name'],  # Map from the query result
-                        'program_type': uni['program_type_name']  # Map from the query result
-                    } for uni in universities],
-                    'total': total_unis,
-                    'has_next': offset + per_page < total_unis,
-                    'has_prev': page > 1,
-                    'page': page
-                },
-                'courses': {
-                    'items': courses,
-                    'total': total_courses,
-                    'has_next': offset + per_page < total_courses,
-                    'has_prev': page > 1,
-                    'page': page
-                }
-            }
-            
-            cache.set(cache_key, results, timeout=300)  # Cache for 5 minutes
-            
-        except SQLAlchemyError as e:
-            current_app.logger.error(f"Search error: {str(e)}")
-            raise
-            
-    return results
-
-def execute_university_search(query_text, state, program_type, limit, offset):
-    """Execute university search query"""
-    query = text("""
-        SELECT 
-            u.id,
-            u.university_name,
-            s.name as state_name,
-            pt.name as program_type_name
-        FROM university u
-        LEFT JOIN state s ON u.state_id = s.id
-        LEFT JOIN programme_type pt ON u.programme_type_id = pt.id
-        WHERE (:state IS NULL OR s.name = :state)
-        AND (:program_type IS NULL OR pt.name = :program_type)
-        AND (
-            :query IS NULL 
-            OR u.search_vector @@ plainto_tsquery('english', :query)
-            OR u.university_name ILIKE :like_query
-        )
-        ORDER BY u.university_name
-        LIMIT :limit OFFSET :offset
-    """)
-    
-    return db.session.execute(
-        query,
-        {
-            'state': state,
-            'program_type': program_type,
-            'query': query_text,
-            'like_query': f'%{query_text}%' if query_text else None,
-            'limit': limit,
-            'offset': offset
-        }
-    ).mappings().all()
+SEARCH_PARAM_TYPES = {
+    'state': 'text',
+    'program_type': 'text',
+    'query': 'text',
+    'like_query': 'text',
+    'limit': 'bigint',
+    'offset': 'bigint'
+}
 
-def get_university_count(query_text, state, program_type):
-    """Get total count of matching universities"""
-    query = text("""
-        SELECT COUNT(*)
-        FROM university u
-        JOIN state s ON u.state_id = s.id
-        JOIN programme_type pt ON u.programme_type_id = pt.id
-        WHERE (:state IS NULL OR s.name = :state)
-        AND (:program_type IS NULL OR pt.name = :program_type)
-        AND (
-            :query IS NULL 
-            OR u.search_vector @@ plainto_tsquery('english', :query)
-            OR u.university_name ILIKE :like_query
-        )
-    """)
-    
-    return db.session.scalar(
-        query,
-        {
-            'state': state,
-            'program_type': program_type,
-            'query': query_text,
-            'like_query': f'%{query_text}%' if query_text else None
-        }
+UNIVERSITY_SEARCH = hot_queries.register('university_search', text("""
+    SELECT 
+        u.id,
+        u.university_name,
+        s.name as state_name,
+        pt.name as program_type_name
+    FROM university u
+    LEFT JOIN state s ON u.state_id = s.id
+    LEFT JOIN programme_type pt ON u.programme_type_id = pt.id
+    WHERE (:state IS NULL OR s.name = :state)
+    AND (:program_type IS NULL OR pt.name = :program_type)
+    AND (
+        :query IS NULL 
+        OR u.search_vector @@ plainto_tsquery('english', :query)
+        OR u.university_name ILIKE :like_query
     )
+    ORDER BY u.university_name
+    LIMIT :limit OFFSET :offset
+"""), SEARCH_PARAM_TYPES)
 
-def execute_course_search(query_text, state, program_type, limit, offset):
-    """Execute course search query"""
-    query = text("""
-        WITH filtered_courses AS (
-            SELECT 
-                c.id,
-                c.course_name,
-                c.code,
-                s.name as state,
-                pt.name as program_type,
-                cr.utme_requirements,
-                cr.direct_entry_requirements,
-                sr.subjects
-            FROM course c
-            JOIN course_requirement cr ON c.id = cr.course_id
-            JOIN university u ON cr.university_id = u.id
-            JOIN state s ON u.state_id = s.id
-            JOIN programme_type pt ON u.programme_type_id = pt.id
-            LEFT JOIN subject_requirement sr ON cr.id = sr.course_requirement_id
-            WHERE (:state IS NULL OR s.name = :state)
-            AND (:program_type IS NULL OR pt.name = :program_type)
-            AND (
-                :query IS NULL 
-                OR c.search_vector @@ plainto_tsquery('english', :query)
-                OR c.course_name ILIKE :like_query
-                OR c.code ILIKE :like_query
-            )
-        )
-        SELECT *
-        FROM filtered_courses
-        ORDER BY course_name
-        LIMIT :limit OFFSET :offset
-    """)
-    
-    return db.session.execute(
-        query,
-        {
-            'state': state,
-            'program_type': program_type,
-            'query': query_text,
-            'like_query': f'%{query_text}%' if query_text else None,
-            'limit': limit,
-            'offset': offset
-        }
-    ).mappings().all()
+UNIVERSITY_COUNT = hot_queries.register('university_count', text("""
+    SELECT COUNT(*)
+    FROM university u
+    JOIN state s ON u.state_id = s.id
+    JOIN programme_type pt ON u.programme_type_id = pt.id
+    WHERE (:state IS NULL OR s.name = :state)
+    AND (:program_type IS NULL OR pt.name = :program_type)
+    AND (
+        :query IS NULL 
+        OR u.search_vector @@ plainto_tsquery('english', :query)
+        OR u.university_name ILIKE :like_query
+    )
+"""), SEARCH_PARAM_TYPES)
 
-def get_course_count(query_text, state, program_type):
-    """Get total count of matching courses"""
-    query = text("""
-        SELECT COUNT(*)
+COURSE_SEARCH = hot_queries.register('course_search', text("""
+    WITH filtered_courses AS (
+        SELECT 
+            c.id,
+            c.course_name,
+            c.code,
+            s.name as state,
+            pt.name as program_type,
+            cr.utme_template_id,
+            cr.de_template_id,
+            sr.subjects
         FROM course c
         JOIN course_requirement cr ON c.id = cr.course_id
         JOIN university u ON cr.university_id = u.id
         JOIN state s ON u.state_id = s.id
         JOIN programme_type pt ON u.programme_type_id = pt.id
+        LEFT JOIN subject_requirement sr ON cr.id = sr.course_requirement_id
         WHERE (:state IS NULL OR s.name = :state)
         AND (:program_type IS NULL OR pt.name = :program_type)
         AND (
@@ -293,14 +191,151 @@ def get_course_count(query_text, state, program_type):
             OR c.course_name ILIKE :like_query
             OR c.code ILIKE :like_query
         )
-    """)
+    )
+    SELECT *
+    FROM filtered_courses
+    ORDER BY course_name
+    LIMIT :limit OFFSET :offset
+"""), SEARCH_PARAM_TYPES)
+
+COURSE_COUNT = hot_queries.register('course_count', text("""
+    SELECT COUNT(*)
+    FROM course c
+    JOIN course_requirement cr ON c.id = cr.course_id
+    JOIN university u ON cr.university_id = u.id
+    JOIN state s ON u.state_id = s.id
+    JOIN programme_type pt ON u.programme_type_id = pt.id
+    WHERE (:state IS NULL OR s.name = :state)
+    AND (:program_type IS NULL OR pt.name = :program_type)
+    AND (
+        :query IS NULL 
+        OR c.search_vector @@ plainto_tsquery('english', :query)
+        OR c.course_name ILIKE :like_query
+        OR c.code ILIKE :like_query
+    )
+"""), SEARCH_PARAM_TYPES)
+
+def perform_search(query_text, state=None, program_type=None, page=1, per_page=10):
+    """Unified search function with caching and optimized queries"""
+    # Every spelling of the same search ("Maths", " the maths ") shares one
+    # key and one set of results
+    query_text = normalize_query(query_text)
+    cache_key = search_key('search', query_text, state, program_type, page, per_page)
+    query_log.record(KIND_SEARCH, query_text, state, program_type, page, per_page)
+    results = cache.get(cache_key)
     
-    return db.session.scalar(
-        query,
-        {
-            'state': state,
-            'program_type': program_type,
-            'query': query_text,
-            'like_query': f'%{query_text}%' if query_text else None
+    if results is None:
+        # Concurrent misses for the same key share one computation
+        results = search_flight.do(
+            cache_key,
+            lambda: compute_search(query_text, state, program_type, page, per_page),
+            timeout=SEARCH_TIMEOUT
+        )
+            
+    return results
+
+def warm_search(query_text, state, program_type, page, per_page):
+    """Recompute and cache one logged search"""
+    cache.set(
+        search_key('search', query_text, state, program_type, page, per_page),
+        compute_search(query_text, state, program_type, page, per_page),
+        timeout=SEARCH_TIMEOUT
+    )
+
+cache_warmer.register(KIND_SEARCH, warm_search)
+
+def compute_search(query_text, state, program_type, page, per_page):
+    """Run the four search queries and build the paginated results"""
+    try:
+        # Calculate pagination
+        offset = (page - 1) * per_page
+        
+        # Enhanced university query with better join handling
+        universities = execute_university_search(
+            query_text, state, program_type, per_page, offset
+        )
+        total_unis = get_university_count(query_text, state, program_type)
+        
+        # Enhanced course query with better join handling
+        courses = execute_course_search(
+            query_text, state, program_type, per_page, offset
+        )
+        total_courses = get_course_count(query_text, state, program_type)
+        
+        # Create paginated results with properly mapped fields
+        return {
+            'universities': {
+                'items': [{
+                    'id': uni['id'],
+                    'university_name': uni['university_name'],
+                    'state': uni['state_name'],  # Map from the query result
+                    'program_type': uni['program_type_name']  # Map from the query result
+                } for uni in universities],
+                'total': total_unis,
+                'has_next': offset + per_page < total_unis,
+                'has_prev': page > 1,
+                'page': page
+            },
+            'courses': {
+                'items': courses,
+                'total': total_courses,
+                'has_next': offset + per_page < total_courses,
+                'has_prev': page > 1,
+                'page': page
+            }
         }
-    )
\ No newline at end of file
+        
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Search error: {str(e)}")
+        raise
+
+def execute_university_search(query_text, state, program_type, limit, offset):
+    """Execute university search query"""
+    return UNIVERSITY_SEARCH.execute({
+        'state': state,
+        'program_type': program_type,
+        'query': query_text,
+        'like_query': like_pattern(query_text) if query_text else None,
+        'limit': limit,
+        'offset': offset
+    }).mappings().all()
+
+def get_university_count(query_text, state, program_type):
+    """Get total count of matching universities"""
+    return UNIVERSITY_COUNT.execute({
+        'state': state,
+        'program_type': program_type,
+        'query': query_text,
+        'like_query': like_pattern(query_text) if query_text else None
+    }).scalar()
+
+def execute_course_search(query_text, state, program_type, limit, offset):
+    """Execute course search query"""
+    rows = COURSE_SEARCH.execute({
+        'state': state,
+        'program_type': program_type,
+        'query': query_text,
+        'like_query': like_pattern(query_text) if query_text else None,
+        'limit': limit,
+        'offset': offset
+    }).mappings().all()
+
+    # Resolve requirement text from the interned template cache
+    courses = []
+    for row in rows:
+        course = dict(row)
+        course.update(template_cache.resolve(
+            course.pop('utme_template_id'),
+            course.pop('de_template_id')
+        ))
+        courses.append(course)
+    return courses
+
+def get_course_count(query_text, state, program_type):
+    """Get total count of matching courses"""
+    return COURSE_COUNT.execute({
+        'state': state,
+        'program_type': program_type,
+        'query': query_text,
+        'like_query': like_pattern(query_text) if query_text else None
+    }).scalar()
@@ -0,0 +1,152 @@
+# app/utils/serialization.py
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from operator import attrgetter
+import json
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+from ..extensions import cache
+
+try:
+    import orjson
+except ImportError:  # stdlib encoder fallback
+    orjson = None
+
+JSON_MIMETYPE = 'application/json'
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson is not None else 0
+
+
+def encode_json(payload: Any) -> bytes:
+    """Encode a payload to compact UTF-8 JSON bytes.
+
+    Dates, decimals and other non-native types fall back to Flask's default
+    encoder, so output matches what ``jsonify`` produced before.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=DefaultJSONProvider.default, option=ORJSON_OPTIONS)
+    return json.dumps(payload, default=DefaultJSONProvider.default, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when it is installed.
+
+    ``jsonify`` responses are built straight from the encoded bytes, without
+    the intermediate ``str`` the default provider produces.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return encode_json(obj).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None or self._app.debug:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(encode_json(obj), mimetype=self.mimetype)
+
+
+def json_bytes_response(body: bytes, status: int = 200):
+    """Wrap already-encoded JSON bytes in a response"""
+    return current_app.response_class(body, status=status, mimetype=JSON_MIMETYPE)
+
+
+def cached_json(key: str, builder: Callable[[], Any], timeout: Optional[int] = None) -> bytes:
+    """Get encoded JSON bytes from the cache, building and encoding on a miss"""
+    body = cache.get(key)
+    if body is None:
+        body = encode_json(builder())
+        cache.set(key, body, timeout=timeout)
+    return body
+
+
+class Schema:
+    """Declarative field mapping from model instances or rows to payload dicts.
+
+    Each field is an attribute path (``'state_info.name'``) or a callable
+    taking the object; getters are compiled once at definition time.
+    """
+
+    def __init__(self, **fields: Union[str, Callable[[Any], Any]]):
+        self.fields = tuple(
+            (key, source if callable(source) else attrgetter(source))
+            for key, source in fields.items()
+        )
+
+    def dump(self, obj: Any, **extra: Any) -> Dict[str, Any]:
+        data = {key: getter(obj) for key, getter in self.fields}
+        if extra:
+            data.update(extra)
+        return data
+
+    def dump_many(self, objs: Iterable[Any]) -> List[Dict[str, Any]]:
+        fields = self.fields
+        return [{key: getter(obj) for key, getter in fields} for obj in objs]
+
+    def only(self, *keys: str) -> 'Schema':
+        """Derive a schema restricted to the given fields"""
+        schema = Schema()
+        schema.fields = tuple(f for f in self.fields if f[0] in keys)
+        return schema
+
+    def extend(self, **fields: Union[str, Callable[[Any], Any]]) -> 'Schema':
+        """Derive a schema with extra or overridden fields"""
+        schema = Schema()
+        overridden = set(fields)
+        schema.fields = tuple(f for f in self.fields if f[0] not in overridden) + Schema(**fields).fields
+        return schema
+
+
+def _optional(path: str) -> Callable[[Any], Any]:
+    """Getter that yields None when any step of the path is missing"""
+    parts = path.split('.')
+
+    def getter(obj):
+        for part in parts:
+            obj = getattr(obj, part, None)
+            if obj is None:
+                return None
+        return obj
+    return getter
+
+
+UNIVERSITY_SCHEMA = Schema(
+    id='id',
+    university_name='university_name',
+    state=_optional('state_info.name'),
+    program_type=_optional('programme_type_info.name'),
+    website='website',
+    established='established',
+    abbrv='abbrv'
+)
+
+# Compact card shape used by the institution listings
+UNIVERSITY_CARD_SCHEMA = Schema(
+    id='id',
+    name='university_name',
+    state=_optional('state_info.name'),
+    type=_optional('programme_type_info.name'),
+    courses_count='course_count'
+)
+
+COURSE_SCHEMA = Schema(
+    id='id',
+    course_name='course_name',
+    code='code'
+)
+
+COURSE_REQUIREMENT_SCHEMA = Schema(
+    university_name=_optional('university.university_name'),
+    abbrv=_optional('university.abbrv'),
+    direct_entry_requirements='direct_entry_requirements',
+    utme_requirements='utme_requirements',
+    subjects=_optional('subject_requirement.subjects')
+)
+
@@ -0,0 +1,114 @@
+# app/utils/single_flight.py
+
+from typing import Any, Callable, Dict, Optional
+import logging
+import os
+import threading
+import time
+
+from ..extensions import cache
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-progress computation that other threads can wait on."""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapse concurrent computations of the same cache key into one.
+
+    Within a worker, threads asking for a key that is already being computed
+    wait for that computation and share its result. Across workers, the
+    computing thread holds a lock entry in the cache (``cache.add`` is atomic
+    on shared backends such as Redis); other workers poll the cache for the
+    value instead of running the same queries, and compute it themselves only
+    if the holder disappears or the wait runs out.
+    """
+
+    def __init__(self, lock_timeout: float = 30, wait_timeout: float = 10, poll_interval: float = 0.05):
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = {'leaders': 0, 'local_waits': 0, 'remote_waits': 0, 'wait_timeouts': 0}
+
+    def _incr(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def do(self, key: str, compute: Callable[[], Any], timeout: Optional[int] = None) -> Any:
+        """Get the value for key, computing and caching it at most once at a time"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self._incr('local_waits')
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._compute_shared(key, compute, timeout)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _compute_shared(self, key: str, compute: Callable[[], Any], timeout: Optional[int]) -> Any:
+        lock_key = f"{key}:lock"
+        token = f"{os.getpid()}:{threading.get_ident()}:{time.monotonic()}"
+
+        if cache.add(lock_key, token, timeout=self.lock_timeout):
+            self._incr('leaders')
+            try:
+                # A worker that just released the lock may have stored it
+                value = cache.get(key)
+                if value is not None:
+                    return value
+                value = compute()
+                cache.set(key, value, timeout=timeout)
+                return value
+            finally:
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+
+        # Another worker is computing it; wait for its result to land
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            value = cache.get(key)
+            if value is not None:
+                self._incr('remote_waits')
+                return value
+            if cache.get(lock_key) is None:
+                break
+
+        self._incr('wait_timeouts')
+        logger.warning(f"Gave up waiting for {key}; computing it here")
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
+
+
+search_flight = SingleFlight()
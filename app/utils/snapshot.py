@@ -0,0 +1,665 @@
+# app/utils/snapshot.py
+
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import fcntl
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+from flask import current_app, has_app_context
+from sqlalchemy import select
+
+from ..extensions import db
+from ..models.university import University, Course, State, ProgrammeType
+from ..models.requirement import (
+    CourseRequirement,
+    SubjectRequirement,
+    UTMERequirementTemplate,
+    DirectEntryRequirementTemplate
+)
+from .catalogue_sync import get_catalogue_version, register_change_listener
+from .db_routing import use_primary
+
+logger = logging.getLogger(__name__)
+
+MISSING = -1
+STRINGS_FILE = 'strings.json'
+STRINGS_DIR = 'strings'
+CURRENT_POINTER = 'current'
+BUILD_LOCK = '.build.lock'
+
+
+def _intern_table(values: Iterable[Optional[str]]) -> Tuple[Optional[str], ...]:
+    return tuple(sys.intern(v) if v is not None else None for v in values)
+
+
+class _Interner:
+    """Assigns a stable index to each distinct string."""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return MISSING
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+
+class StringColumn(Sequence):
+    """A string table stored as one UTF-8 blob plus offsets.
+
+    A published snapshot maps both arrays, so the table's pages are shared
+    by every process and each value is decoded only when it is read.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, missing: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+        self.missing = missing
+
+    @classmethod
+    def encode(cls, values: Sequence[Optional[str]]) -> 'StringColumn':
+        encoded = [(value or '').encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        missing = np.array([value is None for value in values], dtype=bool)
+        return cls(data, offsets, missing)
+
+    def __len__(self) -> int:
+        return len(self.missing)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if self.missing[index]:
+            return None
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        data = self.data.tobytes()
+        for index, missing in enumerate(self.missing):
+            yield None if missing else data[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.offsets.nbytes + self.missing.nbytes
+
+
+class CourseView:
+    """Read-only view of one course row in a snapshot."""
+    __slots__ = ('_snapshot', '_row')
+
+    def __init__(self, snapshot: 'CatalogueSnapshot', row: int):
+        self._snapshot = snapshot
+        self._row = row
+
+    @property
+    def id(self) -> int:
+        return int(self._snapshot.arrays['course_id'][self._row])
+
+    @property
+    def course_name(self) -> str:
+        return self._snapshot.strings['course_names'][self._row]
+
+    @property
+    def code(self) -> Optional[str]:
+        return self._snapshot.strings['course_codes'][self._row]
+
+    def __repr__(self):
+        return f"<CourseView {self.course_name}>"
+
+
+class UniversityView:
+    """Read-only view of one university row in a snapshot."""
+    __slots__ = ('_snapshot', '_row')
+
+    def __init__(self, snapshot: 'CatalogueSnapshot', row: int):
+        self._snapshot = snapshot
+        self._row = row
+
+    def _lookup(self, table: str, column: str) -> Optional[str]:
+        code = int(self._snapshot.arrays[column][self._row])
+        return self._snapshot.strings[table][code] if code != MISSING else None
+
+    @property
+    def id(self) -> int:
+        return int(self._snapshot.arrays['uni_id'][self._row])
+
+    @property
+    def university_name(self) -> str:
+        return self._snapshot.strings['university_names'][self._row]
+
+    @property
+    def abbrv(self) -> Optional[str]:
+        return self._snapshot.strings['university_abbrvs'][self._row]
+
+    @property
+    def website(self) -> Optional[str]:
+        return self._snapshot.strings['university_websites'][self._row]
+
+    @property
+    def state(self) -> Optional[str]:
+        return self._lookup('state_names', 'uni_state')
+
+    @property
+    def programme_type(self) -> Optional[str]:
+        return self._lookup('type_names', 'uni_type')
+
+    @property
+    def course_count(self) -> int:
+        return int(self._snapshot.arrays['uni_course_count'][self._row])
+
+    @property
+    def is_featured(self) -> bool:
+        return bool(self._snapshot.arrays['uni_featured'][self._row])
+
+    def requirements(self) -> List['RequirementView']:
+        return self._snapshot.requirements_for_row(self._row)
+
+    def __repr__(self):
+        return f"<UniversityView {self.university_name}>"
+
+
+class RequirementView:
+    """Read-only view of one course requirement row in a snapshot."""
+    __slots__ = ('_snapshot', '_row')
+
+    def __init__(self, snapshot: 'CatalogueSnapshot', row: int):
+        self._snapshot = snapshot
+        self._row = row
+
+    def _text(self, table: str, column: str) -> Optional[str]:
+        code = int(self._snapshot.arrays[column][self._row])
+        return self._snapshot.strings[table][code] if code != MISSING else None
+
+    @property
+    def id(self) -> int:
+        return int(self._snapshot.arrays['req_id'][self._row])
+
+    @property
+    def university(self) -> UniversityView:
+        return UniversityView(self._snapshot, int(self._snapshot.arrays['req_uni'][self._row]))
+
+    @property
+    def course(self) -> CourseView:
+        return CourseView(self._snapshot, int(self._snapshot.arrays['req_course'][self._row]))
+
+    @property
+    def utme_requirements(self) -> Optional[str]:
+        return self._text('utme_texts', 'req_utme')
+
+    @property
+    def direct_entry_requirements(self) -> Optional[str]:
+        return self._text('de_texts', 'req_de')
+
+    @property
+    def subjects(self) -> Optional[str]:
+        return self._text('subject_texts', 'req_subjects')
+
+    def __repr__(self):
+        return f"<RequirementView {self.id}>"
+
+
+class CatalogueSnapshot:
+    """Immutable, column-oriented copy of the catalogue.
+
+    Numeric columns are NumPy arrays and every string lives once in an
+    interned tuple, so the whole catalogue is a few dozen objects rather
+    than one ORM instance per row. Requirements are sorted by university
+    with CSR offsets, making per-institution lookups a slice.
+    """
+
+    def __init__(self, version, arrays: Dict[str, np.ndarray], strings: Dict[str, Tuple]):
+        self.version = version
+        self.arrays = arrays
+        self.strings = strings
+        self._state_codes = {name: code for code, name in enumerate(strings['state_names'])}
+        self._type_codes = {name: code for code, name in enumerate(strings['type_names'])}
+        self._course_rows: Optional[Dict[str, List[int]]] = None
+
+    @property
+    def university_total(self) -> int:
+        return len(self.arrays['uni_id'])
+
+    @property
+    def course_total(self) -> int:
+        return len(self.arrays['course_id'])
+
+    @property
+    def requirement_total(self) -> int:
+        return len(self.arrays['req_id'])
+
+    # Lookups
+
+    def _row_for(self, ids: np.ndarray, entity_id: int) -> Optional[int]:
+        row = int(np.searchsorted(ids, entity_id))
+        if row < len(ids) and ids[row] == entity_id:
+            return row
+        return None
+
+    def university(self, university_id: int) -> Optional[UniversityView]:
+        row = self._row_for(self.arrays['uni_id'], university_id)
+        return UniversityView(self, row) if row is not None else None
+
+    def course(self, course_id: int) -> Optional[CourseView]:
+        row = self._row_for(self.arrays['course_id'], course_id)
+        return CourseView(self, row) if row is not None else None
+
+    def course_rows(self, course_name: str) -> List[int]:
+        """Rows of the courses with the given name"""
+        if self._course_rows is None:
+            rows: Dict[str, List[int]] = {}
+            for row, name in enumerate(self.strings['course_names']):
+                rows.setdefault(name, []).append(row)
+            self._course_rows = rows
+        return self._course_rows.get(course_name, [])
+
+    def requirements_for_row(self, university_row: int) -> List[RequirementView]:
+        offsets = self.arrays['uni_req_offsets']
+        return [RequirementView(self, row) for row in range(offsets[university_row], offsets[university_row + 1])]
+
+    def requirements_for(self, university_id: int) -> List[RequirementView]:
+        row = self._row_for(self.arrays['uni_id'], university_id)
+        return self.requirements_for_row(row) if row is not None else []
+
+    # Filters
+
+    def university_mask(self, state: Optional[str] = None,
+                        programme_types: Optional[Sequence[str]] = None,
+                        name_contains: Optional[str] = None,
+                        featured: Optional[bool] = None,
+                        course: Optional[str] = None,
+                        classified: bool = False) -> np.ndarray:
+        """Boolean mask over university rows matching every given filter.
+
+        ``course`` keeps institutions offering the named course and
+        ``classified`` those with both a state and a programme type.
+        """
+        mask = np.ones(self.university_total, dtype=bool)
+        if state and state != 'ALL':
+            mask &= self.arrays['uni_state'] == self._state_codes.get(state, -2)
+        if programme_types:
+            codes = [self._type_codes[t] for t in programme_types if t in self._type_codes]
+            mask &= np.isin(self.arrays['uni_type'], codes)
+        if classified:
+            mask &= (self.arrays['uni_state'] != MISSING) & (self.arrays['uni_type'] != MISSING)
+        if course and course != 'ALL':
+            offering = np.zeros(self.university_total, dtype=bool)
+            offering[self.arrays['req_uni'][np.isin(self.arrays['req_course'], self.course_rows(course))]] = True
+            mask &= offering
+        if featured is not None:
+            mask &= self.arrays['uni_featured'] == featured
+        if name_contains:
+            needle = name_contains.lower()
+            names = self.strings['university_names']
+            mask &= np.fromiter((needle in name.lower() for name in names), dtype=bool, count=len(names))
+        return mask
+
+    def universities(self, mask: Optional[np.ndarray] = None, order_by_name: bool = True) -> List[UniversityView]:
+        rows = np.flatnonzero(mask) if mask is not None else np.arange(self.university_total)
+        if order_by_name:
+            rows = rows[np.argsort(self.arrays['uni_name_rank'][rows], kind='stable')]
+        return [UniversityView(self, int(row)) for row in rows]
+
+    # Aggregates
+
+    def course_institution_counts(self, state: Optional[str] = None,
+                                  programme_types: Optional[Sequence[str]] = None) -> List[Tuple[CourseView, int]]:
+        """Distinct institutions offering each course, ordered by course name"""
+        uni_mask = self.university_mask(state=state, programme_types=programme_types)
+        req_mask = uni_mask[self.arrays['req_uni']]
+        courses = self.arrays['req_course'][req_mask].astype(np.int64)
+        universities = self.arrays['req_uni'][req_mask].astype(np.int64)
+        pairs = np.unique(courses * self.university_total + universities)
+        counts = np.bincount(pairs // max(self.university_total, 1), minlength=self.course_total)
+        rows = np.flatnonzero(counts)
+        rows = rows[np.argsort(self.arrays['course_name_rank'][rows], kind='stable')]
+        return [(CourseView(self, int(row)), int(counts[row])) for row in rows]
+
+    def facet_counts(self, mask: Optional[np.ndarray] = None) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """University counts per state and per programme type"""
+        states = self.arrays['uni_state']
+        types = self.arrays['uni_type']
+        if mask is not None:
+            states, types = states[mask], types[mask]
+        state_counts = np.bincount(states[states != MISSING], minlength=len(self.strings['state_names']))
+        type_counts = np.bincount(types[types != MISSING], minlength=len(self.strings['type_names']))
+        return (
+            {name: int(n) for name, n in zip(self.strings['state_names'], state_counts) if n},
+            {name: int(n) for name, n in zip(self.strings['type_names'], type_counts) if n}
+        )
+
+    def programme_types_by_state(self) -> Dict[str, List[int]]:
+        """Programme type codes present in each state, both ordered by name"""
+        states = self.arrays['uni_state'].astype(np.int64)
+        types = self.arrays['uni_type'].astype(np.int64)
+        present = (states != MISSING) & (types != MISSING)
+        width = max(len(self.strings['type_names']), 1)
+        pairs = np.unique(states[present] * width + types[present])
+        grouped: Dict[str, List[int]] = {}
+        for pair in pairs:
+            grouped.setdefault(self.strings['state_names'][int(pair // width)], []).append(int(pair % width))
+        return grouped
+
+    # Footprint
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Approximate bytes held by the snapshot, by column group"""
+        array_bytes = sum(array.nbytes for array in self.arrays.values())
+        seen = set()
+        string_bytes = 0
+        for table in self.strings.values():
+            if isinstance(table, StringColumn):
+                string_bytes += table.nbytes
+                continue
+            string_bytes += sys.getsizeof(table)
+            for value in table:
+                if value is not None and id(value) not in seen:
+                    seen.add(id(value))
+                    string_bytes += sys.getsizeof(value)
+        return {
+            'arrays': array_bytes,
+            'strings': string_bytes,
+            'total': array_bytes + string_bytes
+        }
+
+
+@use_primary
+def build_catalogue_snapshot(version=None) -> CatalogueSnapshot:
+    """Read the catalogue tables with column-only queries and pack them into columns"""
+    start_time = time.time()
+    version = get_catalogue_version() if version is None else version
+
+    states = db.session.execute(select(State.id, State.name).order_by(State.name)).all()
+    types = db.session.execute(
+        select(ProgrammeType.id, ProgrammeType.name, ProgrammeType.category, ProgrammeType.institution_type)
+        .order_by(ProgrammeType.name)
+    ).all()
+    universities = db.session.execute(
+        select(
+            University.id, University.university_name, University.abbrv, University.website,
+            University.state_id, University.programme_type_id, University.course_count,
+            University.is_featured
+        ).order_by(University.id)
+    ).all()
+    courses = db.session.execute(
+        select(Course.id, Course.course_name, Course.code).order_by(Course.id)
+    ).all()
+    utme_templates = db.session.execute(
+        select(UTMERequirementTemplate.id, UTMERequirementTemplate.requirements)
+    ).all()
+    de_templates = db.session.execute(
+        select(DirectEntryRequirementTemplate.id, DirectEntryRequirementTemplate.requirements)
+    ).all()
+    requirements = db.session.execute(
+        select(
+            CourseRequirement.id, CourseRequirement.university_id, CourseRequirement.course_id,
+            CourseRequirement.utme_template_id, CourseRequirement.de_template_id,
+            SubjectRequirement.subjects
+        )
+        .outerjoin(SubjectRequirement, SubjectRequirement.course_requirement_id == CourseRequirement.id)
+    ).all()
+
+    state_rows = {row.id: code for code, row in enumerate(states)}
+    type_rows = {row.id: code for code, row in enumerate(types)}
+    uni_rows = {row.id: i for i, row in enumerate(universities)}
+    course_rows = {row.id: i for i, row in enumerate(courses)}
+    utme_rows = {row.id: i for i, row in enumerate(utme_templates)}
+    de_rows = {row.id: i for i, row in enumerate(de_templates)}
+    subjects = _Interner()
+
+    # Requirements grouped by university, then course name, for CSR slicing
+    requirements = [r for r in requirements if r.university_id in uni_rows and r.course_id in course_rows]
+    requirements.sort(key=lambda r: (uni_rows[r.university_id], courses[course_rows[r.course_id]].course_name))
+    req_uni = np.fromiter((uni_rows[r.university_id] for r in requirements), dtype=np.int32, count=len(requirements))
+
+    uni_names = [row.university_name or '' for row in universities]
+    course_names = [row.course_name or '' for row in courses]
+
+    arrays = {
+        'uni_id': np.array([row.id for row in universities], dtype=np.int32),
+        'uni_state': np.array([state_rows.get(row.state_id, MISSING) for row in universities], dtype=np.int16),
+        'uni_type': np.array([type_rows.get(row.programme_type_id, MISSING) for row in universities], dtype=np.int16),
+        'uni_course_count': np.array([row.course_count or 0 for row in universities], dtype=np.int32),
+        'uni_featured': np.array([bool(row.is_featured) for row in universities], dtype=bool),
+        'uni_name_rank': np.argsort(np.argsort(np.array(uni_names, dtype=object), kind='stable'), kind='stable').astype(np.int32),
+        'course_id': np.array([row.id for row in courses], dtype=np.int32),
+        'course_name_rank': np.argsort(np.argsort(np.array(course_names, dtype=object), kind='stable'), kind='stable').astype(np.int32),
+        'req_id': np.array([r.id for r in requirements], dtype=np.int32),
+        'req_uni': req_uni,
+        'req_course': np.array([course_rows[r.course_id] for r in requirements], dtype=np.int32),
+        'req_utme': np.array([utme_rows.get(r.utme_template_id, MISSING) for r in requirements], dtype=np.int32),
+        'req_de': np.array([de_rows.get(r.de_template_id, MISSING) for r in requirements], dtype=np.int32),
+        'req_subjects': np.array([subjects.code(r.subjects) for r in requirements], dtype=np.int32),
+        'uni_req_offsets': np.searchsorted(req_uni, np.arange(len(universities) + 1)).astype(np.int32),
+    }
+    strings = {
+        'state_names': _intern_table(row.name for row in states),
+        'type_names': _intern_table(row.name for row in types),
+        'type_categories': _intern_table(row.category for row in types),
+        'type_institution_types': _intern_table(row.institution_type for row in types),
+        'university_names': _intern_table(uni_names),
+        'university_abbrvs': _intern_table(row.abbrv for row in universities),
+        'university_websites': _intern_table(row.website for row in universities),
+        'course_names': _intern_table(course_names),
+        'course_codes': _intern_table(row.code for row in courses),
+        'utme_texts': _intern_table(row.requirements for row in utme_templates),
+        'de_texts': _intern_table(row.requirements for row in de_templates),
+        'subject_texts': tuple(subjects.values),
+    }
+
+    snapshot = CatalogueSnapshot(version, arrays, strings)
+    usage = snapshot.memory_usage()
+    logger.info(
+        f"Built catalogue snapshot v{version}: {snapshot.university_total} universities, "
+        f"{snapshot.course_total} courses, {snapshot.requirement_total} requirements, "
+        f"{usage['total'] / 1024:.0f} KiB in {time.time() - start_time:.2f}s"
+    )
+    return snapshot
+
+
+def save_catalogue_snapshot(snapshot: CatalogueSnapshot, directory: str, keep: int = 3) -> str:
+    """Write a snapshot to ``directory`` and atomically point ``current`` at it.
+
+    Arrays and string tables are stored as ``.npy`` files so readers can map
+    them instead of copying; the pointer is a symlink replaced with
+    ``os.replace``.
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = f"v{snapshot.version}"
+    target = os.path.join(directory, name)
+
+    if not os.path.isdir(target):
+        staging = tempfile.mkdtemp(prefix=f".{name}.", dir=directory)
+        for column, array in snapshot.arrays.items():
+            np.save(os.path.join(staging, column + '.npy'), np.ascontiguousarray(array))
+        os.mkdir(os.path.join(staging, STRINGS_DIR))
+        for table, values in snapshot.strings.items():
+            column = StringColumn.encode(values)
+            for part in ('data', 'offsets', 'missing'):
+                np.save(os.path.join(staging, STRINGS_DIR, f'{table}.{part}.npy'), getattr(column, part))
+        with open(os.path.join(staging, STRINGS_FILE), 'w') as f:
+            json.dump({'version': snapshot.version, 'strings': sorted(snapshot.strings)}, f)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another process published the same version first
+            shutil.rmtree(staging, ignore_errors=True)
+
+    pointer = os.path.join(directory, f".{CURRENT_POINTER}.{os.getpid()}")
+    if os.path.lexists(pointer):
+        os.unlink(pointer)
+    os.symlink(name, pointer)
+    os.replace(pointer, os.path.join(directory, CURRENT_POINTER))
+
+    # Mapped files of pruned versions stay valid until their readers drop them
+    versions = sorted(
+        (entry for entry in os.listdir(directory) if entry.startswith('v') and entry != name),
+        key=lambda entry: os.path.getmtime(os.path.join(directory, entry))
+    )
+    for stale in versions[:max(0, len(versions) - (keep - 1))]:
+        shutil.rmtree(os.path.join(directory, stale), ignore_errors=True)
+
+    logger.info(f"Published catalogue snapshot {name} to {directory}")
+    return target
+
+
+def current_snapshot_path(directory: str) -> Optional[str]:
+    """Resolve the published snapshot directory, or None if nothing is published"""
+    pointer = os.path.join(directory, CURRENT_POINTER)
+    if not os.path.lexists(pointer):
+        return None
+    return os.path.realpath(pointer)
+
+
+@contextmanager
+def build_lock(directory: str):
+    """Serialise snapshot builds across every process sharing ``directory``"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, BUILD_LOCK), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_catalogue_snapshot(path: str) -> CatalogueSnapshot:
+    """Map a published snapshot; array and string pages are shared by every process mapping it"""
+    with open(os.path.join(path, STRINGS_FILE)) as f:
+        payload = json.load(f)
+    arrays = {
+        entry[:-4]: np.load(os.path.join(path, entry), mmap_mode='r')
+        for entry in os.listdir(path)
+        if entry.endswith('.npy')
+    }
+    strings = {
+        table: StringColumn(*(
+            np.load(os.path.join(path, STRINGS_DIR, f'{table}.{part}.npy'), mmap_mode='r')
+            for part in ('data', 'offsets', 'missing')
+        ))
+        for table in payload['strings']
+    }
+    return CatalogueSnapshot(payload['version'], arrays, strings)
+
+
+class SnapshotHolder:
+    """Process-wide current snapshot.
+
+    Without ``CATALOGUE_SNAPSHOT_DIR`` the snapshot is built in-process the
+    first time it is read and again after the catalogue version changes.
+    With it, snapshots are published to disk and every process maps the one
+    ``current`` points at. The gunicorn master builds it before forking, and
+    the process that applies a catalogue change publishes the new version.
+    Workers only build if nothing has been published for the catalogue
+    version they have seen, and then only the first one to take the build
+    lock does.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._path: Optional[str] = None
+        self._checked_at = 0.0
+
+    def _directory(self) -> Optional[str]:
+        return current_app.config.get('CATALOGUE_SNAPSHOT_DIR')
+
+    def _adopt_published(self, directory: str) -> bool:
+        path = current_snapshot_path(directory)
+        if path is None or path == self._path:
+            return False
+        self._snapshot = load_catalogue_snapshot(path)
+        self._path = path
+        logger.info(f"Mapped catalogue snapshot {os.path.basename(path)}")
+        return True
+
+    def refresh(self) -> CatalogueSnapshot:
+        """Rebuild from the database and, when file-backed, publish and map it"""
+        with self._lock:
+            directory = self._directory()
+            if directory:
+                with build_lock(directory):
+                    save_catalogue_snapshot(build_catalogue_snapshot(), directory)
+                self._adopt_published(directory)
+            else:
+                self._snapshot = build_catalogue_snapshot()
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def get(self) -> CatalogueSnapshot:
+        directory = self._directory()
+        if directory:
+            return self._get_published(directory)
+
+        version = get_catalogue_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = build_catalogue_snapshot(version)
+            return self._snapshot
+
+    def _is_current(self, version) -> bool:
+        snapshot = self._snapshot
+        return snapshot is not None and snapshot.version >= version
+
+    def _get_published(self, directory: str) -> CatalogueSnapshot:
+        # Reads are cached under the catalogue version, so a snapshot older
+        # than the version this process has seen is never returned
+        interval = current_app.config.get('CATALOGUE_SNAPSHOT_CHECK_INTERVAL', 5)
+        version = get_catalogue_version()
+        if self._is_current(version) and time.monotonic() - self._checked_at < interval:
+            return self._snapshot
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._adopt_published(directory)
+            if not self._is_current(version):
+                # Nothing published for this version yet. The process
+                # publishing it holds the build lock, so wait for it; if
+                # nobody is (the master could not build it), the first
+                # worker here builds it and the rest map that one
+                with build_lock(directory):
+                    self._adopt_published(directory)
+                    if not self._is_current(version):
+                        save_catalogue_snapshot(build_catalogue_snapshot(version), directory)
+                        self._adopt_published(directory)
+            return self._snapshot
+
+    def invalidate(self, changes=None) -> None:
+        """Drop the in-process snapshot, or publish a fresh one when file-backed"""
+        if has_app_context() and self._directory():
+            if getattr(changes, 'remote', False):
+                # The process that applied the sync publishes the snapshot
+                self._checked_at = 0.0
+                return
+            self.refresh()
+            return
+        with self._lock:
+            self._snapshot = None
+            self._path = None
+
+
+catalogue_snapshot = SnapshotHolder()
+register_change_listener(catalogue_snapshot.invalidate)
+
+
+def get_catalogue_snapshot() -> CatalogueSnapshot:
+    """Get the current catalogue snapshot, building it if needed"""
+    return catalogue_snapshot.get()
@@ -0,0 +1,134 @@
+# app/utils/template_cache.py
+
+from typing import Dict, Optional
+from flask import current_app, g, has_request_context
+from sqlalchemy import select
+import logging
+import sys
+import threading
+
+from ..extensions import db
+from ..models.requirement import UTMERequirementTemplate, DirectEntryRequirementTemplate
+from .catalogue_sync import get_catalogue_version, register_change_listener
+from .db_routing import use_primary
+
+logger = logging.getLogger(__name__)
+
+UTME = 'utme'
+DIRECT_ENTRY = 'de'
+CHECKED_VERSION = '_template_cache_version'
+
+
+class RequirementTemplateCache:
+    """Process-wide, read-mostly interning of requirement template text.
+
+    Both template tables are loaded once per catalogue version; serialisers
+    resolve ``utme_template_id``/``de_template_id`` through this cache instead
+    of lazy-loading a template row per CourseRequirement.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._texts: Dict[str, Dict[int, str]] = {UTME: {}, DIRECT_ENTRY: {}}
+        self._parsed: Dict[tuple, Dict] = {}
+        self._extractor = None
+
+    def _ensure_loaded(self) -> None:
+        # Listings resolve templates once per row; check the catalogue version
+        # once per request and serve the rest of it from the loaded set
+        in_request = has_request_context()
+        if in_request and self._version is not None and g.get(CHECKED_VERSION) == self._version:
+            return
+
+        version = get_catalogue_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load(version)
+        if in_request:
+            setattr(g, CHECKED_VERSION, version)
+
+    @use_primary
+    def _load(self, version) -> None:
+        texts = {
+            UTME: dict(db.session.execute(
+                select(UTMERequirementTemplate.id, UTMERequirementTemplate.requirements)
+            ).all()),
+            DIRECT_ENTRY: dict(db.session.execute(
+                select(DirectEntryRequirementTemplate.id, DirectEntryRequirementTemplate.requirements)
+            ).all())
+        }
+        # Intern so identical text across templates and reloads shares one object
+        for mapping in texts.values():
+            for template_id, value in mapping.items():
+                if value is not None:
+                    mapping[template_id] = sys.intern(value)
+
+        self._texts = texts
+        self._parsed = {}
+        self._version = version
+        logger.info(
+            f"Loaded {len(texts[UTME])} UTME and {len(texts[DIRECT_ENTRY])} "
+            f"direct entry templates for catalogue version {version}"
+        )
+
+    def invalidate(self, *args) -> None:
+        """Drop the loaded templates; the next lookup reloads them"""
+        with self._lock:
+            self._version = None
+            self._parsed = {}
+
+    def text(self, kind: str, template_id: Optional[int]) -> Optional[str]:
+        if template_id is None:
+            return None
+        self._ensure_loaded()
+        return self._texts[kind].get(template_id)
+
+    def utme_text(self, template_id: Optional[int]) -> Optional[str]:
+        """Get UTME requirement text for a template id"""
+        return self.text(UTME, template_id)
+
+    def de_text(self, template_id: Optional[int]) -> Optional[str]:
+        """Get direct entry requirement text for a template id"""
+        return self.text(DIRECT_ENTRY, template_id)
+
+    def all_texts(self, kind: str) -> Dict[int, str]:
+        """Get the full template id to text mapping for one template table"""
+        self._ensure_loaded()
+        return self._texts[kind]
+
+    def get_extractor(self):
+        """Get the shared requirement extractor used to parse template text"""
+        if self._extractor is None:
+            from .extract_normalize import SubjectExtractor, RequirementExtractor
+            self._extractor = RequirementExtractor(SubjectExtractor())
+        return self._extractor
+
+    def parsed(self, kind: str, template_id: Optional[int]) -> Optional[Dict]:
+        """Get the parsed structure of a template, parsing each text at most once per version"""
+        requirement_text = self.text(kind, template_id)
+        if requirement_text is None:
+            return None
+
+        key = (kind, template_id)
+        result = self._parsed.get(key)
+        if result is None:
+            try:
+                result = self.get_extractor().parse_requirements(requirement_text)
+            except Exception as e:
+                current_app.logger.error(f"Error parsing {kind} template {template_id}: {str(e)}")
+                return None
+            self._parsed[key] = result
+        return result
+
+    def resolve(self, utme_template_id: Optional[int], de_template_id: Optional[int]) -> Dict[str, Optional[str]]:
+        """Resolve a requirement row's template ids into the serialised text fields"""
+        return {
+            'utme_requirements': self.utme_text(utme_template_id),
+            'direct_entry_requirements': self.de_text(de_template_id)
+        }
+
+
+template_cache = RequirementTemplateCache()
+register_change_listener(template_cache.invalidate)
@@ -1,6 +1,8 @@
 # app/views/admin.py
+import os
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
+from flask_wtf.csrf import generate_csrf
 from sqlalchemy.exc import SQLAlchemyError
 from ..models.user import User
 from ..models.interaction import Comment, Vote
@@ -9,6 +11,21 @@ from ..models.university import University, Course, State, ProgrammeType
 from ..models.requirement import CourseRequirement
 from ..forms.admin import DeleteUserForm, DeleteCommentForm, DeleteFeedbackForm, UniversityForm, CourseForm
 from ..utils.decorators import admin_required
+from ..utils.admin_data import (
+    list_users,
+    list_comments,
+    list_feedback,
+    get_admin_summary,
+    invalidate_admin_summary
+)
+from ..utils.featured import invalidate_featured
+from ..utils.db_pool import pool_status
+from ..utils.query_budget import budget_stats
+from ..utils.hot_queries import hot_queries
+from ..utils.single_flight import search_flight
+from ..utils.cache_warm import cache_warmer, query_log
+from ..utils.job_queue import queue_stats
+from ..utils.mail_pool import mail_dispatcher
 from ..extensions import db
 from sqlalchemy.orm import joinedload
 from flask import current_app
@@ -20,33 +37,39 @@ bp = Blueprint('admin', __name__, url_prefix='/admin')
 @login_required
 @admin_required
 def admin_dashboard():
-    users = User.query.all()
-    comments = Comment.query.order_by(Comment.date_posted.desc()).all()
-    feedback_messages = Feedback.query.order_by(Feedback.date_submitted.desc()).all()
-    
-    delete_user_forms = {}
-    for user in users:
-        if not user.is_admin:
-            form = DeleteUserForm()
-            delete_user_forms[user.id] = form
-
-    delete_comment_forms = {}
-    for comment in comments:
-        form = DeleteCommentForm()
-        delete_comment_forms[comment.id] = form
+    users_page = list_users(
+        search=request.args.get('users_q', '').strip(),
+        cursor=request.args.get('users_cursor', type=int)
+    )
+    comments_page = list_comments(
+        search=request.args.get('comments_q', '').strip(),
+        cursor=request.args.get('comments_cursor', type=int)
+    )
+    feedback_page = list_feedback(
+        search=request.args.get('feedback_q', '').strip(),
+        cursor=request.args.get('feedback_cursor', type=int)
+    )
 
-    delete_feedback_forms = {}
-    for feedback in feedback_messages:
-        form = DeleteFeedbackForm()
-        delete_feedback_forms[feedback.id] = form
+    def dashboard_url(**overrides):
+        """Build a dashboard URL keeping the other sections' state"""
+        args = request.args.to_dict()
+        for key, value in overrides.items():
+            if value is None:
+                args.pop(key, None)
+            else:
+                args[key] = value
+        return url_for('admin.admin_dashboard', **args)
 
     return render_template('admin.html',
-        users=users,
-        comments=comments,
-        feedback_messages=feedback_messages,
-        delete_user_forms=delete_user_forms,
-        delete_comment_forms=delete_comment_forms,
-        delete_feedback_forms=delete_feedback_forms
+        users=users_page.items,
+        comments=comments_page.items,
+        feedback_messages=feedback_page.items,
+        users_page=users_page,
+        comments_page=comments_page,
+        feedback_page=feedback_page,
+        summary=get_admin_summary(),
+        delete_csrf_token=generate_csrf(),
+        dashboard_url=dashboard_url
     )
 
 @bp.route('/delete_user/<int:user_id>', methods=['POST'])
@@ -77,6 +100,7 @@ def delete_user(user_id):
             
             # Commit the transaction
             db.session.commit()
+            invalidate_admin_summary()
             current_app.logger.info(f'Successfully deleted user {user_id} and all related data')
             flash('User and all related data deleted successfully.', 'success')
             
@@ -105,6 +129,7 @@ def delete_comment(comment_id):
             try:
                 db.session.delete(comment)
                 db.session.commit()
+                invalidate_admin_summary()
                 flash('Comment deleted successfully.', 'success')
             except SQLAlchemyError as e:
                 db.session.rollback()
@@ -123,6 +148,7 @@ def delete_feedback(feedback_id):
         try:
             db.session.delete(feedback)
             db.session.commit()
+            invalidate_admin_summary()
             flash('Feedback deleted successfully.', 'success')
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -224,6 +250,7 @@ def delete_university(university_id):
     try:
         db.session.delete(university)
         db.session.commit()
+        invalidate_featured()
         flash('University deleted successfully.', 'success')
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -249,6 +276,7 @@ def toggle_featured(university_id):
         
         university.is_featured = not university.is_featured
         db.session.commit()
+        invalidate_featured()
         
         # Return current featured count along with success
         featured_count = University.query.filter_by(is_featured=True).count()
@@ -339,4 +367,63 @@ def delete_course(course_id):
     except SQLAlchemyError as e:
         db.session.rollback()
         flash(f'Error deleting course: {str(e)}', 'danger')
-    return redirect(url_for('admin.courses'))
\ No newline at end of file
+    return redirect(url_for('admin.courses'))
+
+@bp.route('/pool-status')
+@login_required
+@admin_required
+def db_pool_status():
+    # Counters are per worker process; the pid shows which one answered
+    status = pool_status(db.engine)
+    status['plan'] = current_app.extensions.get('db_pool_plan')
+    return jsonify(status)
+
+@bp.route('/query-budgets')
+@login_required
+@admin_required
+def query_budgets():
+    # Per worker process, like the pool counters
+    return jsonify({
+        'pid': os.getpid(),
+        'budgets_ms': current_app.config['QUERY_BUDGETS_MS'],
+        'classes': budget_stats.summary()
+    })
+
+@bp.route('/hot-queries')
+@login_required
+@admin_required
+def hot_query_stats():
+    # Per worker process; compile_ms is the one-off client compile per query
+    return jsonify({
+        'pid': os.getpid(),
+        'queries': hot_queries.stats(),
+        'search_coalescing': search_flight.stats()
+    })
+
+@bp.route('/jobs')
+@login_required
+@admin_required
+def job_stats():
+    # Read from the job table, so it covers every worker
+    return jsonify(queue_stats())
+
+@bp.route('/mail')
+@login_required
+@admin_required
+def mail_stats():
+    # Per worker process, like the pool counters
+    return jsonify(mail_dispatcher.stats())
+
+@bp.route('/cache-warming')
+@login_required
+@admin_required
+def cache_warming():
+    # The request log is shared; the last run is this worker's
+    return jsonify({
+        'pid': os.getpid(),
+        'warmer': cache_warmer.stats(),
+        'top': [
+            {'kind': entry[0], 'args': entry[1:], 'count': count}
+            for entry, count in query_log.top(current_app.config['CACHE_WARM_TOP_N'])
+        ]
+    })
@@ -4,16 +4,40 @@ from flask import Blueprint, jsonify, request, current_app, flash, redirect, url
 from flask_login import login_required, current_user
 from contextlib import contextmanager
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from ..models.university import University, Course, ProgrammeType, State
 from ..models.interaction import Comment, Vote, Bookmark
-from ..models.requirement import CourseRequirement
+from ..models.requirement import CourseRequirement, SubjectRequirement
 from ..models.user import User
-from ..extensions import db
+from ..extensions import db, cache
 from ..config import Config
 from ..utils.decorators import admin_required
+from ..utils.template_cache import template_cache
+from ..utils.eligibility import eligibility_engine, CandidateProfile
+from ..utils.comment_tree import load_comment_page
+from ..utils.reference_data import reference_data, encoded_response
+from ..utils.featured import pick_featured
+from ..utils.catalogue_sync import get_catalogue_version
+from ..utils.db_routing import use_replica
+from ..utils.query_budget import query_budget
+from ..utils.snapshot import get_catalogue_snapshot
+from ..utils.hot_queries import hot_queries
+from ..utils.query_normalize import normalize_query, like_pattern, search_key
+from ..utils.single_flight import search_flight
+from ..utils.search import SEARCH_TIMEOUT
+from ..utils.fragment_cache import FRAGMENT_TIMEOUT, fragment_vary
+from ..utils.cache_warm import cache_warmer, query_log, KIND_API_SEARCH, KIND_INSTITUTION
+from ..utils.serialization import (
+    Schema,
+    UNIVERSITY_SCHEMA,
+    UNIVERSITY_CARD_SCHEMA,
+    COURSE_SCHEMA,
+    COURSE_REQUIREMENT_SCHEMA,
+    cached_json,
+    json_bytes_response
+)
 import bleach
-from sqlalchemy import distinct, text, func
+from sqlalchemy import bindparam, distinct, select, text, func
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
 import time
@@ -29,6 +53,64 @@ sql_logger = logging.getLogger('sqlalchemy.engine')
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Response shapes built on the shared serialisers
+COURSE_LISTING_SCHEMA = COURSE_SCHEMA.extend(institution_count='institution_count')
+SEARCH_UNIVERSITY_SCHEMA = UNIVERSITY_SCHEMA.only('university_name', 'state', 'program_type')
+SEARCH_COURSE_SCHEMA = Schema(
+    id='id',
+    course_name='course_name',
+    requirements=lambda course: COURSE_REQUIREMENT_SCHEMA.dump_many(course.requirements)
+)
+INSTITUTION_COURSE_SCHEMA = Schema(
+    id='id',
+    course_name='course_name',
+    utme_requirements=lambda row: template_cache.utme_text(row.utme_template_id),
+    direct_entry_requirements=lambda row: template_cache.de_text(row.de_template_id),
+    subjects='subjects'
+)
+
+
+def _course_listing_statement(by_state: bool, by_types: bool):
+    """Course listing with institution counts, optionally filtered"""
+    statement = select(
+        Course.id,
+        Course.course_name,
+        Course.code,
+        func.count(distinct(University.id)).label('institution_count')
+    ).join(
+        CourseRequirement,
+        Course.id == CourseRequirement.course_id
+    ).join(
+        University,
+        CourseRequirement.university_id == University.id
+    ).join(
+        State,
+        University.state_id == State.id
+    ).join(
+        ProgrammeType,
+        University.programme_type_id == ProgrammeType.id
+    )
+    if by_state:
+        statement = statement.where(State.name == bindparam('state'))
+    if by_types:
+        statement = statement.where(ProgrammeType.name.in_(bindparam('programme_types', expanding=True)))
+    return statement.group_by(
+        Course.id,
+        Course.course_name,
+        Course.code
+    ).order_by(Course.course_name)
+
+
+# One prebuilt statement per filter combination
+COURSE_LISTINGS = {
+    (by_state, by_types): hot_queries.register(
+        f"course_listing{'_state' if by_state else ''}{'_types' if by_types else ''}",
+        _course_listing_statement(by_state, by_types)
+    )
+    for by_state in (False, True)
+    for by_types in (False, True)
+}
+
 # Define allowed tags and attributes for sanitization
 ALLOWED_TAGS = ['b', 'i', 'u', 'em', 'strong', 'a']
 ALLOWED_ATTRIBUTES = {
@@ -93,30 +175,8 @@ event.listen(Engine, "after_cursor_execute", after_cursor_execute)
 @bp.route('/locations')
 def get_locations():
     try:
-        current_app.logger.debug("Starting location query")
-        
-        # Query all states
-        states = db.session.query(State).order_by(State.name).all()
-        current_app.logger.debug(f"Raw states from database: {states}")
-
-        # Process states
-        locations = []
-        for state in states:
-            if hasattr(state, 'name') and state.name:
-                locations.append(state.name)
-            else:
-                current_app.logger.warning(f"Invalid state object: {state}")
-
-        if locations:
-            locations.insert(0, "ALL")
-            current_app.logger.info(f"Retrieved {len(locations)} locations including ALL option")
-            return jsonify(locations)
-        else:
-            current_app.logger.warning("No states found in database")
-            return jsonify({
-                "status": "error",
-                "message": "No states available in the database"
-            }), 404
+        # Served from pre-encoded bytes; conditional requests get a 304
+        return encoded_response(reference_data.locations())
             
     except Exception as e:
         current_app.logger.error(f"Error retrieving locations: {str(e)}", exc_info=True)
@@ -129,42 +189,9 @@ def get_locations():
 @bp.route('/featured-institutions')
 def get_featured_institutions():
     try:
-        thread_id = threading.get_ident()
-        current_app.logger.debug(f"[FEATURED] Starting featured institutions query - Thread: {thread_id}")
-        
-        # Query featured institutions
-        featured = University.query\
-            .filter_by(is_featured=True)\
-            .join(State, University.state_id == State.id)\
-            .join(ProgrammeType, University.programme_type_id == ProgrammeType.id)\
-            .options(
-                joinedload(University.state_info),
-                joinedload(University.programme_type_info)
-            )\
-            .order_by(func.random())\
-            .limit(6)
-            
-        current_app.logger.debug(f"[FEATURED] Executing query - Thread: {thread_id}")
-        
-        results = featured.all()
-        
-        current_app.logger.debug(f"[FEATURED] Query completed - Thread: {thread_id} | Results: {len(results)}")
-        
-        # Transform to response format
-        institutions = []
-        for inst in results:
-            try:
-                institution = {
-                    'id': inst.id,
-                    'name': inst.university_name,
-                    'state': inst.state_info.name if inst.state_info else 'Unknown',
-                    'type': inst.programme_type_info.name if inst.programme_type_info else 'Unknown',
-                    'courses_count': len(inst.courses) if hasattr(inst, 'courses') else 0
-                }
-                institutions.append(institution)
-            except Exception as inst_error:
-                current_app.logger.error(f"Error processing institution {inst.id}: {str(inst_error)}")
-                continue
+        # Rotation is picked in Python from a cached pool, so a warm call runs no queries
+        institutions = pick_featured()
+        current_app.logger.debug(f"[FEATURED] Picked {len(institutions)} featured institutions")
         
         return jsonify({
             'status': 'success',
@@ -183,30 +210,7 @@ def get_featured_institutions():
 def get_programme_types():
     """Get all programme types"""
     try:
-        programme_types = db.session.query(
-            ProgrammeType.name,
-            ProgrammeType.category,
-            ProgrammeType.institution_type
-        ).order_by(ProgrammeType.name).all()
-        
-        if not programme_types:
-            current_app.logger.warning("No programme types found in database")
-            return jsonify({
-                "status": "error",
-                "message": "No programme types available"
-            }), 404
-            
-        types = [{
-            'name': pt.name,
-            'category': pt.category,
-            'institution_type': pt.institution_type
-        } for pt in programme_types]
-        current_app.logger.info(f"Retrieved {len(types)} programme types")
-        
-        return jsonify({
-            "status": "success",
-            "data": types
-        })
+        return encoded_response(reference_data.programme_types())
         
     except Exception as e:
         current_app.logger.error(f"Error retrieving programme types: {str(e)}", exc_info=True)
@@ -220,45 +224,15 @@ def get_programme_types():
 def get_programme_types_by_state(state):
     """Get programme types available in a specific state"""
     try:
-        # Validate state parameter
-        state_obj = db.session.query(State).filter(func.lower(State.name) == func.lower(state)).first()
-        if not state_obj:
+        encoded = reference_data.programme_types_for_state(state)
+        if encoded is None:
             current_app.logger.warning(f"Invalid state requested: {state}")
             return jsonify({
                 "status": "error",
                 "message": f"Invalid state: {state}"
             }), 404
             
-        # Query programme types for universities in the state
-        programme_types = db.session.query(
-            ProgrammeType.name,
-            ProgrammeType.category,
-            ProgrammeType.institution_type
-        ).join(
-            University, 
-            University.programme_type_id == ProgrammeType.id
-        ).filter(
-            University.state_id == state_obj.id
-        ).distinct().order_by(ProgrammeType.name).all()
-            
-        if not programme_types:
-            current_app.logger.warning(f"No programme types found for state: {state}")
-            return jsonify({
-                "status": "error",
-                "message": f"No programme types available for {state}"
-            }), 404
-            
-        types = [{
-            'name': pt.name,
-            'category': pt.category,
-            'institution_type': pt.institution_type
-        } for pt in programme_types]
-        current_app.logger.info(f"Retrieved {len(types)} programme types for {state}")
-        
-        return jsonify({
-            "status": "success",
-            "data": types
-        })
+        return encoded_response(encoded)
         
     except Exception as e:
         current_app.logger.error(f"Error retrieving programme types for {state}: {str(e)}", exc_info=True)
@@ -268,7 +242,41 @@ def get_programme_types_by_state(state):
             "details": str(e) if current_app.debug else None
         }), 500
 
+def _courses_from_snapshot():
+    """Course listing computed from the in-memory catalogue snapshot"""
+    data = request.get_json(silent=True) or {}
+    state = data.get('state')
+    programme_types = [t for t in data.get('programme_type', '').split(',') if t]
+    counts = get_catalogue_snapshot().course_institution_counts(
+        state=state if state and state != 'ALL' else None,
+        programme_types=programme_types or None
+    )
+    courses = [{
+        'id': course.id,
+        'course_name': course.course_name,
+        'code': course.code,
+        'institution_count': institution_count
+    } for course, institution_count in counts]
+    return jsonify({'status': 'success', 'courses': courses, 'total': len(courses), 'degraded': True})
+
+
+def _search_degraded():
+    return jsonify({'universities': [], 'courses': [], 'degraded': True})
+
+
+def _search_institutions_degraded():
+    return jsonify({
+        'status': 'success',
+        'count': 0,
+        'institutions': [],
+        'pagination': {'page': 1, 'pages': 0, 'has_next': False, 'has_prev': False, 'total': 0},
+        'degraded': True
+    })
+
+
 @bp.route('/courses', methods=['POST'])
+@query_budget('search', fallback=_courses_from_snapshot)
+@use_replica
 def get_courses():
     try:
         # Add CSRF protection
@@ -294,64 +302,93 @@ def get_courses():
         
         current_app.logger.debug(f"Getting courses for state: {state}, types: {programme_types}")
         
-        # Build base query
-        query = db.session.query(
-            Course.id,
-            Course.course_name,
-            Course.code,
-            func.count(distinct(University.id)).label('institution_count')
-        ).join(
-            CourseRequirement,
-            Course.id == CourseRequirement.course_id
-        ).join(
-            University,
-            CourseRequirement.university_id == University.id
-        ).join(
-            State,
-            University.state_id == State.id
-        ).join(
-            ProgrammeType,
-            University.programme_type_id == ProgrammeType.id
-        )
-        
-        # Apply filters
-        if state and state != 'ALL':
-            query = query.filter(State.name == state)
-        
-        if programme_types and programme_types[0]:
-            query = query.filter(ProgrammeType.name.in_(programme_types))
-        
-        # Group and order
-        query = query.group_by(
-            Course.id,
-            Course.course_name,
-            Course.code
-        ).order_by(Course.course_name)
-        
-        # Execute query
-        courses = query.all()
-        
-        # Format response
-        response_data = [{
-            'id': course.id,
-            'course_name': course.course_name,
-            'code': course.code,
-            'institution_count': course.institution_count
-        } for course in courses]
+        def build_courses():
+            by_state = bool(state and state != 'ALL')
+            by_types = bool(programme_types and programme_types[0])
+            rows = COURSE_LISTINGS[(by_state, by_types)].execute({
+                'state': state,
+                'programme_types': programme_types
+            }).all()
+            
+            courses = COURSE_LISTING_SCHEMA.dump_many(rows)
+            current_app.logger.info(f"Found {len(courses)} courses")
+            return {
+                'status': 'success',
+                'courses': courses,
+                'total': len(courses)
+            }
         
-        current_app.logger.info(f"Found {len(response_data)} courses")
+        # Listings only change with the catalogue, so the encoded body is reused
+        cache_key = f"courses:{get_catalogue_version()}:{state}:{','.join(sorted(programme_types))}"
+        return json_bytes_response(cached_json(cache_key, build_courses, timeout=3600))
         
+    except Exception as e:
+        current_app.logger.error(f"Error getting courses: {str(e)}", exc_info=True)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/eligibility', methods=['POST'])
+@use_replica
+def check_eligibility():
+    """Match a candidate's O'level credits and UTME subjects against every course requirement"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                'status': 'error',
+                'message': 'No data provided'
+            }), 400
+
+        try:
+            profile = CandidateProfile.from_dict(data)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+
+        if not profile.olevel_subjects:
+            return jsonify({
+                'status': 'error',
+                'message': "At least one O'level subject is required"
+            }), 400
+
+        try:
+            limit = int(data.get('limit', 200))
+        except (TypeError, ValueError):
+            return jsonify({
+                'status': 'error',
+                'message': 'limit must be a number'
+            }), 400
+        if limit < 1:
+            return jsonify({
+                'status': 'error',
+                'message': 'limit must be at least 1'
+            }), 400
+        limit = min(limit, 1000)
+        result = eligibility_engine.evaluate(profile, limit=limit)
+
+        current_app.logger.info(
+            f"Eligibility check matched {result['total']} of {result['evaluated']} "
+            f"requirements in {result['elapsed_ms']}ms"
+        )
+
         return jsonify({
             'status': 'success',
-            'courses': response_data,
-            'total': len(response_data)
+            'total': result['total'],
+            'evaluated': result['evaluated'],
+            'elapsed_ms': result['elapsed_ms'],
+            'results': result['results']
         })
-        
+
     except Exception as e:
-        current_app.logger.error(f"Error getting courses: {str(e)}", exc_info=True)
+        current_app.logger.error(f"Error checking eligibility: {str(e)}", exc_info=True)
         return jsonify({
             'status': 'error',
-            'message': str(e)
+            'message': 'Failed to check eligibility',
+            'details': str(e) if current_app.debug else None
         }), 500
 
 @contextmanager
@@ -444,71 +481,80 @@ def remove_bookmark(university_id):
         }), 500
 
 @bp.route('/search', methods=['GET'])
+@query_budget('search', fallback=_search_degraded)
 def search():
-    query_text = request.args.get("q", "").lower()
+    query_text = normalize_query(request.args.get("q", ""))
     state = request.args.get("state")
     program_type = request.args.get("program_type")
 
     try:
-        universities_query = University.query.filter(
-            University.university_name.ilike(f"%{query_text}%")
-        )
-        if state:
-            universities_query = universities_query.filter(
-                University.state.ilike(f"%{state}%")
+        cache_key = search_key('api_search', query_text, state, program_type)
+        query_log.record(KIND_API_SEARCH, query_text, state, program_type)
+        results = cache.get(cache_key)
+        if results is None:
+            results = search_flight.do(
+                cache_key,
+                lambda: _search_results(query_text, state, program_type),
+                timeout=SEARCH_TIMEOUT
             )
-        if program_type:
-            universities_query = universities_query.filter(
-                University.program_type.ilike(f"%{program_type}%")
-            )
-        universities = universities_query.all()
-
-        courses_query = Course.query.join(
-            CourseRequirement,
-            CourseRequirement.course_id == Course.id
-        ).join(
-            University,
-            University.id == CourseRequirement.university_id
-        ).filter(
-            (Course.course_name.ilike(f"%{query_text}%")) |
-            (University.abbrv.ilike(f"%{query_text}%"))
-        )
-        courses = courses_query.all()
-
-        return jsonify({
-            "universities": [
-                {
-                    "university_name": uni.university_name,
-                    "state": uni.state,
-                    "program_type": uni.program_type,
-                }
-                for uni in universities
-            ],
-            "courses": [
-                {
-                    "id": course.id,
-                    "course_name": course.course_name,
-                    "requirements": [{
-                        "university_name": req.university.university_name,
-                        "abbrv": req.university.abbrv,
-                        "direct_entry_requirements": req.direct_entry_requirements,
-                        "utme_requirements": req.utme_requirements,
-                        "subjects": req.subject_requirement.subjects if req.subject_requirement else None
-                    } for req in course.requirements]
-                }
-                for course in courses
-            ],
-        })
+        return jsonify(results)
     except Exception as e:
         current_app.logger.error(f"Error in search: {str(e)}")
         return jsonify({
             "error": "An error occurred while processing your search."
         }), 500
 
+def _search_results(query_text, state, program_type):
+    """Run the API search for an already normalised query"""
+    pattern = like_pattern(query_text)
+    # Outer joins keep institutions without a state or programme type in the results
+    universities_query = University.query\
+        .outerjoin(State, University.state_id == State.id)\
+        .outerjoin(ProgrammeType, University.programme_type_id == ProgrammeType.id)\
+        .filter(University.university_name.ilike(pattern))
+    if state:
+        universities_query = universities_query.filter(State.name.ilike(f"%{state}%"))
+    if program_type:
+        universities_query = universities_query.filter(ProgrammeType.name.ilike(f"%{program_type}%"))
+    universities = universities_query.all()
+
+    courses_query = Course.query.join(
+        CourseRequirement,
+        CourseRequirement.course_id == Course.id
+    ).join(
+        University,
+        University.id == CourseRequirement.university_id
+    ).options(
+        # One extra query loads every matched course's requirements for the serialiser
+        selectinload(Course.requirements).options(
+            joinedload(CourseRequirement.university),
+            joinedload(CourseRequirement.subject_requirement)
+        )
+    ).filter(
+        (Course.course_name.ilike(pattern)) |
+        (University.abbrv.ilike(pattern))
+    ).distinct()
+    courses = courses_query.all()
+
+    return {
+        "universities": SEARCH_UNIVERSITY_SCHEMA.dump_many(universities),
+        "courses": SEARCH_COURSE_SCHEMA.dump_many(courses),
+    }
+
+def _warm_search(query_text, state, program_type):
+    cache.set(
+        search_key('api_search', query_text, state, program_type),
+        _search_results(query_text, state, program_type),
+        timeout=SEARCH_TIMEOUT
+    )
+
+cache_warmer.register(KIND_API_SEARCH, _warm_search)
+
 @bp.route('/search_institutions', methods=['GET'])
+@query_budget('search', fallback=_search_institutions_degraded)
 def search_institutions():
     try:
-        search_term = request.args.get('search', '').lower()
+        search_term = normalize_query(request.args.get('search', ''))
         state = request.args.get('state')
         types = request.args.getlist('type')
         program_types = request.args.getlist('program')
@@ -526,9 +572,9 @@ def search_institutions():
         if search_term:
             query = query.filter(
                 db.or_(
-                    University.university_name.ilike(f'%{search_term}%'),
-                    State.name.ilike(f'%{search_term}%'),
-                    ProgrammeType.name.ilike(f'%{search_term}%')
+                    University.university_name.ilike(like_pattern(search_term)),
+                    State.name.ilike(like_pattern(search_term)),
+                    ProgrammeType.name.ilike(like_pattern(search_term))
                 )
             )
 
@@ -544,13 +590,7 @@ def search_institutions():
         return jsonify({
             'status': 'success',
             'count': pagination.total,
-            'institutions': [{
-                'id': inst.id,
-                'name': inst.university_name,
-                'state': inst.state_info.name,
-                'type': inst.programme_type_info.name,
-                'courses_count': len(inst.courses)
-            } for inst in pagination.items],
+            'institutions': UNIVERSITY_CARD_SCHEMA.dump_many(pagination.items),
             'pagination': {
                 'page': pagination.page,
                 'pages': pagination.pages,
@@ -710,58 +750,14 @@ def get_institution_details(id):
     try:
         # Get query parameters
         selected_course = request.args.get('selected_course')
-        
-        # Query university with eager loading of relationships
-        university = University.query\
-            .options(joinedload(University.state_info))\
-            .options(joinedload(University.programme_type_info))\
-            .options(joinedload(University.courses))\
-            .get_or_404(id)
-        
-        # Get requirements with proper joins
-        requirements = CourseRequirement.query\
-            .filter_by(university_id=id)\
-            .options(joinedload(CourseRequirement.course))\
-            .all()
-        
-        current_app.logger.info(f"Found {len(requirements)} requirements for university {id}")
-        
-        # Create requirements lookup
-        req_lookup = {req.course_id: req for req in requirements}
-        
-        # Get courses with requirements
-        courses = Course.query\
-            .join(CourseRequirement)\
-            .filter(CourseRequirement.university_id == id)\
-            .order_by(Course.course_name)\
-            .all()
-        
-        current_app.logger.info(f"Found {len(courses)} courses for university {id}")
-        
-        # Format response
-        response_data = {
-            "id": university.id,
-            "university_name": university.university_name,
-            "state": university.state_info.name,  # Use state_info relationship
-            "program_type": university.programme_type_info.name,  # Use programme_type_info relationship
-            "website": university.website,
-            "established": university.established,
-            "abbrv": university.abbrv,
-            "selected_course": selected_course,
-            "courses": []
-        }
-        
-        # Add course data
-        for course in courses:
-            req = req_lookup.get(course.id)
-            course_data = {
-                "id": course.id,
-                "course_name": course.course_name,
-                "utme_requirements": req.utme_requirements if req else None,
-                "direct_entry_requirements": req.direct_entry_requirements if req else None,
-                "subjects": req.subject_requirement.subjects if req and req.subject_requirement else None
-            }
-            response_data["courses"].append(course_data)
+        query_log.record(KIND_INSTITUTION, id, selected_course)
+
+        # Keyed on the catalogue version, so a sync makes it miss
+        cache_key = f"institution:{fragment_vary(id, selected_course)}"
+        response_data = cache.get(cache_key)
+        if response_data is None:
+            response_data = _institution_details(id, selected_course)
+            cache.set(cache_key, response_data, timeout=FRAGMENT_TIMEOUT)
         
         return jsonify(response_data)
         
@@ -772,6 +768,49 @@ def get_institution_details(id):
             "details": str(e) if current_app.debug else None
         }), 500
 
+def _institution_details(id, selected_course):
+    """Build the institution details payload with its courses"""
+    # Query university with its lookup relationships only
+    university = University.query\
+        .options(joinedload(University.state_info))\
+        .options(joinedload(University.programme_type_info))\
+        .get_or_404(id)
+    
+    # Get courses with their requirement columns in one query; template
+    # text is resolved from the interned template cache
+    rows = db.session.query(
+        Course.id,
+        Course.course_name,
+        CourseRequirement.utme_template_id,
+        CourseRequirement.de_template_id,
+        SubjectRequirement.subjects
+    ).join(
+        CourseRequirement,
+        CourseRequirement.course_id == Course.id
+    ).outerjoin(
+        SubjectRequirement,
+        SubjectRequirement.course_requirement_id == CourseRequirement.id
+    ).filter(
+        CourseRequirement.university_id == id
+    ).order_by(Course.course_name).all()
+    
+    current_app.logger.info(f"Found {len(rows)} courses for university {id}")
+    
+    return UNIVERSITY_SCHEMA.dump(
+        university,
+        selected_course=selected_course,
+        courses=INSTITUTION_COURSE_SCHEMA.dump_many(rows)
+    )
+
+def _warm_institution(id, selected_course):
+    cache.set(
+        f"institution:{fragment_vary(id, selected_course)}",
+        _institution_details(id, selected_course),
+        timeout=FRAGMENT_TIMEOUT
+    )
+
+cache_warmer.register(KIND_INSTITUTION, _warm_institution)
+
 @bp.route('/institution/<int:id>/comment', methods=['POST'])
 @login_required
 def add_institution_comment(id):
@@ -844,20 +883,20 @@ def add_institution_comment(id):
 @bp.route('/api/institution/<int:institution_id>/comments', methods=['GET'])
 def get_institution_comments(institution_id):
     try:
-        institution = University.query.get_or_404(institution_id)
-        comments = Comment.query\
-            .filter_by(university_id=institution_id, parent_id=None)\
-            .order_by(Comment.date_posted.desc())\
-            .all()
+        if not db.session.query(University.id).filter_by(id=institution_id).first():
+            return jsonify({'error': 'Institution not found'}), 404
+
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        comment_page = load_comment_page(
+            university_id=institution_id,
+            cursor=request.args.get('cursor'),
+            per_page=per_page
+        )
             
         return jsonify({
-            'comments': [{
-                'id': comment.id,
-                'content': comment.content,
-                'author': comment.author.username,
-                'date_posted': comment.date_posted.strftime('%Y-%m-%d %H:%M:%S'),
-                'user_id': comment.user_id
-            } for comment in comments]
+            'comments': [comment.to_dict() for comment in comment_page.threads],
+            'next_cursor': comment_page.next_cursor,
+            'has_more': comment_page.has_more
         }), 200
         
     except Exception as e:
@@ -6,6 +6,7 @@ from ..forms.auth import LoginForm, SignupForm, ChangePasswordForm, ResendVerifi
 from ..extensions import db
 from ..utils.security import generate_verification_token, confirm_verification_token
 from ..utils.email import send_verification_email
+from ..utils.db_routing import use_primary
 from sqlalchemy import func
 
 bp = Blueprint('auth', __name__)
@@ -100,6 +101,7 @@ def logout():
     return redirect(url_for('main.home'))
 
 @bp.route('/verify_email/<token>')
+@use_primary
 def verify_email(token):
     try:
         email = confirm_verification_token(token)
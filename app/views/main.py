@@ -13,12 +13,18 @@ from flask import (
 from flask_login import login_required, current_user
 from ..models.feedback import Feedback
 from ..forms.feedback import ContactForm
-from ..extensions import db, cache
+from ..extensions import db
 from ..models.interaction import Comment
 from ..models.university import University, Course, CourseRequirement, State, ProgrammeType
 from ..models.user import User
 from ..utils.search import perform_search
-from sqlalchemy import or_, func, text
+from ..utils.comment_tree import load_comment_page
+from ..utils.fragment_cache import fragment_vary, get_fragment
+from ..utils.query_normalize import normalize_query, like_pattern
+from ..utils.query_budget import query_budget
+from ..utils.hot_queries import hot_queries
+from ..utils.page_data import PageQuery, load_page_data
+from sqlalchemy import or_, func, select, text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import load_only
@@ -36,19 +42,25 @@ def about():
     return render_template("about.html")
 
 
+def _search_degraded():
+    return render_template("search_results.html", degraded=True, query=request.args.get("q", "").strip())
+
+
 @bp.route("/search")
+@query_budget('search', fallback=_search_degraded)
 def search():
-    query_text = request.args.get("q", "").strip()
+    query_text = normalize_query(request.args.get("q", ""))
     state = request.args.get("state")
     types = request.args.getlist("type")
 
     try:
-        # Add caching for search results
-        cache_key = f"search_{query_text}_{state}_{'-'.join(sorted(types))}"
-        cached_results = cache.get(cache_key)
-
-        if cached_results:
-            return cached_results
+        # The results block is cached as a template fragment; the page shell
+        # (navigation, login state) is always rendered for the current user.
+        # The normalised query makes equivalent spellings share a fragment.
+        results_vary = fragment_vary(query_text, state, sorted(types))
+        results_html = get_fragment('search_results', results_vary)
+        if results_html is not None:
+            return render_template("search_results.html", results_html=results_html)
 
         # Get available states and types for filters
         available_states = db.session.query(State.name).order_by(State.name).all()
@@ -74,7 +86,7 @@ def search():
             )\
             .filter(
                 or_(
-                    University.university_name.ilike(f"%{query_text}%"),
+                    University.university_name.ilike(like_pattern(query_text)),
                     text("university.search_vector @@ plainto_tsquery('english', :query)")
                     .bindparams(query=query_text),
                 )
@@ -92,7 +104,7 @@ def search():
             )\
             .filter(
                 or_(
-                    Course.course_name.ilike(f"%{query_text}%"),
+                    Course.course_name.ilike(like_pattern(query_text)),
                     text("course.search_vector @@ plainto_tsquery('english', :query)")
                     .bindparams(query=query_text),
                 )
@@ -111,8 +123,7 @@ def search():
         universities = universities_query.all()
         courses = courses_query.distinct(Course.id).all()
 
-        # Cache the results
-        response = render_template(
+        return render_template(
             "search_results.html",
             query=query_text,
             universities=universities,
@@ -124,10 +135,8 @@ def search():
             selected_state=state,
             selected_types=types,
             total_results=len(universities) + len(courses),
+            results_vary=results_vary,
         )
-        
-        cache.set(cache_key, response, timeout=300)  # Cache for 5 minutes
-        return response
 
     except Exception as e:
         current_app.logger.error(f"Search error: {str(e)}")
@@ -148,11 +157,11 @@ def profile(username):
 def contact():
     form = ContactForm()
     
-    # Get general comments (not associated with any university)
-    comments = Comment.query.filter_by(
-        university_id=None,  # Only get general comments
-        parent_id=None  # Only get top-level comments
-    ).order_by(Comment.date_posted.desc()).all()
+    # Get general comments (not associated with any university) with their replies
+    comment_page = load_comment_page(
+        university_id=None,
+        cursor=request.args.get('comments_cursor')
+    )
     
     if form.validate_on_submit():
         feedback = Feedback(
@@ -177,7 +186,8 @@ def contact():
 
     return render_template('contact.html', 
                          form=form,
-                         comments=comments)
+                         comments=comment_page.threads,
+                         comments_next_cursor=comment_page.next_cursor)
 
 
 @bp.route("/add_comment", methods=["POST"])
@@ -220,6 +230,15 @@ def delete_comment(comment_id):
     return redirect(url_for("main.contact"))
 
 
+# Filter options for the institutions listing
+ALL_STATES = hot_queries.register('institutions_states', select(State.name).order_by(State.name))
+ALL_INSTITUTION_TYPES = hot_queries.register(
+    'institutions_types', select(ProgrammeType.name).distinct().order_by(ProgrammeType.name)
+)
+ALL_PROGRAMME_CATEGORIES = hot_queries.register(
+    'institutions_categories', select(ProgrammeType.category).distinct().order_by(ProgrammeType.category)
+)
+
 @bp.route("/institutions")
 def institutions():
     try:
@@ -235,8 +254,7 @@ def institutions():
             .join(ProgrammeType, University.programme_type_id == ProgrammeType.id)\
             .options(
                 joinedload(University.state_info),
-                joinedload(University.programme_type_info),
-                joinedload(University.courses)
+                joinedload(University.programme_type_info)
             )
 
         # Apply filters
@@ -255,10 +273,12 @@ def institutions():
         elif sort == "type":
             query = query.order_by(ProgrammeType.name, University.university_name)
 
-        # Get all states and institution types for filters
-        states = db.session.query(State.name).order_by(State.name).all()
-        institution_types = db.session.query(ProgrammeType.name).distinct().order_by(ProgrammeType.name).all()
-        program_type_list = db.session.query(ProgrammeType.category).distinct().order_by(ProgrammeType.category).all()
+        # Get all states and institution types for filters, loaded together
+        filters = load_page_data([
+            PageQuery('states', ALL_STATES, shape='scalars'),
+            PageQuery('institution_types', ALL_INSTITUTION_TYPES, shape='scalars'),
+            PageQuery('program_types', ALL_PROGRAMME_CATEGORIES, shape='scalars'),
+        ])
 
         # Pagination
         page = request.args.get('page', 1, type=int)
@@ -270,9 +290,9 @@ def institutions():
             "institutions.html",
             institutions=institutions,
             pagination=pagination,
-            states=[state[0] for state in states],
-            institution_types=[type[0] for type in institution_types],
-            program_types=[prog[0] for prog in program_type_list],
+            states=filters['states'],
+            institution_types=filters['institution_types'],
+            program_types=filters['program_types'],
             selected_state=state,
             selected_types=types,
             selected_programs=program_types,
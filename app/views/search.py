@@ -50,24 +50,11 @@ def api_search():
         # Use the search utility function
         results = perform_search(query_text, state, program_type, page)
         
-        # Format response using the correct attribute names
+        # perform_search already returns the public item shapes; only the
+        # summary block is added here
         response = {
-            "universities": {
-                "items": [
-                    {
-                        "id": uni['id'],
-                        "university_name": uni['university_name'],
-                        "state": uni['state_name'],  # Match the column alias from search query
-                        "program_type": uni['program_type_name'],  # Match the column alias from search query
-                    }
-                    for uni in results['universities']['items']
-                ],
-                "total": results['universities']['total'],
-                "has_next": results['universities']['has_next'],
-                "has_prev": results['universities']['has_prev'],
-                "page": page,
-            },
-            "courses": results['courses'],  # Keep courses as is
+            "universities": results['universities'],
+            "courses": results['courses'],
             "metadata": {
                 "total_universities": results['universities']['total'],
                 "total_courses": results['courses']['total'],
@@ -77,7 +64,6 @@ def api_search():
             },
         }
 
-        current_app.logger.debug(f"Search response: {response}")
         return jsonify(response)
 
     except Exception as e:
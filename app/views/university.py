@@ -6,9 +6,16 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload
 from ..models.university import University, Course, CourseRequirement, State, ProgrammeType
 from ..models.interaction import Bookmark, Comment
-from ..extensions import db
+from ..models.requirement import SubjectRequirement
+from ..extensions import db, cache
 from ..config import Config
 from ..forms.comment import CommentForm
+from ..utils.template_cache import template_cache
+from ..utils.comment_tree import load_comment_page
+from ..utils.query_budget import query_budget
+from ..utils.fragment_cache import FRAGMENT_TIMEOUT, fragment_vary
+from ..utils.snapshot import get_catalogue_snapshot
+from ..utils.cache_warm import cache_warmer, query_log, KIND_RECOMMEND, KIND_INSTITUTION
 
 bp = Blueprint("university", __name__)
 
@@ -20,117 +27,22 @@ def recommend():
         programme_types = request.args.get('programme_type', '').split(',')
         course = request.args.get('course', '')
         page = int(request.args.get('page', 1))
-        per_page = 10
-
-        # Build base query with eager loading
-        query = University.query\
-            .options(joinedload(University.state_info))\
-            .options(joinedload(University.programme_type_info))\
-            .options(joinedload(University.courses))\
-            .join(State, University.state_id == State.id)\
-            .join(ProgrammeType, University.programme_type_id == ProgrammeType.id)
-
-        # If course is specified, join with course tables
-        if course and course != 'ALL':
-            query = query.join(CourseRequirement, University.id == CourseRequirement.university_id)\
-                        .join(Course, Course.id == CourseRequirement.course_id)\
-                        .filter(Course.course_name == course)
-
-        # Apply filters
-        if location:
-            query = query.filter(State.name == location)
-        
-        if programme_types and programme_types[0]:
-            query = query.filter(ProgrammeType.name.in_(programme_types))
-
-        # Get total count before pagination
-        total = query.count()
-        
-        # Add pagination
-        paginated_unis = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        # Format universities for display
-        recommendations = []
-        for uni in paginated_unis.items:
-            uni_data = {
-                'id': uni.id,
-                'university_name': uni.university_name,
-                'state': uni.state_info.name,  # Use state_info relationship
-                'program_type': uni.programme_type_info.name,  # Use programme_type_info relationship
-                'total_courses': len(uni.courses),
-                'selected_course': course if course else None
-            }
-            recommendations.append(uni_data)
-
-        # Get available filters based on current selection
-        available_states = db.session.query(State.name)\
-            .join(University)\
-            .distinct()\
-            .order_by(State.name)\
-            .all()
-        available_states = [state[0] for state in available_states]
-
-        available_program_types = db.session.query(ProgrammeType.name)\
-            .join(University)\
-            .distinct()\
-            .order_by(ProgrammeType.name)\
-            .all()
-        available_program_types = [pt[0] for pt in available_program_types]
-
-        # Get active filters (those that would return results)
-        active_query = University.query
-        if course and course != 'ALL':
-            active_query = active_query.join(CourseRequirement)\
-                                     .join(Course)\
-                                     .filter(Course.course_name == course)
-
-        active_states = db.session.query(State.name)\
-            .join(University, State.id == University.state_id)\
-            .filter(University.id.in_(active_query.with_entities(University.id)))\
-            .distinct()\
-            .all()
-        active_states = [state[0] for state in active_states]
-
-        active_program_types = db.session.query(ProgrammeType.name)\
-            .join(University, ProgrammeType.id == University.programme_type_id)\
-            .filter(University.id.in_(active_query.with_entities(University.id)))\
-            .distinct()\
-            .all()
-        active_program_types = [pt[0] for pt in active_program_types]
-
-        # Get counts for filters
-        state_counts = dict(
-            db.session.query(State.name, func.count(University.id))
-            .join(University, State.id == University.state_id)
-            .group_by(State.name)
-            .all()
-        )
+        query_log.record(KIND_RECOMMEND, location, programme_types, course, page)
 
-        program_type_counts = dict(
-            db.session.query(ProgrammeType.name, func.count(University.id))
-            .join(University, ProgrammeType.id == University.programme_type_id)
-            .group_by(ProgrammeType.name)
-            .all()
-        )
+        # Everything but the bookmarks is the same for every viewer, and is
+        # keyed on the catalogue version
+        cache_key = f"recommend:{fragment_vary(location, programme_types, course, page)}"
+        data = cache.get(cache_key)
+        if data is None:
+            data = _recommendation_data(location, programme_types, course, page)
+            cache.set(cache_key, data, timeout=FRAGMENT_TIMEOUT)
 
         return render_template('recommend.html',
-            recommendations=recommendations,
-            total_results=total,
-            page=page,
-            per_page=per_page,
-            total_pages=paginated_unis.pages,
-            has_next=paginated_unis.has_next,
-            has_prev=paginated_unis.has_prev,
             location=location,
             programme_types=programme_types,
             course=course,
-            available_states=available_states,
-            available_program_types=available_program_types,
-            active_states=active_states,
-            active_program_types=active_program_types,
-            state_counts=state_counts,
-            program_type_counts=program_type_counts,
-            user_bookmarks=get_user_bookmarks() if current_user.is_authenticated else []
+            user_bookmarks=get_user_bookmarks() if current_user.is_authenticated else [],
+            **data
         )
 
     except Exception as e:
@@ -140,6 +52,63 @@ def recommend():
             error="An error occurred while fetching recommendations."
         )
 
+def _recommendation_data(location, programme_types, course, page):
+    """Load one page of recommendations with the filter facets.
+
+    Everything comes from the shared catalogue snapshot, so a cache miss
+    runs no queries.
+    """
+    per_page = 10
+    snapshot = get_catalogue_snapshot()
+    selected_types = programme_types if programme_types and programme_types[0] else None
+    matches = snapshot.universities(snapshot.university_mask(
+        state=location or None,
+        programme_types=selected_types,
+        course=course,
+        classified=True
+    ))
+
+    total = len(matches)
+    total_pages = -(-total // per_page)
+    page = max(page, 1)
+    recommendations = [{
+        'id': uni.id,
+        'university_name': uni.university_name,
+        'state': uni.state,
+        'program_type': uni.programme_type,
+        'total_courses': uni.course_count,
+        'selected_course': course if course else None
+    } for uni in matches[(page - 1) * per_page:page * per_page]]
+
+    # Active filters are those that would still return results
+    state_counts, program_type_counts = snapshot.facet_counts()
+    active_states, active_program_types = snapshot.facet_counts(snapshot.university_mask(course=course))
+
+    return {
+        'recommendations': recommendations,
+        'total_results': total,
+        'page': page,
+        'per_page': per_page,
+        'total_pages': total_pages,
+        'has_next': page < total_pages,
+        'has_prev': page > 1,
+        'available_states': list(state_counts),
+        'available_program_types': list(program_type_counts),
+        'active_states': list(active_states),
+        'active_program_types': list(active_program_types),
+        'state_counts': state_counts,
+        'program_type_counts': program_type_counts
+    }
+
+def _warm_recommendations(location, programme_types, course, page):
+    cache.set(
+        f"recommend:{fragment_vary(location, programme_types, course, page)}",
+        _recommendation_data(location, programme_types, course, page),
+        timeout=FRAGMENT_TIMEOUT
+    )
+
+cache_warmer.register(KIND_RECOMMEND, _warm_recommendations)
+
 def get_filter_counts_and_options(query, location=None):
     """Get counts and available options for filters with state context"""
     # Start with base query that will be used for all counts
@@ -261,9 +230,9 @@ def format_university_results(universities, preferred_course=None):
                 requirement_data.append({
                     "id": req.course.id,
                     "course_name": req.course.course_name,
-                    "utme_requirements": req.utme_requirements,
+                    "utme_requirements": template_cache.utme_text(req.utme_template_id),
                     "subjects": req.subject_requirement.subjects if req.subject_requirement else None,
-                    "direct_entry_requirements": req.direct_entry_requirements,
+                    "direct_entry_requirements": template_cache.de_text(req.de_template_id),
                 })
             
             uni_data = {
@@ -274,7 +243,7 @@ def format_university_results(universities, preferred_course=None):
                 "website": uni.website,
                 "established": uni.established,
                 "abbrv": uni.abbrv,
-                "total_courses": len(uni.course_requirements),
+                "total_courses": uni.course_count,
                 "requirements": requirement_data,
                 "selected_course": preferred_course
             }
@@ -338,12 +307,13 @@ def get_course(course_id):
 @bp.route("/institution/<int:id>")
 def institution_details(id):
     try:
+        query_log.record(KIND_INSTITUTION, id, None)
         university = University.query.options(
             joinedload(University.state_info),
             joinedload(University.programme_type_info)
         ).get_or_404(id)
         
-        courses = university.courses
+        # Courses are only loaded by the template when their cached fragments miss
         
         # Get special requirements using the correct relationship name
         special_requirements = None
@@ -353,16 +323,16 @@ def institution_details(id):
                 'special_notes': university.special_institutional_requirements.special_notes
             }
         
-        # Use the unified Comment model
-        comments = Comment.query.filter_by(
-            university_id=id,  # Using university_id
-            parent_id=None  # Get only top-level comments
-        ).order_by(Comment.date_posted.desc()).all()
+        # Load a page of threads with all replies and authors in one query
+        comment_page = load_comment_page(
+            university_id=id,
+            cursor=request.args.get('comments_cursor')
+        )
         
         return render_template('institution_details.html',
                              university=university,
-                             courses=courses,
-                             comments=comments,
+                             comments=comment_page.threads,
+                             comments_next_cursor=comment_page.next_cursor,
                              special_requirements=special_requirements)
     except Exception as e:
         current_app.logger.error(f"Error in institution_details: {str(e)}")
@@ -402,15 +372,32 @@ def get_institution_courses(id):
                   .limit(per_page)
                   .all())
 
-        # Format response using relationships
+        # Fetch this institution's requirement rows for the page in one query
+        requirements_by_course = {}
+        if courses:
+            requirement_rows = db.session.query(
+                CourseRequirement.course_id,
+                CourseRequirement.utme_template_id,
+                CourseRequirement.de_template_id,
+                SubjectRequirement.subjects
+            ).outerjoin(
+                SubjectRequirement,
+                SubjectRequirement.course_requirement_id == CourseRequirement.id
+            ).filter(
+                CourseRequirement.university_id == id,
+                CourseRequirement.course_id.in_([course.id for course in courses])
+            ).all()
+            for row in requirement_rows:
+                requirements_by_course.setdefault(row.course_id, []).append({
+                    'utme_requirements': template_cache.utme_text(row.utme_template_id),
+                    'direct_entry_requirements': template_cache.de_text(row.de_template_id),
+                    'subjects': row.subjects
+                })
+
         course_list = [{
             'id': course.id,
             'course_name': course.course_name,
-            'requirements': [{
-                'utme_requirements': req.utme_requirements,
-                'direct_entry_requirements': req.direct_entry_requirements,
-                'subjects': req.subject_requirement.subjects if req.subject_requirement else None
-            } for req in course.requirements if req.university_id == id]
+            'requirements': requirements_by_course.get(course.id, [])
         } for course in courses]
 
         return jsonify({
@@ -430,6 +417,7 @@ def get_institution_courses(id):
         }), 500
 
 @bp.route("/institutions/suggest")
+@query_budget('autocomplete')
 def suggest_institutions():
     """Endpoint for institution name autocomplete suggestions"""
     try:
@@ -439,12 +427,14 @@ def suggest_institutions():
 
         # Get suggestions limited to 10 results
         suggestions = (University.query
+                     .outerjoin(State, University.state_id == State.id)
+                     .outerjoin(ProgrammeType, University.programme_type_id == ProgrammeType.id)
                      .filter(University.university_name.ilike(f'%{query}%'))
                      .with_entities(
                          University.id,
                          University.university_name,
-                         University.state,
-                         University.program_type
+                         State.name.label('state'),
+                         ProgrammeType.name.label('program_type')
                      )
                      .order_by(University.university_name)
                      .limit(10)
@@ -462,6 +452,7 @@ def suggest_institutions():
         return jsonify([])
 
 @bp.route("/courses/suggest")
+@query_budget('autocomplete')
 def suggest_courses():
     try:
         query = request.args.get('q', '').strip()
@@ -1,7 +1,34 @@
 # Gunicorn configuration file
+import os
+
 bind = "0.0.0.0:10000"
-workers = 3
+
+# Keep in step with the pool sizing in app/config.py, which reads the same
+# variables to give each worker one connection per concurrent request
+workers = int(os.getenv('WEB_CONCURRENCY', 3))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
 timeout = 120
 limit_request_line = 0
 limit_request_fields = 1000
-limit_request_field_size = 0 
\ No newline at end of file
+limit_request_field_size = 0 
+
+# Load the app once in the master so workers inherit it copy-on-write, and
+# publish the catalogue snapshot there for every worker to map
+preload_app = True
+
+def when_ready(server):
+    from wsgi import warm_catalogue_snapshot
+    warm_catalogue_snapshot()
+
+def on_reload(server):
+    # SIGHUP: republish the snapshot before the replacement workers fork
+    from wsgi import warm_catalogue_snapshot
+    warm_catalogue_snapshot()
+
+def post_fork(server, worker):
+    from wsgi import release_inherited_connections, start_cache_warmer
+    release_inherited_connections()
+    # Only the first worker to start warms a shared cache
+    start_cache_warmer()
@@ -0,0 +1,28 @@
+"""add shared catalogue version
+
+Revision ID: 44f225073905
+Revises: 44f225073904
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '44f225073905'
+down_revision = '44f225073904'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'catalogue_version',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False)
+    )
+    op.execute("""
+        INSERT INTO catalogue_version (id, version)
+        VALUES (1, (EXTRACT(EPOCH FROM now()) * 1000)::BIGINT)
+    """)
+
+def downgrade():
+    op.drop_table('catalogue_version')
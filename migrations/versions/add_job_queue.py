@@ -0,0 +1,53 @@
+"""add background job queue
+
+Revision ID: 44f225073904
+Revises: 44f225073903
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '44f225073904'
+down_revision = '44f225073903'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'job',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('args', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+        sa.Column('priority', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5'),
+        sa.Column('dedupe_key', sa.String(length=200), nullable=True),
+        sa.Column('run_at', sa.DateTime(), nullable=False, server_default=sa.text("(now() AT TIME ZONE 'utc')")),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text("(now() AT TIME ZONE 'utc')")),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('locked_by', sa.String(length=100), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+    )
+
+    # Workers claim due jobs from this index with SKIP LOCKED
+    op.create_index(
+        'idx_job_queued', 'job', [sa.text('priority DESC'), 'run_at'],
+        postgresql_where=sa.text("status = 'queued'")
+    )
+    # At most one queued job per dedupe key
+    op.create_index(
+        'uq_job_dedupe_queued', 'job', ['dedupe_key'], unique=True,
+        postgresql_where=sa.text("status = 'queued'")
+    )
+    op.create_index('idx_job_name_finished', 'job', ['name', 'finished_at'])
+
+def downgrade():
+    op.drop_index('idx_job_name_finished', table_name='job')
+    op.drop_index('uq_job_dedupe_queued', table_name='job')
+    op.drop_index('idx_job_queued', table_name='job')
+    op.drop_table('job')
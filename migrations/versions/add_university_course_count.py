@@ -0,0 +1,103 @@
+"""add denormalised course count to university
+
+Revision ID: 44f225073903
+Revises: 44f225073902
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '44f225073903'
+down_revision = '44f225073902'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column(
+        'university',
+        sa.Column('course_count', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Lets the trigger recount one university without scanning every requirement
+    op.create_index('idx_course_requirement_university_id', 'course_requirement', ['university_id'])
+
+    # Keep course_count equal to the number of distinct courses offered. The
+    # triggers are statement-level: a bulk load recounts each university it
+    # touched once, from the statement's transition tables, instead of once
+    # per row. Transition tables need one trigger per event.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION refresh_university_course_counts(target_ids INTEGER[])
+        RETURNS VOID AS $$
+        BEGIN
+            UPDATE university u
+            SET course_count = COALESCE(counts.course_count, 0)
+            FROM (SELECT DISTINCT unnest(target_ids) AS id) target
+            LEFT JOIN LATERAL (
+                SELECT COUNT(DISTINCT course_id) AS course_count
+                FROM course_requirement
+                WHERE university_id = target.id
+            ) counts ON TRUE
+            WHERE u.id = target.id
+            AND u.course_count IS DISTINCT FROM COALESCE(counts.course_count, 0);
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION course_requirement_course_count_trigger()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM refresh_university_course_counts(ARRAY(SELECT university_id FROM new_rows));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM refresh_university_course_counts(ARRAY(SELECT university_id FROM old_rows));
+            ELSE
+                -- Only rows whose university or course changed can move a count
+                PERFORM refresh_university_course_counts(ARRAY(
+                    SELECT unnest(ARRAY[o.university_id, n.university_id])
+                    FROM old_rows o
+                    JOIN new_rows n ON n.id = o.id
+                    WHERE (o.university_id, o.course_id) IS DISTINCT FROM (n.university_id, n.course_id)
+                ));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_course_requirement_course_count_insert
+        AFTER INSERT ON course_requirement
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION course_requirement_course_count_trigger();
+
+        CREATE TRIGGER trg_course_requirement_course_count_delete
+        AFTER DELETE ON course_requirement
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION course_requirement_course_count_trigger();
+
+        CREATE TRIGGER trg_course_requirement_course_count_update
+        AFTER UPDATE ON course_requirement
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION course_requirement_course_count_trigger();
+    """)
+
+    # Backfill existing rows
+    op.execute("""
+        UPDATE university u
+        SET course_count = counts.course_count
+        FROM (
+            SELECT university_id, COUNT(DISTINCT course_id) AS course_count
+            FROM course_requirement
+            GROUP BY university_id
+        ) counts
+        WHERE u.id = counts.university_id;
+    """)
+
+def downgrade():
+    op.execute("""
+        DROP TRIGGER IF EXISTS trg_course_requirement_course_count_insert ON course_requirement;
+        DROP TRIGGER IF EXISTS trg_course_requirement_course_count_delete ON course_requirement;
+        DROP TRIGGER IF EXISTS trg_course_requirement_course_count_update ON course_requirement;
+        DROP FUNCTION IF EXISTS course_requirement_course_count_trigger();
+        DROP FUNCTION IF EXISTS refresh_university_course_counts(INTEGER[]);
+    """)
+    op.drop_index('idx_course_requirement_university_id', table_name='course_requirement')
+    op.drop_column('university', 'course_count')
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import statistics
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+PAGES = [
+    ('GET', '/', None),
+    ('GET', '/institutions', None),
+    ('GET', '/recommend', None),
+    ('GET', '/search?q=medicine', None),
+    ('GET', '/api/search?q=engineering', None),
+    ('GET', '/api/institution/1', None),
+    ('POST', '/api/courses', {'state': 'ALL', 'programme_type': ''}),
+]
+
+ENCODINGS = ['identity', 'gzip', 'br']
+ROUNDS = 20
+
+
+def measure(client, method, path, payload, encoding):
+    """Return (median seconds to full body, body bytes) for one request shape"""
+    timings = []
+    size = 0
+    headers = {'Accept-Encoding': encoding}
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        if method == 'POST':
+            response = client.post(path, json=payload, headers=headers)
+        else:
+            response = client.get(path, headers=headers)
+        body = response.get_data()
+        timings.append(time.perf_counter() - start)
+        size = len(body)
+    return statistics.median(timings), size
+
+
+def benchmark_pages():
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    client = app.test_client()
+
+    print(f"{'Page':35} {'Encoding':9} {'Bytes':>10} {'Saved':>7} {'Server ms':>10}")
+    for method, path, payload in PAGES:
+        baseline = None
+        for encoding in ENCODINGS:
+            seconds, size = measure(client, method, path, payload, encoding)
+            if baseline is None:
+                baseline = size
+            saved = 100 - size * 100 / baseline if baseline else 0
+            print(f"{method + ' ' + path:35} {encoding:9} {size:>10,} {saved:>6.1f}% {seconds * 1000:>10.2f}")
+
+    # Static assets: a fingerprinted URL should come back immutable and precompressed
+    with app.test_request_context():
+        from flask import url_for
+        asset_url = url_for('static', filename='css/styles.css')
+    response = client.get(asset_url, headers={'Accept-Encoding': 'br, gzip'})
+    print(f"\n{asset_url}")
+    print(f"  Cache-Control: {response.headers.get('Cache-Control')}")
+    print(f"  Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}")
+    print(f"  Bytes: {len(response.get_data()):,}")
+
+
+if __name__ == '__main__':
+    benchmark_pages()
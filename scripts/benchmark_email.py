@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+import statistics
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiosmtpd.controller import Controller
+from flask import Flask
+from flask_mail import Message
+
+from app.extensions import mail
+from app.utils.mail_pool import mail_dispatcher, mail_stats
+
+
+class SlowHandler:
+    """Local SMTP stand-in that accepts every message after a delay."""
+
+    def __init__(self, latency_ms):
+        self.delay = latency_ms / 1000
+        self.lock = threading.Lock()
+        self.sessions = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        with self.lock:
+            self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        import asyncio
+        await asyncio.sleep(self.delay)
+        with self.lock:
+            self.messages += 1
+        return '250 Message accepted for delivery'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def make_app(port):
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_SERVER='127.0.0.1',
+        MAIL_PORT=port,
+        MAIL_USE_TLS=False,
+        MAIL_USE_SSL=False,
+        MAIL_DEFAULT_SENDER='noreply@example.com',
+        MAIL_MAX_EMAILS=100
+    )
+    mail.init_app(app)
+    return app
+
+
+def make_message(i):
+    msg = Message('Verify Your Email', recipients=[f'user{i}@example.com'])
+    msg.body = 'Please verify your email'
+    return msg
+
+
+def wait_for(handler, count, timeout=120):
+    deadline = time.monotonic() + timeout
+    while handler.messages < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def run_thread_per_email(app, handler, count):
+    """The previous behaviour: one thread and one SMTP session per message"""
+    def send(msg):
+        with app.app_context():
+            mail.send(msg)
+
+    submit = []
+    start = time.perf_counter()
+    with app.app_context():
+        for i in range(count):
+            t0 = time.perf_counter()
+            threading.Thread(target=send, args=(make_message(i),)).start()
+            submit.append(time.perf_counter() - t0)
+    wait_for(handler, count)
+    return submit, time.perf_counter() - start
+
+
+def run_dispatcher(app, handler, count):
+    submit = []
+    start = time.perf_counter()
+    with app.app_context():
+        for i in range(count):
+            t0 = time.perf_counter()
+            mail_dispatcher.submit(make_message(i))
+            submit.append(time.perf_counter() - t0)
+    wait_for(handler, count)
+    # Let the senders record the last replies before the server stops
+    mail_dispatcher.drain(30)
+    return submit, time.perf_counter() - start
+
+
+def report(label, handler, submit, elapsed):
+    ordered = sorted(submit)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(
+        f"{label:20} submit p50 {statistics.median(submit) * 1e6:8.1f} us  p99 {p99 * 1e6:8.1f} us  "
+        f"delivered {handler.messages} in {elapsed:6.2f}s over {handler.sessions} SMTP sessions"
+    )
+
+
+def benchmark_email():
+    parser = argparse.ArgumentParser(description="Thread-per-email vs pooled, batched delivery")
+    parser.add_argument('--count', type=int, default=300, help="emails in the signup burst")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="server delay per message")
+    args = parser.parse_args()
+
+    for label, runner in (('thread per email', run_thread_per_email), ('pooled dispatcher', run_dispatcher)):
+        handler = SlowHandler(args.latency_ms)
+        port = free_port()
+        controller = Controller(handler, hostname='127.0.0.1', port=port)
+        controller.start()
+        try:
+            app = make_app(port)
+            submit, elapsed = runner(app, handler, args.count)
+            report(label, handler, submit, elapsed)
+        finally:
+            controller.stop()
+
+    print(f"\nDispatcher metrics: {mail_stats.summary()}")
+
+
+if __name__ == '__main__':
+    benchmark_email()
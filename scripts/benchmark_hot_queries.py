@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import statistics
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.utils.search import UNIVERSITY_SEARCH, UNIVERSITY_COUNT, COURSE_SEARCH, COURSE_COUNT
+
+ITERATIONS = 5000
+QPS_LEVELS = [100, 500, 2000]
+SEARCH_PARAMS = {
+    'state': 'Lagos',
+    'program_type': None,
+    'query': 'medicine',
+    'like_query': '%medicine%',
+    'limit': 10,
+    'offset': 0
+}
+
+
+def client_cost(statement_factory, dialect, cache):
+    """CPU seconds per execution for the client-side statement work.
+
+    Mirrors what Connection.execute does before the driver is called:
+    build the statement, derive its cache key, look up (or compile) the
+    compiled form, and bind the parameters.
+    """
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        statement = statement_factory()
+        key = statement._generate_cache_key()
+        compiled = cache.get(key)
+        if compiled is None:
+            compiled = cache[key] = statement.compile(dialect=dialect)
+        compiled.construct_params(SEARCH_PARAMS)
+    return (time.process_time() - start) / ITERATIONS
+
+
+def benchmark_client_cpu():
+    from app.views.api import COURSE_LISTINGS, _course_listing_statement
+
+    dialect = postgresql.dialect()
+    statements = [
+        ('university_search', UNIVERSITY_SEARCH),
+        ('university_count', UNIVERSITY_COUNT),
+        ('course_search', COURSE_SEARCH),
+        ('course_count', COURSE_COUNT),
+    ]
+
+    print(f"{'Statement':28} {'per-call us':>12} {'prebuilt us':>12} {'saved us':>9}")
+    saved_per_search = 0.0
+    for name, hot in statements:
+        sql = hot.statement.text
+        before = client_cost(lambda: text(sql), dialect, {})
+        after = client_cost(lambda: hot.statement, dialect, {})
+        saved_per_search += before - after
+        print(f"{name:28} {before * 1e6:>12.1f} {after * 1e6:>12.1f} {(before - after) * 1e6:>9.1f}")
+
+    listing = COURSE_LISTINGS[(True, True)]
+    before = client_cost(lambda: _course_listing_statement(True, True), dialect, {})
+    after = client_cost(lambda: listing.statement, dialect, {})
+    print(f"{listing.name:28} {before * 1e6:>12.1f} {after * 1e6:>12.1f} {(before - after) * 1e6:>9.1f}")
+
+    # A search request runs all four search statements
+    print(f"\nClient CPU saved per search request: {saved_per_search * 1e6:.1f} us")
+    for qps in QPS_LEVELS:
+        print(f"  at {qps:>5} searches/s: {saved_per_search * qps * 1000:.1f} ms of CPU per second")
+
+
+def benchmark_database(rounds=200):
+    """Wall time per call against the configured database: text() per call vs prepared"""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    with app.app_context():
+        for name, hot in [('university_search', UNIVERSITY_SEARCH), ('course_count', COURSE_COUNT)]:
+            sql = hot.statement.text
+            params = {k: v for k, v in SEARCH_PARAMS.items() if f':{k}' in sql}
+
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                db.session.execute(text(sql), params).all()
+                timings.append(time.perf_counter() - start)
+            baseline = statistics.median(timings)
+
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                hot.execute(params).all()
+                timings.append(time.perf_counter() - start)
+            registry = statistics.median(timings)
+            db.session.rollback()
+
+            stats = hot.stats()
+            print(
+                f"{name:20} text() {baseline * 1000:.3f} ms  hot {registry * 1000:.3f} ms  "
+                f"(prepared calls {stats['prepared_calls']}, prepare {stats['prepare_ms']} ms)"
+            )
+
+
+if __name__ == '__main__':
+    benchmark_client_cpu()
+    if '--db' in sys.argv:
+        print()
+        benchmark_database()
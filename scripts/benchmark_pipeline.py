@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+import statistics
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+from app.views.university import (
+    AVAILABLE_STATES,
+    AVAILABLE_PROGRAMME_TYPES,
+    STATE_COUNTS,
+    PROGRAMME_TYPE_COUNTS
+)
+from app.utils.pipeline import compile_statement
+
+# The recommend page's filter and facet queries
+FACET_QUERIES = [AVAILABLE_STATES, AVAILABLE_PROGRAMME_TYPES, STATE_COUNTS, PROGRAMME_TYPE_COUNTS]
+
+
+class LatencyProxy:
+    """TCP proxy that delays every chunk by half the round-trip latency each way."""
+
+    def __init__(self, target_host, target_port, latency_ms):
+        self.target = (target_host, target_port)
+        self.delay = latency_ms / 2000
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(16)
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.server.accept()
+            upstream = socket.create_connection(self.target)
+            for src, dst in ((client, upstream), (upstream, client)):
+                threading.Thread(target=self._pipe, args=(src, dst), daemon=True).start()
+
+    def _pipe(self, src, dst):
+        try:
+            while True:
+                data = src.recv(65536)
+                if not data:
+                    break
+                time.sleep(self.delay)
+                dst.sendall(data)
+        except OSError:
+            pass
+        finally:
+            dst.close()
+
+
+def run_sequential(engine, rounds):
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for query in FACET_QUERIES:
+                conn.execute(query.statement).all()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run_pipelined(engine, rounds, binary):
+    timings = []
+    with engine.connect() as conn:
+        compiled = [compile_statement(query.statement, None, conn.dialect) for query in FACET_QUERIES]
+        driver_connection = conn.connection.driver_connection
+        for _ in range(rounds):
+            start = time.perf_counter()
+            cursors = []
+            with driver_connection.pipeline():
+                for sql, params in compiled:
+                    cursor = driver_connection.cursor(binary=binary)
+                    cursor.execute(sql, params)
+                    cursors.append(cursor)
+            for cursor in cursors:
+                cursor.fetchall()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def benchmark_pipeline():
+    parser = argparse.ArgumentParser(description="psycopg2 vs psycopg 3 pipeline mode for the recommend facets")
+    parser.add_argument('--dsn', default=os.getenv('SQLALCHEMY_DATABASE_URI'))
+    parser.add_argument('--latency-ms', type=float, default=5.0, help="injected round-trip latency")
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    url = make_url(args.dsn)
+    proxy = LatencyProxy(url.host or 'localhost', url.port or 5432, args.latency_ms)
+    proxied = url.set(host='127.0.0.1', port=proxy.port)
+
+    print(f"{len(FACET_QUERIES)} facet queries, {args.latency_ms} ms injected round trip, median of {args.rounds}")
+    psycopg2_engine = create_engine(proxied.set(drivername='postgresql+psycopg2'))
+    baseline = run_sequential(psycopg2_engine, args.rounds)
+    print(f"{'psycopg2 sequential':32} {baseline * 1000:8.2f} ms")
+
+    psycopg_engine = create_engine(proxied.set(drivername='postgresql+psycopg'))
+    sequential = run_sequential(psycopg_engine, args.rounds)
+    print(f"{'psycopg 3 sequential':32} {sequential * 1000:8.2f} ms")
+    for binary in (False, True):
+        pipelined = run_pipelined(psycopg_engine, args.rounds, binary)
+        label = f"psycopg 3 pipeline ({'binary' if binary else 'text'})"
+        print(f"{label:32} {pipelined * 1000:8.2f} ms  ({baseline / pipelined:.1f}x vs psycopg2)")
+
+
+if __name__ == '__main__':
+    benchmark_pipeline()
@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import time
+import statistics
+from collections import namedtuple
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.serialization import COURSE_SCHEMA, encode_json, orjson
+
+CourseRow = namedtuple('CourseRow', 'id course_name code institution_count')
+
+LISTING_SIZES = [500, 2000, 10000]
+ROUNDS = 30
+COURSE_LISTING_SCHEMA = COURSE_SCHEMA.extend(institution_count='institution_count')
+
+
+def make_rows(count):
+    return [
+        CourseRow(i, f"Course Name Number {i} (Hons)", f"C{i:05d}", i % 97)
+        for i in range(count)
+    ]
+
+
+def hand_built_stdlib(rows):
+    """What the views did before: hand-built dicts through the stdlib encoder"""
+    courses = [{
+        'id': row.id,
+        'course_name': row.course_name,
+        'code': row.code,
+        'institution_count': row.institution_count
+    } for row in rows]
+    payload = {'status': 'success', 'courses': courses, 'total': len(courses)}
+    return json.dumps(payload, sort_keys=True).encode('utf-8')
+
+
+def schema_fast(rows):
+    courses = COURSE_LISTING_SCHEMA.dump_many(rows)
+    return encode_json({'status': 'success', 'courses': courses, 'total': len(courses)})
+
+
+def timed(fn, rows):
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def benchmark_serialization():
+    print(f"Encoder: {'orjson' if orjson is not None else 'stdlib json (orjson not installed)'}")
+    print(f"{'Rows':>7} {'stdlib ms':>10} {'schema ms':>10} {'cached ms':>10} {'speedup':>8}")
+    for size in LISTING_SIZES:
+        rows = make_rows(size)
+        baseline = timed(hand_built_stdlib, rows)
+        fast = timed(schema_fast, rows)
+        # A cache hit only hands the stored bytes to the response
+        encoded = schema_fast(rows)
+        cached = timed(lambda _: bytes(encoded), rows)
+        print(f"{size:>7} {baseline:>10.2f} {fast:>10.2f} {cached:>10.3f} {baseline / fast:>7.1f}x")
+
+
+if __name__ == '__main__':
+    benchmark_serialization()
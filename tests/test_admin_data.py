@@ -0,0 +1,88 @@
+import pytest
+
+from app.extensions import cache, db
+from app.utils.admin_data import (
+    get_admin_summary,
+    invalidate_admin_summary,
+    list_comments,
+    list_feedback,
+    list_users
+)
+
+
+@pytest.fixture
+def users(pg_schema):
+    from app.models import User
+    from app.models.feedback import Feedback
+    from app.models.interaction import Comment
+
+    pg_schema.config['CACHE_TYPE'] = 'SimpleCache'
+    cache.init_app(pg_schema)
+    # Core insert: the model constructor hashes every password
+    names = [f'user{i:02d}' for i in range(60)]
+    names[7] = 'findme'
+    ids = db.session.scalars(
+        db.insert(User).returning(User.id, sort_by_parameter_order=True),
+        [{'username': name, 'email': f'{name}@example.com', 'password': 'x', 'score': 0} for name in names]
+    ).all()
+    db.session.add_all([Comment(content='x' * 1000, user_id=ids[0]), Comment(content='short', user_id=ids[7])])
+    db.session.add(Feedback(name='Ada', email='ada@example.com', subject='Broken link', message='m' * 500))
+    db.session.commit()
+    yield ids
+    cache.clear()
+
+
+def walk():
+    pages, cursor = [], None
+    while True:
+        page = list_users(cursor=cursor, per_page=25)
+        pages.append(page)
+        if not page.has_next:
+            return pages
+        cursor = page.next_cursor
+
+
+def test_keyset_pages_cover_every_row_once_newest_first(users):
+    pages = walk()
+    assert [len(page.items) for page in pages] == [25, 25, 10]
+    ids = [row.id for page in pages for row in page.items]
+    assert ids == sorted(users, reverse=True)
+    assert not pages[0].has_prev and pages[1].has_prev
+    assert pages[1].cursor == pages[0].items[-1].id
+
+
+def test_rows_added_meanwhile_do_not_shift_later_pages(users):
+    from app.models import User
+
+    first = list_users(per_page=25)
+    db.session.add(User(username='newcomer', email='newcomer@example.com', password='x'))
+    db.session.commit()
+    second = list_users(cursor=first.next_cursor, per_page=25)
+    assert second.items[0].id == first.items[-1].id - 1
+
+
+def test_search_and_projection(users):
+    page = list_users(search='FINDME')
+    assert [row.username for row in page.items] == ['findme']
+    assert not page.has_next and page.search == 'FINDME'
+    assert set(page.items[0]._fields) == {'id', 'username', 'email', 'is_admin', 'is_verified', 'score'}
+
+    comments = list_comments().items
+    assert [c.author_username for c in comments] == ['findme', 'user00']
+    assert len(comments[1].content) == 300
+    assert list_comments(search='findme').items[0].content == 'short'
+
+    feedback = list_feedback(search='broken').items
+    assert len(feedback) == 1 and len(feedback[0].message) == 300
+    assert list_feedback(search='nothing').items == []
+
+
+def test_summary_is_cached_until_invalidated(users):
+    from app.models import User
+
+    assert get_admin_summary() == {'users': 60, 'comments': 2, 'feedback': 1}
+    db.session.add(User(username='late', email='late@example.com', password='x'))
+    db.session.commit()
+    assert get_admin_summary()['users'] == 60
+    invalidate_admin_summary()
+    assert get_admin_summary()['users'] == 61
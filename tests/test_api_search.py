@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+@pytest.fixture
+def catalogue(pg_schema):
+    """Two institutions, one without a state or programme type, sharing three courses"""
+    from app.extensions import cache
+    from app.models import Course, CourseRequirement, ProgrammeType, State, SubjectRequirement, University
+    from app.models.requirement import UTMERequirementTemplate
+
+    pg_schema.config['CACHE_TYPE'] = 'SimpleCache'
+    cache.init_app(pg_schema)
+
+    lagos, federal = State(name='Lagos'), ProgrammeType(name='Federal')
+    template = UTMERequirementTemplate(requirements='English, Maths, Physics')
+    unilag = University(university_name='University of Lagos', abbrv='UNILAG',
+                        state_info=lagos, programme_type_info=federal)
+    unlisted = University(university_name='Unlisted University', abbrv='UNL')
+    courses = [Course(course_name=name) for name in ('Medicine', 'Medical Lab Science', 'Law')]
+    db.session.add_all([lagos, federal, template, unilag, unlisted, *courses])
+    db.session.flush()
+    for course in courses:
+        for uni in (unilag, unlisted):
+            requirement = CourseRequirement(course_id=course.id, university_id=uni.id,
+                                            utme_template_id=template.id)
+            db.session.add(requirement)
+            db.session.flush()
+            if uni is unilag:
+                db.session.add(SubjectRequirement(course_requirement_id=requirement.id, subjects='Biology'))
+    db.session.commit()
+    db.session.expunge_all()
+    yield
+    cache.clear()
+
+
+def search(query_text, state=None, program_type=None):
+    from app.views.api import _search_results
+    return _search_results(query_text, state, program_type)
+
+
+def old_payload(courses):
+    """The /api/search course shape as the view built it before the shared schemas"""
+    return [{
+        "id": course.id,
+        "course_name": course.course_name,
+        "requirements": [{
+            "university_name": req.university.university_name,
+            "abbrv": req.university.abbrv,
+            "direct_entry_requirements": req.direct_entry_requirements,
+            "utme_requirements": req.utme_requirements,
+            "subjects": req.subject_requirement.subjects if req.subject_requirement else None
+        } for req in course.requirements]
+    } for course in courses]
+
+
+def test_institutions_without_state_or_programme_type_are_found(catalogue):
+    results = search('univ')
+    assert sorted(uni['university_name'] for uni in results['universities']) == [
+        'University of Lagos', 'Unlisted University'
+    ]
+    unlisted = next(uni for uni in results['universities'] if uni['university_name'] == 'Unlisted University')
+    assert unlisted == {'university_name': 'Unlisted University', 'state': None, 'program_type': None}
+    assert [uni['university_name'] for uni in search('univ', state='lag')['universities']] == ['University of Lagos']
+
+
+def in_order(courses):
+    # Neither query orders courses or their requirements
+    return sorted(
+        (dict(course, requirements=sorted(course['requirements'], key=lambda req: req['abbrv']))
+         for course in courses),
+        key=lambda course: course['id']
+    )
+
+
+def test_course_payload_matches_the_old_shape(catalogue):
+    from app.models import Course
+
+    results = search('med')
+    courses = Course.query.filter(Course.course_name.ilike('%med%')).all()
+    assert in_order(results['courses']) == in_order(old_payload(courses))
+    assert all(req['utme_requirements'] == 'English, Maths, Physics'
+               for course in results['courses'] for req in course['requirements'])
+
+
+def test_each_course_is_listed_once(catalogue):
+    # Every course matches through both of its requirement rows
+    names = sorted(course['course_name'] for course in search('un')['courses'])
+    assert names == ['Law', 'Medical Lab Science', 'Medicine']
+
+
+def test_requirements_are_loaded_in_one_query(catalogue):
+    search('un')  # load the requirement template cache
+    db.session.expunge_all()
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        results = search('un')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert sum(len(course['requirements']) for course in results['courses']) == 6
+    assert len([s for s in statements if 'FROM course_requirement' in s]) == 1
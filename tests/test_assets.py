@@ -0,0 +1,70 @@
+import gzip
+
+import pytest
+from flask import Flask
+
+from app.utils import assets
+from app.utils.assets import init_app, precompress_static
+
+CSS = 'body { color: #333; }\n' * 200
+
+
+@pytest.fixture
+def static(tmp_path):
+    (tmp_path / 'site.css').write_text(CSS)
+    (tmp_path / 'logo.png').write_bytes(b'\x89PNG')
+    return tmp_path
+
+
+def make_client(static, monkeypatch):
+    # Exercise the gzip siblings whether or not brotli is installed
+    monkeypatch.setattr(assets, 'brotli', None)
+    monkeypatch.setattr('app.utils.compression.brotli', None)
+    app = Flask(__name__, static_folder=str(static), static_url_path='/static')
+    init_app(app)
+    return app, app.test_client()
+
+
+def get(client, url):
+    return client.get(url, headers={'Accept-Encoding': 'gzip'})
+
+
+def test_fingerprinted_asset_is_served_precompressed_and_immutable(static, monkeypatch):
+    precompress_static(str(static))
+    app, client = make_client(static, monkeypatch)
+    with app.test_request_context():
+        url = app.url_for('static', filename='site.css')
+    assert url.endswith('?v=' + app.extensions['asset_manifest']['site.css'])
+
+    response = get(client, url)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert gzip.decompress(response.data).decode() == CSS
+    response.close()
+
+    response = client.get('/static/site.css')
+    assert 'Content-Encoding' not in response.headers and 'immutable' not in response.headers.get('Cache-Control', '')
+    response.close()
+
+
+def test_stale_sibling_is_never_served(static, monkeypatch):
+    precompress_static(str(static))
+    (static / 'site.css').write_text(CSS.replace('#333', '#000'))
+    app, client = make_client(static, monkeypatch)
+    assert app.extensions['asset_variants'] == {}
+
+    response = get(client, '/static/site.css?v=' + app.extensions['asset_manifest']['site.css'])
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data(as_text=True) == CSS.replace('#333', '#000')
+    response.close()
+
+
+def test_precompress_replaces_stale_siblings(static, monkeypatch):
+    (static / 'site.css.gz').write_bytes(gzip.compress(b'old'))
+    precompress_static(str(static))
+    app, _ = make_client(static, monkeypatch)
+    assert app.extensions['asset_variants'] == {'site.css': frozenset({'gzip'})}
+
+    (static / 'site.css').write_text('a')
+    precompress_static(str(static))
+    assert not (static / 'site.css.gz').exists()
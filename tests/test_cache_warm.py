@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from app.extensions import cache
+from app.utils import cache_warm as module
+from app.utils.cache_warm import CacheWarmer, QueryLog
+
+
+class FakeClock:
+    """Stands in for the time module so tests choose the current bucket"""
+    now = 0.0
+    perf_counter = staticmethod(time.perf_counter)
+
+    @classmethod
+    def time(cls):
+        return cls.now
+
+    @classmethod
+    def monotonic(cls):
+        return cls.now
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = Flask(__name__)
+    app.config.update(CACHE_TYPE='SimpleCache', CACHE_WARM_TOP_N=10, CACHE_WARM_COOLDOWN=600)
+    cache.init_app(app)
+    FakeClock.now = 1_000_000.0
+    monkeypatch.setattr(module, 'time', FakeClock)
+    with app.app_context():
+        yield app
+        cache.clear()
+
+
+def test_counts_are_held_until_the_flush_interval(app):
+    log = QueryLog(bucket_seconds=3600, flush_interval=30)
+    log.record('search', 'law', None)
+    assert cache.get(log._bucket_key(int(FakeClock.now // 3600))) is None
+    FakeClock.now += 30
+    log.record('search', 'law', None)
+    assert cache.get(log._bucket_key(int(FakeClock.now // 3600))) == {'["search","law",null]': 2}
+
+
+def test_top_merges_the_buckets_in_the_window(app):
+    log = QueryLog(bucket_seconds=60, buckets=3, flush_interval=0)
+    log.record('search', 'medicine')
+    log.record('search', 'law')
+    FakeClock.now += 60
+    log.record('search', 'law')
+    log.record('recommend', 'Lagos', [], None, 1)
+    assert log.top(2) == [(['search', 'law'], 2), (['search', 'medicine'], 1)]
+    assert len(log.top(10)) == 3
+
+    # Three buckets later the first one has left the window
+    FakeClock.now += 120
+    assert sorted(log.top(10)) == [(['recommend', 'Lagos', [], None, 1], 1), (['search', 'law'], 1)]
+
+
+def test_each_bucket_keeps_its_most_common_entries(app):
+    log = QueryLog(max_entries=2, flush_interval=60)
+    for query, times in (('law', 3), ('medicine', 2), ('nursing', 1)):
+        for _ in range(times):
+            log.record('search', query)
+    log.flush()
+    assert [entry for entry, _ in log.top(10)] == [['search', 'law'], ['search', 'medicine']]
+
+
+@pytest.fixture
+def warmer(app, monkeypatch):
+    """A warmer on a shared cache whose runs record the version they warmed"""
+    version = {'current': 1}
+    runs = []
+    finished = threading.Event()
+    monkeypatch.setattr(module, 'cache_is_shared', lambda: True)
+    monkeypatch.setattr(module, 'get_catalogue_version', lambda: version['current'])
+    warmer = CacheWarmer()
+
+    def warm(top_n):
+        runs.append((version['current'], top_n))
+        finished.set()
+
+    monkeypatch.setattr(warmer, 'warm', warm)
+
+    def wait():
+        assert finished.wait(5)
+        finished.clear()
+        deadline = time.monotonic() + 5
+        while warmer.stats()['running'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    return warmer, version, runs, wait
+
+
+def test_one_warm_per_catalogue_version(warmer):
+    warmer, version, runs, wait = warmer
+    assert warmer.warm_in_background('deploy')
+    wait()
+    # Another worker starting, or a repeated sync notification, finds the lock
+    assert not warmer.warm_in_background('deploy')
+    version['current'] = 2
+    assert warmer.warm_in_background('catalogue change')
+    wait()
+    assert runs == [(1, 10), (2, 10)]
+
+
+def test_the_lock_is_shared_through_the_cache(warmer):
+    warmer, version, runs, wait = warmer
+    cache.add(f"{module.WARM_LOCK_KEY}:1", 12345)
+    assert not warmer.warm_in_background('deploy')
+    assert runs == []
+
+
+def test_jobs_take_the_warm_off_the_web_worker(warmer, app, monkeypatch):
+    warmer, version, runs, wait = warmer
+    queued = []
+    monkeypatch.setattr(module, 'enqueue', lambda name, **kwargs: queued.append((name, kwargs)))
+    app.config['JOBS_ENABLED'] = True
+    assert warmer.warm_in_background('deploy')
+    assert queued == [('warm_caches', {'dedupe_key': 'warm_caches'})]
+    assert runs == [] and not warmer.stats()['running']
+
+
+def test_process_local_cache_is_not_warmed(app, monkeypatch):
+    monkeypatch.setattr(module, 'get_catalogue_version', lambda: 1)
+    warmer = CacheWarmer()
+    monkeypatch.setattr(warmer, 'warm', lambda top_n: pytest.fail("warmed a process-local cache"))
+    assert not module.cache_is_shared()
+    assert not warmer.warm_in_background('deploy')
+    assert cache.get(f"{module.WARM_LOCK_KEY}:1") is None
+
+
+def test_disabled_warming(warmer, app):
+    warmer, version, runs, wait = warmer
+    app.config['CACHE_WARM_ENABLED'] = False
+    assert not warmer.warm_in_background('deploy')
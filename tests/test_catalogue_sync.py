@@ -0,0 +1,261 @@
+import pytest
+from sqlalchemy import text
+
+from app.extensions import db
+from app.utils import catalogue_sync
+from app.utils.catalogue_sync import (
+    CatalogueChangeSet,
+    bump_catalogue_version,
+    check_catalogue_version,
+    compute_changes,
+    get_catalogue_version,
+    index_snapshot,
+    record_hash,
+    register_change_listener,
+    _change_listeners
+)
+
+
+def snapshot(*requirements, institutions=('Uni A', 'Uni B'), state='Lagos'):
+    return {
+        'institutions': [{'university_name': name, 'state': state} for name in institutions],
+        'courses': [{'course_name': 'Law', 'code': 'LAW'}],
+        'requirements': [
+            {'university_name': uni, 'course_name': 'Law', 'utme_requirements': utme}
+            for uni, utme in requirements
+        ]
+    }
+
+
+def test_record_hash_ignores_other_fields():
+    a = {'code': 'LAW', 'id': 1}
+    b = {'code': 'LAW', 'id': 2}
+    assert record_hash(a, ('code',)) == record_hash(b, ('code',))
+    assert record_hash(a, ('code',)) != record_hash({'code': 'MED'}, ('code',))
+
+
+def test_index_snapshot_rejects_unknown_institution():
+    with pytest.raises(ValueError):
+        index_snapshot(snapshot(('Uni C', 'English')))
+
+
+def test_index_snapshot_adds_courses_named_by_requirements():
+    indexed = index_snapshot({
+        'institutions': [{'name': ' Uni A '}],
+        'requirements': [{'university': 'Uni A', 'course': 'Medicine'}]
+    })
+    assert 'Uni A' in indexed['institutions']
+    assert indexed['courses']['Medicine'] == {'course_name': 'Medicine', 'code': None}
+
+
+def test_compute_changes():
+    current = index_snapshot(snapshot(('Uni A', 'English'), ('Uni B', 'English')))
+    incoming = index_snapshot(snapshot(
+        ('Uni A', 'English, Literature'),
+        institutions=('Uni A', 'Uni C')
+    ))
+    changes = compute_changes(current, incoming)
+
+    assert changes.institutions.inserts == ['Uni C']
+    assert changes.institutions.deletes == ['Uni B']
+    assert changes.institutions.updates == []
+    assert changes.requirements.updates == [('Uni A', 'Law')]
+    assert changes.requirements.deletes == [('Uni B', 'Law')]
+    assert changes.unchanged_requirements == 0
+    assert changes.affected_university_names == {'Uni A', 'Uni B', 'Uni C'}
+
+
+def test_unchanged_snapshot_is_empty():
+    current = index_snapshot(snapshot(('Uni A', 'English')))
+    changes = compute_changes(current, index_snapshot(snapshot(('Uni A', 'English'))))
+    assert changes.is_empty
+    assert changes.unchanged_requirements == 1
+
+
+@pytest.fixture
+def version_table(pg_app, monkeypatch):
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS catalogue_version"))
+        conn.execute(text("CREATE TABLE catalogue_version (id INTEGER PRIMARY KEY, version BIGINT NOT NULL)"))
+    pg_app.config['CATALOGUE_VERSION_TTL'] = 0
+    for name, value in (('_version', None), ('_version_read_at', 0.0), ('_published_version', None)):
+        monkeypatch.setattr(catalogue_sync, name, value)
+    yield
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP TABLE catalogue_version"))
+
+
+def forget_local_version():
+    """What a different process sees: nothing cached locally"""
+    catalogue_sync._version = None
+
+
+def test_version_is_shared_through_the_database(version_table):
+    assert get_catalogue_version() == 0
+
+    version = bump_catalogue_version()
+    db.session.commit()
+    forget_local_version()
+    assert get_catalogue_version() == version
+
+    assert bump_catalogue_version() > version
+    db.session.rollback()
+    forget_local_version()
+    assert get_catalogue_version() == version
+
+
+def test_remote_change_runs_local_listeners(version_table):
+    received = []
+
+    def listener(changes):
+        received.append(changes)
+
+    register_change_listener(listener)
+    try:
+        check_catalogue_version()
+        assert received == []
+
+        # Another process commits a sync
+        with db.engine.begin() as conn:
+            version = conn.execute(catalogue_sync.BUMP_VERSION, {'now': 1}).scalar()
+
+        check_catalogue_version()
+        assert len(received) == 1
+        assert isinstance(received[0], CatalogueChangeSet)
+        assert received[0].remote and received[0].version == version
+
+        check_catalogue_version()
+        assert len(received) == 1
+    finally:
+        _change_listeners.remove(listener)
+
+
+def test_version_ttl_avoids_database_reads(version_table, pg_app):
+    pg_app.config['CATALOGUE_VERSION_TTL'] = 60
+    first = get_catalogue_version()
+    with db.engine.begin() as conn:
+        conn.execute(catalogue_sync.BUMP_VERSION, {'now': 1})
+    assert get_catalogue_version() == first
+
+
+def test_sync_removes_institution_with_dependents(pg_schema):
+    from app.models import Bookmark, Comment, Course, CourseRequirement, University, User
+    from app.utils.catalogue_sync import sync_catalogue
+
+    first = snapshot(('Uni A', 'English'), ('Uni B', 'English'))
+    assert sync_catalogue(first).institutions.inserts == ['Uni A', 'Uni B']
+
+    uni_b = db.session.scalar(db.select(University).filter_by(university_name='Uni B'))
+    law = db.session.scalar(db.select(Course).filter_by(course_name='Law'))
+    user = User(username='reader', email='reader@example.com', password='x')
+    db.session.add(user)
+    db.session.flush()
+    comment = Comment(content='Great', user_id=user.id, university_id=uni_b.id)
+    db.session.add(comment)
+    db.session.flush()
+    db.session.add_all([
+        Comment(content='Agreed', user_id=user.id, university_id=uni_b.id, parent_id=comment.id),
+        Bookmark(user_id=user.id, university_id=uni_b.id, course_id=law.id)
+    ])
+    db.session.commit()
+    db.session.expire_all()
+
+    changes = sync_catalogue(snapshot(('Uni A', 'English'), institutions=('Uni A',)))
+    assert changes.institutions.deletes == ['Uni B']
+    assert changes.requirements.deletes == [('Uni B', 'Law')]
+
+    names = db.session.scalars(db.select(University.university_name)).all()
+    assert names == ['Uni A']
+    assert db.session.scalar(db.select(db.func.count()).select_from(Comment)) == 0
+    assert db.session.scalar(db.select(db.func.count()).select_from(Bookmark)) == 0
+    assert db.session.scalar(db.select(db.func.count()).select_from(CourseRequirement)) == 1
+
+
+def test_sync_fills_search_vectors(pg_schema):
+    from app.models import Course, University
+    from app.utils.catalogue_sync import sync_catalogue
+
+    sync_catalogue(snapshot(('Uni A', 'English'), institutions=('Uni A',)))
+    assert db.session.scalar(
+        db.select(University.id).where(University.search_vector.op('@@')(db.func.plainto_tsquery('english', 'lagos')))
+    )
+    assert db.session.scalar(
+        db.select(Course.id).where(Course.search_vector.op('@@')(db.func.plainto_tsquery('english', 'law')))
+    )
+
+
+@pytest.fixture
+def catalogue(pg_schema, monkeypatch):
+    from app.extensions import cache
+    from app.models import University
+
+    pg_schema.config['CACHE_TYPE'] = 'SimpleCache'
+    cache.init_app(pg_schema)
+    for name, value in (('_version', None), ('_version_read_at', 0.0), ('_published_version', None)):
+        monkeypatch.setattr(catalogue_sync, name, value)
+    db.session.add(University(university_name='Uni A'))
+    db.session.commit()
+    received = []
+    register_change_listener(received.append)
+    yield received
+    _change_listeners.remove(received.append)
+    cache.clear()
+
+
+def university_names():
+    """A read cached by catalogue version, like the listings and fragments"""
+    from app.models import University
+    from app.utils.serialization import cached_json
+
+    return cached_json(
+        f"names:{get_catalogue_version()}",
+        lambda: db.session.scalars(db.select(University.university_name).order_by(University.id)).all()
+    )
+
+
+def test_admin_edit_is_visible_on_the_next_read(catalogue):
+    from app.models import University
+
+    assert university_names() == b'["Uni A"]'
+    version = get_catalogue_version()
+
+    # What the admin edit view does
+    university = db.session.scalar(db.select(University))
+    university.university_name = 'Uni A (Main Campus)'
+    db.session.commit()
+
+    assert get_catalogue_version() > version
+    assert university_names() == b'["Uni A (Main Campus)"]'
+    assert [changes.version for changes in catalogue] == [get_catalogue_version()]
+
+
+def test_one_bump_per_transaction_and_none_on_rollback(catalogue):
+    from app.models import Course, University, User
+
+    version = get_catalogue_version()
+    db.session.add(University(university_name='Uni B'))
+    db.session.flush()
+    db.session.add(Course(course_name='Law'))
+    db.session.flush()
+    db.session.rollback()
+    forget_local_version()
+    assert get_catalogue_version() == version and catalogue == []
+
+    db.session.add_all([University(university_name='Uni B'), Course(course_name='Law')])
+    db.session.flush()
+    db.session.add(Course(course_name='Medicine'))
+    db.session.commit()
+    assert len(catalogue) == 1 and catalogue[0].version > version
+
+    # Non-catalogue writes leave the cached reads alone
+    db.session.add(User(username='reader', email='reader@example.com', password='x'))
+    db.session.commit()
+    assert len(catalogue) == 1
+
+
+def test_sync_publishes_its_change_set_once(catalogue):
+    from app.utils.catalogue_sync import sync_catalogue
+
+    changes = sync_catalogue(snapshot(('Uni A', 'English'), institutions=('Uni A',)))
+    assert catalogue == [changes]
+    assert changes.version == get_catalogue_version()
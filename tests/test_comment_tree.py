@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.utils.comment_tree import COMMENT_TREE_SQL, load_comment_page
+
+
+@pytest.fixture
+def comments(pg_schema):
+    """Three general threads; the newest has a five-deep reply chain"""
+    from app.models import Comment, User
+
+    author = User(username='reader', email='reader@example.com', password='x', score=4)
+    db.session.add(author)
+    db.session.flush()
+    start = datetime(2024, 1, 1)
+    roots = []
+    for i in range(3):
+        root = Comment(content=f'thread {i}', user_id=author.id, date_posted=start + timedelta(days=i))
+        db.session.add(root)
+        db.session.flush()
+        roots.append(root)
+
+    parent = roots[2]
+    chain = []
+    for depth in range(1, 6):
+        reply = Comment(content=f'reply {depth}', user_id=author.id, parent_id=parent.id,
+                        date_posted=start + timedelta(days=10 + depth))
+        db.session.add(reply)
+        db.session.flush()
+        chain.append(reply)
+        parent = reply
+    sibling = Comment(content='second reply', user_id=author.id, parent_id=roots[1].id,
+                      date_posted=start + timedelta(days=20))
+    db.session.add(sibling)
+    db.session.commit()
+    return [root.id for root in roots], [reply.id for reply in chain]
+
+
+def chain_of(node):
+    ids = []
+    while node.replies:
+        node = node.replies[0]
+        ids.append(node.id)
+    return ids
+
+
+def test_every_reply_is_loaded_by_default(comments):
+    _, chain = comments
+    newest = load_comment_page(per_page=1).threads[0]
+    assert chain_of(newest) == chain
+    assert newest.descendant_count == 5
+    assert newest.to_dict()['replies'][0]['replies'][0]['content'] == 'reply 2'
+
+
+def test_depth_cap_reports_the_replies_it_left_out(comments):
+    _, chain = comments
+    newest = load_comment_page(per_page=1, max_depth=3).threads[0]
+    assert chain_of(newest) == chain[:3]
+    boundary = newest.replies[0].replies[0].replies[0]
+    assert boundary.hidden_replies == 1 and boundary.reply_count == 1
+    assert newest.hidden_replies == 0 and newest.reply_count == 1
+    assert boundary.to_dict()['hidden_replies'] == 1
+
+
+def test_pages_walk_every_thread_without_loading_the_next_root(comments):
+    roots, chain = comments
+    first = load_comment_page(per_page=1)
+    assert [thread.id for thread in first.threads] == [roots[2]]
+    assert first.has_more
+
+    second = load_comment_page(cursor=first.next_cursor, per_page=1)
+    assert [thread.id for thread in second.threads] == [roots[1]]
+    third = load_comment_page(cursor=second.next_cursor, per_page=2)
+    assert [thread.id for thread in third.threads] == [roots[0]]
+    assert not third.has_more
+
+    # The first page only needs the next root's position, not its thread
+    rows = db.session.execute(COMMENT_TREE_SQL, {
+        'university_id': None, 'cursor_date': None, 'cursor_id': None,
+        'per_page': 1, 'max_depth': None
+    }).all()
+    assert {row.id for row in rows} == {roots[2], *chain}
+    assert all(row.has_more for row in rows)
+
+
+def test_empty_discussion(pg_schema):
+    page = load_comment_page(university_id=None)
+    assert page.threads == [] and page.next_cursor is None
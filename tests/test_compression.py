@@ -0,0 +1,60 @@
+import gzip
+
+import pytest
+from flask import Flask, jsonify, render_template_string
+from flask_wtf.csrf import generate_csrf
+
+from app.utils.compression import init_app
+
+BODY = 'x' * 4096
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    init_app(app)
+
+    @app.route('/json')
+    def json_view():
+        return jsonify(body=BODY)
+
+    @app.route('/page')
+    def page():
+        return render_template_string('<p>{{ q }}</p>' + BODY, q='reflected')
+
+    @app.route('/json-with-token')
+    def json_with_token():
+        return jsonify(token=generate_csrf(), body=BODY)
+
+    @app.route('/small')
+    def small():
+        return jsonify(body='x')
+
+    return app.test_client()
+
+
+def get(client, path):
+    return client.get(path, headers={'Accept-Encoding': 'gzip'})
+
+
+def test_json_is_compressed(client):
+    response = get(client, '/json')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert BODY in gzip.decompress(response.data).decode()
+
+
+def test_html_is_not_compressed(client):
+    response = get(client, '/page')
+    assert 'Content-Encoding' not in response.headers
+    assert BODY in response.get_data(as_text=True)
+
+
+def test_responses_with_a_csrf_token_are_not_compressed(client):
+    assert 'Content-Encoding' not in get(client, '/json-with-token').headers
+
+
+def test_small_and_unaccepted_responses_are_left_alone(client):
+    assert 'Content-Encoding' not in get(client, '/small').headers
+    assert 'Content-Encoding' not in client.get('/json').headers
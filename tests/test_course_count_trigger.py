@@ -0,0 +1,94 @@
+import importlib.util
+import time
+from pathlib import Path
+
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import text
+
+from app.extensions import db
+
+MIGRATION = Path(__file__).parent.parent / 'migrations' / 'versions' / 'add_university_course_count.py'
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location('add_university_course_count', MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def catalogue(pg_schema):
+    with db.engine.begin() as conn:
+        conn.execute(text("ALTER TABLE university DROP COLUMN course_count"))
+        with Operations.context(MigrationContext.configure(conn)):
+            load_migration().upgrade()
+        conn.execute(text("""
+            INSERT INTO university (id, university_name, is_featured)
+            SELECT i, 'Uni ' || i, false FROM generate_series(1, 3) i
+        """))
+        conn.execute(text("""
+            INSERT INTO course (id, course_name)
+            SELECT i, 'Course ' || i FROM generate_series(1, 2000) i
+        """))
+    return pg_schema
+
+
+def run(sql, **params):
+    with db.engine.begin() as conn:
+        conn.execute(text(sql), params)
+
+
+def counts():
+    with db.engine.connect() as conn:
+        return dict(conn.execute(text("SELECT id, course_count FROM university ORDER BY id")).all())
+
+
+def test_counts_follow_inserts_updates_and_deletes(catalogue):
+    run("INSERT INTO course_requirement (course_id, university_id) SELECT i, 1 FROM generate_series(1, 5) i")
+    run("INSERT INTO course_requirement (course_id, university_id) VALUES (1, 2)")
+    assert counts() == {1: 5, 2: 1, 3: 0}
+
+    # Move two of university 1's courses to university 3
+    run("UPDATE course_requirement SET university_id = 3 WHERE university_id = 1 AND course_id IN (4, 5)")
+    assert counts() == {1: 3, 2: 1, 3: 2}
+
+    run("UPDATE course_requirement SET course_id = 6 WHERE university_id = 2")
+    assert counts() == {1: 3, 2: 1, 3: 2}
+
+    run("DELETE FROM course_requirement WHERE university_id IN (1, 2)")
+    assert counts() == {1: 0, 2: 0, 3: 2}
+
+
+def test_unrelated_updates_do_not_recount(catalogue):
+    run("INSERT INTO course_requirement (course_id, university_id) VALUES (1, 1)")
+    # A wrong count would only be corrected by a recount
+    run("UPDATE university SET course_count = 99 WHERE id = 1")
+    run("UPDATE course_requirement SET utme_template_id = NULL")
+    assert counts()[1] == 99
+
+
+def test_bulk_load_recounts_once_per_statement(catalogue):
+    run("""
+        CREATE TABLE recount_log (university_id INTEGER);
+        CREATE FUNCTION log_recount() RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO recount_log VALUES (NEW.id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        CREATE TRIGGER trg_log_recount AFTER UPDATE OF course_count ON university
+        FOR EACH ROW EXECUTE FUNCTION log_recount();
+    """)
+    start = time.perf_counter()
+    run("""
+        INSERT INTO course_requirement (course_id, university_id)
+        SELECT course.id, university.id FROM generate_series(1, 2000) course(id), generate_series(1, 3) university(id)
+    """)
+    elapsed = time.perf_counter() - start
+    assert counts() == {1: 2000, 2: 2000, 3: 2000}
+    with db.engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM recount_log")).scalar() == 3
+    assert elapsed < 5
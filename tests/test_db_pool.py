@@ -0,0 +1,89 @@
+from app.utils.db_pool import (
+    DEFAULT_ASYNC_POOL_SIZE,
+    DEFAULT_PAGE_DATA_MAX_QUERIES,
+    page_data_uses_threads,
+    plan_pool,
+    worker_concurrency
+)
+
+
+def config(**overrides):
+    base = {
+        'GUNICORN_WORKERS': 3,
+        'GUNICORN_WORKER_CLASS': 'sync',
+        'GUNICORN_THREADS': 1,
+        'GUNICORN_WORKER_CONNECTIONS': 1000,
+        'PAGE_DATA_STRATEGY': 'sequential'
+    }
+    base.update(overrides)
+    return base
+
+
+def test_worker_concurrency():
+    assert worker_concurrency('sync', 1, 1000) == 1
+    assert worker_concurrency('gthread', 8, 1000) == 8
+    assert worker_concurrency('gevent', 1, 1000) == 1000
+    assert worker_concurrency('gunicorn.workers.ggevent.GeventWorker', 1, 500) == 500
+
+
+def test_sync_and_threaded_workers_get_one_connection_per_request():
+    assert plan_pool(config())['pool_size'] == 1
+    assert plan_pool(config(GUNICORN_WORKER_CLASS='gthread', GUNICORN_THREADS=4))['pool_size'] == 4
+
+
+def test_async_workers_are_capped():
+    plan = plan_pool(config(GUNICORN_WORKER_CLASS='gevent'))
+    assert plan['concurrency'] == 1000
+    assert plan['pool_size'] == DEFAULT_ASYNC_POOL_SIZE
+
+    plan = plan_pool(config(GUNICORN_WORKER_CLASS='eventlet', DB_ASYNC_POOL_SIZE=4))
+    assert plan['pool_size'] == 4
+
+    plan = plan_pool(config(GUNICORN_WORKER_CLASS='gevent', GUNICORN_WORKER_CONNECTIONS=5))
+    assert plan['pool_size'] == 5
+
+
+def test_explicit_pool_size_wins():
+    assert plan_pool(config(GUNICORN_WORKER_CLASS='gevent', DB_POOL_SIZE='50'))['pool_size'] == 50
+
+
+def test_budget_clamps_each_worker():
+    plan = plan_pool(config(GUNICORN_WORKER_CLASS='gthread', GUNICORN_THREADS=16, DB_MAX_CONNECTIONS='30'))
+    assert plan['clamped']
+    assert plan['pool_size'] + plan['max_overflow'] == 10
+
+
+def test_pgbouncer_budget_is_not_clamped():
+    plan = plan_pool(config(DB_POOL_MODE='pgbouncer', DB_MAX_CONNECTIONS='1'))
+    assert not plan['clamped']
+
+
+def test_page_data_threads_are_budgeted_per_request():
+    plan = plan_pool(config(PAGE_DATA_STRATEGY='threads', GUNICORN_WORKER_CLASS='gthread', GUNICORN_THREADS=4))
+    assert plan['page_data_threads'] == 4 * DEFAULT_PAGE_DATA_MAX_QUERIES
+    assert plan['pool_size'] == 4 + 4 * DEFAULT_PAGE_DATA_MAX_QUERIES
+
+    plan = plan_pool(config(PAGE_DATA_STRATEGY='threads', GUNICORN_WORKER_CLASS='gevent', PAGE_DATA_MAX_QUERIES=3))
+    assert plan['page_data_threads'] == 3 * DEFAULT_ASYNC_POOL_SIZE
+    assert plan['pool_size'] == 4 * DEFAULT_ASYNC_POOL_SIZE
+
+
+def test_page_data_threads_fit_inside_a_clamped_or_explicit_pool():
+    plan = plan_pool(config(PAGE_DATA_STRATEGY='threads', PAGE_DATA_MAX_QUERIES=6, DB_MAX_CONNECTIONS='15'))
+    assert plan['pool_size'] + plan['max_overflow'] == 5
+    assert plan['page_data_threads'] == 4
+
+    plan = plan_pool(config(PAGE_DATA_STRATEGY='threads', DB_MAX_CONNECTIONS='3'))
+    assert plan['page_data_threads'] == 0
+
+    plan = plan_pool(config(PAGE_DATA_STRATEGY='threads', DB_POOL_SIZE='2', DB_MAX_OVERFLOW='0'))
+    assert plan['page_data_threads'] == 1
+
+
+def test_page_data_threads_only_when_threads_can_run():
+    assert not page_data_uses_threads({'PAGE_DATA_STRATEGY': 'sequential'})
+    assert not page_data_uses_threads({'PAGE_DATA_STRATEGY': 'pipeline'})
+    assert page_data_uses_threads({'SQLALCHEMY_DATABASE_URI': 'postgresql+psycopg2://localhost/db'})
+    assert not page_data_uses_threads({'SQLALCHEMY_DATABASE_URI': 'postgresql+psycopg://localhost/db'})
+    assert page_data_uses_threads({'SQLALCHEMY_DATABASE_URI': 'postgresql+psycopg://localhost/db', 'DB_PIPELINE': False})
+    assert plan_pool(config())['page_data_threads'] == 0
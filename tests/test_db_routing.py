@@ -0,0 +1,88 @@
+import pytest
+from flask import Flask
+from sqlalchemy import select, text, update
+
+from app.extensions import REPLICA_BIND, db, db_route, statement_writes
+from app.models.university import University
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'primary.db'}",
+        SQLALCHEMY_BINDS={REPLICA_BIND: f"sqlite:///{tmp_path / 'replica.db'}"}
+    )
+    db.init_app(app)
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def replica_route():
+    token = db_route.set(REPLICA_BIND)
+    yield
+    db_route.reset(token)
+
+
+def bound_to(clause):
+    return db.session.get_bind(clause=clause).url.database.rsplit('/', 1)[-1]
+
+
+@pytest.mark.parametrize('sql', [
+    "SELECT 1",
+    "  with t AS (SELECT 1) SELECT * FROM t",
+    "SELECT updated_at FROM course",
+])
+def test_text_reads(sql):
+    assert not statement_writes(text(sql))
+
+
+@pytest.mark.parametrize('sql', [
+    "UPDATE users SET score = 1",
+    "delete from comment",
+    "INSERT INTO job (name) VALUES ('x')",
+    "REFRESH MATERIALIZED VIEW course_view",
+    "WITH moved AS (DELETE FROM job RETURNING id) SELECT count(*) FROM moved",
+    "SELECT id FROM job FOR UPDATE SKIP LOCKED",
+    "SELECT id FROM job FOR SHARE",
+    "SELECT nextval('job_id_seq')",
+])
+def test_text_writes(sql):
+    assert statement_writes(text(sql))
+
+
+def test_core_statements():
+    assert not statement_writes(select(University.id))
+    assert statement_writes(update(University).values(course_count=0))
+    assert statement_writes(select(University.id).with_for_update())
+    assert not statement_writes(None)
+
+
+def test_reads_go_to_replica(app, replica_route):
+    assert bound_to(text("SELECT 1")) == 'replica.db'
+    assert bound_to(select(University.id)) == 'replica.db'
+
+
+def test_writes_stay_on_primary(app, replica_route):
+    assert bound_to(text("UPDATE university SET course_count = 0")) == 'primary.db'
+    assert bound_to(update(University).values(course_count=0)) == 'primary.db'
+
+
+def test_primary_route_ignores_replica(app):
+    assert bound_to(text("SELECT 1")) == 'primary.db'
+
+
+def test_text_write_pins_session_to_primary(app, replica_route):
+    db.session.execute(text("CREATE TABLE IF NOT EXISTS t (x INTEGER)"))
+    assert db.session.info['wrote']
+    assert bound_to(text("SELECT 1")) == 'primary.db'
+
+
+def test_core_update_pins_session_to_primary(app, replica_route):
+    with db.engines[None].begin() as conn:
+        conn.execute(text("CREATE TABLE university (id INTEGER PRIMARY KEY, course_count INTEGER)"))
+    db.session.execute(update(University).values(course_count=0).execution_options(synchronize_session=False))
+    assert db.session.info['wrote']
+    assert bound_to(select(University.id)) == 'primary.db'
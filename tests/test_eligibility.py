@@ -0,0 +1,181 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.utils import eligibility as module
+from app.utils.eligibility import (
+    CandidateProfile,
+    CompiledRequirements,
+    EligibilityEngine,
+    SubjectVocabulary,
+    to_mask
+)
+
+# (course, mandatory O'level, optional O'level, UTME, min credits, max sittings, state)
+REQUIREMENTS = [
+    ('Law', {'English', 'Literature'}, {'Government', 'History'}, {'English'}, 5, 2, 'Lagos'),
+    ('Medicine', {'English', 'Biology', 'Chemistry'}, set(), {'Biology', 'Chemistry'}, 5, 1, 'Oyo'),
+    ('History', {'English'}, {'Government', 'History'}, set(), 5, 2, 'Lagos'),
+    ('Physics', {'Mathematics', 'Physics'}, set(), {'Physics'}, 5, 2, 'Lagos')
+]
+
+
+def compile_requirements(requirements, version=1):
+    vocabulary = SubjectVocabulary()
+    bits = [
+        ({vocabulary.bit(s) for s in mandatory}, {vocabulary.bit(s) for s in optional}, {vocabulary.bit(s) for s in utme})
+        for _, mandatory, optional, utme, *_ in requirements
+    ]
+    words = vocabulary.words
+    states = sorted({r[6] for r in requirements})
+    state_codes = {name: i for i, name in enumerate(states)}
+    return CompiledRequirements(
+        version=version,
+        vocabulary=vocabulary,
+        words=words,
+        size=len(requirements),
+        mandatory_masks=np.array([to_mask(m, words) for m, _, _ in bits]),
+        optional_masks=np.array([to_mask(o, words) for _, o, _ in bits]),
+        utme_masks=np.array([to_mask(u, words) for _, _, u in bits]),
+        min_credits=np.array([r[4] for r in requirements], dtype=np.int16),
+        max_sittings=np.array([r[5] for r in requirements], dtype=np.int16),
+        state_codes=state_codes,
+        type_codes={},
+        state_column=np.array([state_codes[r[6]] for r in requirements], dtype=np.int32),
+        type_column=np.full(len(requirements), -1, dtype=np.int32),
+        records=[(i, i, r[0], i, f'Uni {i}', r[6], None) for i, r in enumerate(requirements)]
+    )
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    state = {'version': 1, 'requirements': REQUIREMENTS, 'compiles': 0}
+
+    def compile_(self, version):
+        state['compiles'] += 1
+        return compile_requirements(state['requirements'], version)
+
+    monkeypatch.setattr(module, 'get_catalogue_version', lambda: state['version'])
+    monkeypatch.setattr(EligibilityEngine, '_compile', compile_)
+    monkeypatch.setattr(EligibilityEngine, 'normalise', lambda self, subject: subject.strip().title())
+    monkeypatch.setattr(EligibilityEngine, 'expand', lambda self, subjects: set(subjects))
+    return EligibilityEngine(), state
+
+
+def profile(olevel, utme=(), **kwargs):
+    return CandidateProfile(olevel_subjects=set(olevel), utme_subjects=set(utme), **kwargs)
+
+
+def courses(result):
+    return [r['course_name'] for r in result['results']]
+
+
+def test_to_mask_spans_words():
+    mask = to_mask({0, 63, 64, 130}, 3)
+    assert mask.dtype == np.uint64
+    assert mask[0] == (1 | 1 << 63)
+    assert mask[1] == 1
+    assert mask[2] == 1 << 2
+
+
+def test_vocabulary_is_case_insensitive():
+    vocabulary = SubjectVocabulary()
+    assert vocabulary.bit('English') == vocabulary.bit(' english ') == 0
+    assert vocabulary.lookup('Biology') is None
+    for i in range(64):
+        vocabulary.bit(f'subject {i}')
+    assert vocabulary.words == 2
+
+
+def test_profile_from_dict_keeps_credit_passes():
+    parsed = CandidateProfile.from_dict({
+        'olevel': ['English', {'subject': 'Biology', 'grade': 'b3'}, {'subject': 'Physics', 'grade': 'F9'}],
+        'utme_subjects': ['Biology', ' '],
+        'sittings': '2'
+    })
+    assert parsed.olevel_subjects == {'English', 'Biology'}
+    assert parsed.utme_subjects == {'Biology'}
+    assert parsed.sittings == 2
+
+    with pytest.raises(ValueError):
+        CandidateProfile.from_dict({'sittings': 'two'})
+    with pytest.raises(ValueError):
+        CandidateProfile.from_dict({'sittings': 0})
+
+
+def test_mandatory_and_utme_subjects(engine):
+    eligibility, _ = engine
+    olevel = ['English', 'Literature', 'Government', 'Mathematics', 'Economics']
+    assert courses(eligibility.evaluate(profile(olevel, ['English']))) == ['Law', 'History']
+    # Law needs English in UTME too
+    assert courses(eligibility.evaluate(profile(olevel))) == ['History']
+
+
+def test_credits_sittings_and_state(engine):
+    eligibility, _ = engine
+    olevel = ['English', 'Biology', 'Chemistry', 'Physics', 'Mathematics']
+    utme = ['Biology', 'Chemistry', 'Physics']
+    assert courses(eligibility.evaluate(profile(olevel, utme))) == ['Medicine', 'History', 'Physics']
+    assert courses(eligibility.evaluate(profile(olevel, utme, sittings=2))) == ['History', 'Physics']
+    assert courses(eligibility.evaluate(profile(olevel, utme, state='Oyo'))) == ['Medicine']
+    assert eligibility.evaluate(profile(olevel, utme, state='Kano'))['total'] == 0
+    assert eligibility.evaluate(profile(olevel[:4], utme))['total'] == 0
+
+
+def test_optional_matches_rank_first_and_limit_applies(engine):
+    eligibility, _ = engine
+    olevel = ['English', 'Literature', 'Government', 'History', 'Mathematics', 'Physics']
+    result = eligibility.evaluate(profile(olevel, ['English', 'Physics']), limit=2)
+    assert result['total'] == 3 and result['evaluated'] == 4
+    assert [(r['course_name'], r['optional_matched']) for r in result['results']] == [('Law', 2), ('History', 2)]
+
+
+def test_recompiles_per_version_and_on_invalidate(engine):
+    eligibility, state = engine
+    candidate = profile(['English', 'Literature', 'Government', 'History', 'Economics'], ['English'])
+    eligibility.evaluate(candidate)
+    eligibility.evaluate(candidate)
+    assert state['compiles'] == 1
+
+    state['version'] = 2
+    state['requirements'] = REQUIREMENTS[:1]
+    assert courses(eligibility.evaluate(candidate)) == ['Law']
+    assert state['compiles'] == 2
+
+    eligibility.invalidate()
+    eligibility.evaluate(candidate)
+    assert state['compiles'] == 3
+
+
+def test_recompile_never_mixes_versions(engine, monkeypatch):
+    eligibility, state = engine
+    candidate = profile(['English', 'Literature', 'Government', 'History', 'Economics'], ['English'])
+    eligibility.evaluate(candidate)
+    old = eligibility._compiled
+
+    # A request that already picked up the old arrays keeps using them even
+    # if a recompile with a different shape lands halfway through
+    swapped = threading.Event()
+    original_mask = EligibilityEngine._candidate_mask
+
+    def candidate_mask(self, compiled, subjects):
+        if not swapped.is_set():
+            swapped.set()
+            state['version'] = 2
+            state['requirements'] = REQUIREMENTS[:1]
+            self._compiled = self._compile(2)
+        return original_mask(self, compiled, subjects)
+
+    monkeypatch.setattr(EligibilityEngine, '_candidate_mask', candidate_mask)
+    result = eligibility.evaluate(candidate)
+    assert result['evaluated'] == old.size == 4
+    assert courses(result) == ['Law', 'History']
+    assert eligibility.evaluate(candidate)['evaluated'] == 1
+
+
+def test_compiled_arrays_are_read_only(engine):
+    eligibility, _ = engine
+    eligibility.evaluate(profile(['English']))
+    with pytest.raises(ValueError):
+        eligibility._compiled.mandatory_masks[0] = 0
@@ -0,0 +1,104 @@
+import pytest
+
+from app.extensions import db
+from app.utils.equivalency import UnionFind, equivalency_graph
+
+
+def test_union_find_components():
+    forest = UnionFind()
+    forest.union(1, 2)
+    forest.union(3, 4)
+    forest.union(2, 3)
+    forest.union(5, 6)
+    forest.union(4, 1)
+    assert len({forest.find(i) for i in (1, 2, 3, 4)}) == 1
+    assert forest.find(5) == forest.find(6) != forest.find(1)
+    assert forest.find(7) == 7
+    assert forest.size[forest.find(1)] == 4
+
+
+def test_union_find_long_chain():
+    forest = UnionFind()
+    for i in range(1, 10000):
+        forest.union(i, i + 1)
+    root = forest.find(10000)
+    assert all(forest.find(i) == root for i in range(1, 10001))
+    assert max(forest.size.values()) == 10000
+
+
+@pytest.fixture
+def subjects(pg_schema):
+    from app.models.subject import SubjectCategories, Subjects
+    from app.models.academic import SubjectEquivalency
+
+    category = SubjectCategories(name='sciences')
+    db.session.add(category)
+    db.session.flush()
+    rows = {name: Subjects(name=name, category_id=category.id)
+            for name in ('Biology', 'Agricultural Science', 'Health Science', 'Physics', 'Chemistry')}
+    db.session.add_all(rows.values())
+    db.session.flush()
+    ids = {name: subject.id for name, subject in rows.items()}
+    # Biology ≡ Agricultural Science ≡ Health Science, declared in one direction only
+    db.session.add_all([
+        SubjectEquivalency(primary_subject_id=ids['Biology'], equivalent_subject_id=ids['Agricultural Science']),
+        SubjectEquivalency(primary_subject_id=ids['Health Science'], equivalent_subject_id=ids['Agricultural Science'])
+    ])
+    db.session.commit()
+    equivalency_graph.invalidate()
+    yield ids
+    equivalency_graph.invalidate()
+
+
+def test_equivalence_is_transitive_and_symmetric(subjects):
+    assert equivalency_graph.equivalent(subjects['Biology'], subjects['Health Science'])
+    assert equivalency_graph.equivalent('health science', 'BIOLOGY')
+    assert equivalency_graph.equivalent('Physics', 'Physics')
+    assert not equivalency_graph.equivalent('Biology', 'Physics')
+    assert not equivalency_graph.equivalent('Biology', 'Basket Weaving')
+
+
+def test_equivalents_and_names(subjects):
+    assert equivalency_graph.equivalents('Biology') == {subjects['Agricultural Science'], subjects['Health Science']}
+    assert equivalency_graph.equivalents('Physics') == frozenset()
+    assert equivalency_graph.expand_names({'Biology', 'Physics'}) == {
+        'Biology', 'Agricultural Science', 'Health Science', 'Physics'
+    }
+
+
+def test_model_helpers_use_the_graph(subjects):
+    from app.models.academic import SubjectEquivalency
+
+    assert SubjectEquivalency.check_equivalency(subjects['Health Science'], subjects['Biology'])
+    assert not SubjectEquivalency.check_equivalency(subjects['Chemistry'], subjects['Biology'])
+    assert [s.name for s in SubjectEquivalency.get_equivalents_for_subject(subjects['Health Science'])] == [
+        'Agricultural Science', 'Biology'
+    ]
+    assert SubjectEquivalency.get_equivalents_for_subject(subjects['Physics']) == []
+
+
+def test_new_equivalency_rebuilds_the_closure(subjects):
+    from app.models.academic import SubjectEquivalency
+    from app.utils.catalogue_sync import SELECT_VERSION
+
+    assert not equivalency_graph.equivalent('Physics', 'Chemistry')
+    version = db.session.scalar(SELECT_VERSION)
+    db.session.add(SubjectEquivalency(primary_subject_id=subjects['Physics'],
+                                      equivalent_subject_id=subjects['Chemistry']))
+    db.session.commit()
+    assert equivalency_graph.equivalent('Chemistry', 'Physics')
+    # Other workers pick the edit up from the shared version
+    assert db.session.scalar(SELECT_VERSION) > version
+
+
+def test_uncommitted_equivalency_keeps_the_closure(subjects):
+    from app.models.academic import SubjectEquivalency
+
+    closure = equivalency_graph._ensure_loaded()
+    db.session.add(SubjectEquivalency(primary_subject_id=subjects['Physics'],
+                                      equivalent_subject_id=subjects['Chemistry']))
+    db.session.flush()
+    assert equivalency_graph._closure is closure
+    db.session.rollback()
+    assert equivalency_graph._ensure_loaded() is closure
+    assert not equivalency_graph.equivalent('Chemistry', 'Physics')
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+from flask import Flask
+
+from app.extensions import cache
+from app.utils import featured as module
+from app.utils.catalogue_sync import _change_listeners
+from app.utils.featured import get_featured_pool, invalidate_featured, pick_featured
+
+
+def institution(i):
+    return {'id': i, 'name': f'University {i}', 'state': 'Lagos', 'type': 'Federal', 'courses_count': i}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Featured rows served from a list, counting database loads"""
+    rows = [institution(i) for i in range(1, 11)]
+    loads = []
+
+    def load():
+        loads.append(1)
+        return list(rows)
+
+    monkeypatch.setattr(module, 'load_featured_pool', load)
+    app = Flask(__name__)
+    app.config['CACHE_TYPE'] = 'SimpleCache'
+    cache.init_app(app)
+    with app.app_context():
+        yield rows, loads
+        cache.clear()
+
+
+def test_pool_is_loaded_once(pool):
+    rows, loads = pool
+    for _ in range(5):
+        pick_featured()
+    assert len(loads) == 1
+    assert get_featured_pool() == rows
+
+
+def test_rotation_picks_distinct_featured_institutions(pool):
+    rows, loads = pool
+    random.seed(1)
+    picks = [pick_featured(limit=4) for _ in range(20)]
+    assert all(len(picked) == 4 and len({item['id'] for item in picked}) == 4 for picked in picks)
+    assert all(item in rows for picked in picks for item in picked)
+    # Successive calls rotate through the pool rather than repeating one set
+    assert len({tuple(item['id'] for item in picked) for picked in picks}) > 1
+    assert {item['id'] for picked in picks for item in picked} == {row['id'] for row in rows}
+
+
+def test_small_pool_is_shown_whole(pool):
+    rows, loads = pool
+    picked = pick_featured(limit=len(rows) + 5)
+    assert sorted(item['id'] for item in picked) == [row['id'] for row in rows]
+    # Shuffling a copy leaves the cached pool in order
+    assert get_featured_pool() == rows
+
+
+def test_invalidation_reloads_the_pool(pool):
+    rows, loads = pool
+    pick_featured()
+    rows.append(institution(11))
+    assert len(get_featured_pool()) == 10
+    invalidate_featured()
+    assert len(get_featured_pool()) == 11
+    assert len(loads) == 2
+
+
+def test_catalogue_changes_invalidate_the_pool():
+    assert invalidate_featured in _change_listeners
@@ -0,0 +1,87 @@
+import pytest
+from flask import Flask, render_template_string
+from flask_login import LoginManager, UserMixin, login_user
+
+from app.extensions import cache
+from app.utils import fragment_cache as module
+from app.utils.fragment_cache import fragment_vary, get_fragment, init_app
+
+# Like the recommendation cards: markup depends on who is looking and their bookmarks
+CARD = (
+    "{% cache FRAGMENT_TIMEOUT, 'card', fragment_vary(uni_id, viewer_state(), bookmarked) %}"
+    "{{ uni_id }}:{{ viewer_state() }}:{{ bookmarked }}:{{ render_count() }}"
+    "{% endcache %}"
+)
+
+
+class User(UserMixin):
+    def __init__(self, id):
+        self.id = id
+
+
+@pytest.fixture
+def app(monkeypatch):
+    version = {'current': 1}
+    monkeypatch.setattr(module, 'get_catalogue_version', lambda: version['current'])
+    app = Flask(__name__)
+    app.config.update(CACHE_TYPE='SimpleCache', SECRET_KEY='test')
+    cache.init_app(app)
+    login_manager = LoginManager(app)
+    login_manager.user_loader(User)
+    init_app(app)
+    renders = []
+
+    @app.context_processor
+    def counter():
+        return {'render_count': lambda: renders.append(1) or len(renders)}
+
+    app.version = version
+    with app.app_context():
+        yield app
+        cache.clear()
+
+
+def render_card(app, uni_id=7, bookmarked=False, user=None):
+    with app.test_request_context('/recommend'):
+        if user is not None:
+            login_user(user)
+        return render_template_string(CARD, uni_id=uni_id, bookmarked=bookmarked)
+
+
+def test_vary_key_depends_on_every_part_and_the_version(app):
+    key = fragment_vary(7, 'anon', False)
+    assert fragment_vary(7, 'anon', False) == key
+    assert len({key, fragment_vary(7, 'auth', False), fragment_vary(7, 'anon', True), fragment_vary(8, 'anon', False)}) == 4
+    app.version['current'] = 2
+    assert fragment_vary(7, 'anon', False) != key
+
+
+def test_fragment_is_reused_for_the_same_viewer(app):
+    assert render_card(app) == '7:anon:False:1'
+    assert render_card(app) == '7:anon:False:1'
+
+
+def test_signed_in_viewers_get_their_own_fragment(app):
+    assert render_card(app) == '7:anon:False:1'
+    assert render_card(app, user=User(1)) == '7:auth:False:2'
+    # Another signed-in viewer without a bookmark shares the auth fragment
+    assert render_card(app, user=User(2)) == '7:auth:False:2'
+
+
+def test_bookmark_flag_varies_the_fragment(app):
+    assert render_card(app, user=User(1)) == '7:auth:False:1'
+    assert render_card(app, bookmarked=True, user=User(1)) == '7:auth:True:2'
+    assert render_card(app, bookmarked=True, user=User(2)) == '7:auth:True:2'
+
+
+def test_catalogue_change_renders_again(app):
+    assert render_card(app) == '7:anon:False:1'
+    app.version['current'] = 2
+    assert render_card(app) == '7:anon:False:2'
+
+
+def test_get_fragment_reads_what_the_template_cached(app):
+    vary = fragment_vary(7, 'anon', False)
+    assert get_fragment('card', vary) is None
+    render_card(app)
+    assert get_fragment('card', vary) == '7:anon:False:1'
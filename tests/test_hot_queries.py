@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db
+from app.utils.hot_queries import HotQuery, HotQueryRegistry
+
+
+def test_named_parameters_become_positional():
+    query = HotQuery('search', text(
+        "SELECT id FROM university WHERE name ILIKE :pattern OR code::text = :code OR alias ILIKE :pattern"
+    ), {'pattern': 'text', 'code': 'varchar'})
+    assert query.param_names == ['pattern', 'code']
+    assert query.prepare_sql == (
+        "PREPARE hq_search (text, varchar) AS "
+        "SELECT id FROM university WHERE name ILIKE $1 OR code::text = $2 OR alias ILIKE $1"
+    )
+    assert query.execute_sql == "EXECUTE hq_search (%(pattern)s, %(code)s)"
+
+
+def test_only_typed_raw_sql_is_preparable():
+    assert not HotQuery('untyped', text("SELECT :a")).preparable
+    assert not HotQuery('orm', select(text("1")), {}).preparable
+    registry = HotQueryRegistry()
+    registry.register('q', text("SELECT 1"))
+    with pytest.raises(ValueError):
+        registry.register('q', text("SELECT 2"))
+
+
+@pytest.mark.parametrize('config, driver, enabled', [
+    ({}, 'psycopg2', True),
+    ({'DB_PREPARE_HOT_QUERIES': False}, 'psycopg2', False),
+    ({'DB_POOL_MODE': 'pgbouncer'}, 'psycopg2', False),
+    ({}, 'psycopg', False),
+])
+def test_prepare_enabled(config, driver, enabled):
+    app = Flask(__name__)
+    app.config.update(config)
+    conn = SimpleNamespace(dialect=SimpleNamespace(driver=driver))
+    with app.app_context():
+        assert bool(HotQueryRegistry().prepare_enabled(conn)) is enabled
+
+
+@pytest.fixture
+def app(pg_app):
+    yield pg_app
+    db.session.rollback()
+
+
+def test_prepared_once_per_connection(app):
+    query = HotQuery('hq_test_add', text("SELECT :a + :b"), {'a': 'int', 'b': 'int'})
+    assert query.execute({'a': 1, 'b': 2}).scalar() == 3
+    assert query.execute({'a': 2, 'b': 2}).scalar() == 4
+    stats = query.stats()
+    assert stats['prepares'] == 1 and stats['prepared_calls'] == 2 and stats['calls'] == 2
+
+
+def test_compiled_cache_hits_are_counted(app):
+    app.config['DB_PREPARE_HOT_QUERIES'] = False
+    query = HotQuery('hq_test_cached', text("SELECT :a + :b"), {'a': 'int', 'b': 'int'})
+    for a in range(3):
+        assert query.execute({'a': a, 'b': 1}).scalar() == a + 1
+    stats = query.stats()
+    assert stats['prepared_calls'] == 0
+    assert stats['cache_hits'] + stats['cache_misses'] == 3 and stats['cache_hits'] >= 2
+
+
+def test_unpreparable_statement_falls_back_for_good(app):
+    query = HotQuery('hq_test_bad_type', text("SELECT :a"), {'a': 'no_such_type'})
+    assert query.execute({'a': 1}).scalar() == 1
+    assert not query.preparable
+    assert query.stats()['prepares'] == 0
+
+
+def test_transient_prepare_failure_is_retried(app, monkeypatch):
+    query = HotQuery('hq_test_retry', text("SELECT :a + 1"), {'a': 'int'})
+    conn = db.session.connection()
+    real = conn.exec_driver_sql
+    failures = [OperationalError('PREPARE', {}, SimpleNamespace(pgcode='57014'))]
+
+    def exec_driver_sql(sql, *args):
+        if sql.startswith('PREPARE') and failures:
+            raise failures.pop()
+        return real(sql, *args)
+
+    monkeypatch.setattr(conn, 'exec_driver_sql', exec_driver_sql)
+    assert query.execute({'a': 1}).scalar() == 2
+    assert query.preparable and query.stats()['prepared_calls'] == 0
+    assert query.execute({'a': 2}).scalar() == 3
+    assert query.stats()['prepares'] == 1 and query.stats()['prepared_calls'] == 1
+
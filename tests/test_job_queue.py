@@ -0,0 +1,188 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.extensions import db
+from app.models.job import Job
+from app.utils.job_queue import (
+    CLAIM,
+    COMPLETE,
+    JobWorker,
+    enqueue,
+    job,
+    queue_stats,
+    retry_delay
+)
+
+calls = []
+
+
+@job('test_record')
+def record(value=None):
+    calls.append(value)
+
+
+@job('test_fail', max_attempts=2)
+def fail():
+    raise RuntimeError("boom")
+
+
+@job('test_slow')
+def slow(seconds):
+    time.sleep(seconds)
+
+
+@pytest.fixture
+def queue(pg_app):
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS job"))
+    Job.__table__.create(db.engine)
+    pg_app.config.update(JOB_POLL_INTERVAL=0.01, JOB_RETRY_BASE_SECONDS=30, JOB_SCHEDULE={})
+    calls.clear()
+    yield pg_app
+    db.session.remove()
+    Job.__table__.drop(db.engine)
+
+
+def job_row(job_id):
+    with db.engine.connect() as conn:
+        return conn.execute(text("SELECT * FROM job WHERE id = :id"), {'id': job_id}).mappings().one()
+
+
+def claim(conn, worker):
+    return conn.execute(CLAIM, {'now': datetime.utcnow(), 'worker': worker}).mappings().first()
+
+
+def test_enqueue_rejects_unknown_jobs(queue):
+    with pytest.raises(ValueError):
+        enqueue('no_such_job')
+
+
+def test_dedupe_only_while_queued(queue):
+    first = enqueue('test_record', {'value': 1}, dedupe_key='k')
+    assert first is not None
+    assert enqueue('test_record', {'value': 2}, dedupe_key='k') is None
+
+    with db.engine.begin() as conn:
+        assert claim(conn, 'w1')['id'] == first
+    # Once the first one is running, the same work can be queued again
+    assert enqueue('test_record', {'value': 3}, dedupe_key='k') is not None
+
+
+def test_enqueue_joins_the_callers_transaction(queue):
+    with db.engine.connect() as conn:
+        trans = conn.begin()
+        enqueue('test_record', connection=conn)
+        trans.rollback()
+    with db.engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM job")).scalar() == 0
+
+
+def test_claims_skip_locked_rows(queue):
+    ids = {enqueue('test_record'), enqueue('test_record')}
+    with db.engine.connect() as a, db.engine.connect() as b:
+        a.begin()
+        b.begin()
+        first = claim(a, 'a')
+        second = claim(b, 'b')
+        assert {first['id'], second['id']} == ids
+        assert claim(b, 'b') is None
+
+
+def test_priority_then_run_at(queue):
+    low = enqueue('test_record', priority=0)
+    high = enqueue('test_record', priority=10)
+    later = enqueue('test_record', priority=10, delay=3600)
+    with db.engine.begin() as conn:
+        assert claim(conn, 'w')['id'] == high
+        assert claim(conn, 'w')['id'] == low
+        assert claim(conn, 'w') is None
+    assert job_row(later)['status'] == 'queued'
+
+
+def test_worker_runs_jobs(queue):
+    job_id = enqueue('test_record', {'value': 'hello'})
+    stats = JobWorker(queue, worker_id='w').run(burst=True)
+    assert stats['succeeded'] == 1
+    assert calls == ['hello']
+    row = job_row(job_id)
+    assert row['status'] == 'done' and row['locked_by'] is None and row['attempts'] == 1
+
+
+def test_failed_job_is_retried_with_backoff(queue):
+    job_id = enqueue('test_fail')
+    stats = JobWorker(queue, worker_id='w').run(burst=True)
+    assert stats['retried'] == 1
+    row = job_row(job_id)
+    assert row['status'] == 'queued'
+    assert 'RuntimeError: boom' in row['last_error']
+    assert row['run_at'] > datetime.utcnow() + timedelta(seconds=20)
+
+
+def test_failed_job_gives_up_after_max_attempts(queue):
+    queue.config['JOB_RETRY_BASE_SECONDS'] = 0
+    job_id = enqueue('test_fail')
+    stats = JobWorker(queue, worker_id='w').run(burst=True)
+    assert stats['retried'] == 1 and stats['failed'] == 1
+    row = job_row(job_id)
+    assert row['status'] == 'failed' and row['attempts'] == 2
+
+
+def test_retry_delay_grows_and_is_capped(queue):
+    queue.config.update(JOB_RETRY_BASE_SECONDS=10, JOB_RETRY_MAX_SECONDS=60)
+    assert 8 <= retry_delay(1) <= 12
+    assert 16 <= retry_delay(2) <= 24
+    assert retry_delay(10) <= 72
+
+
+def test_stale_job_is_recovered(queue):
+    stale = enqueue('test_record')
+    alive = enqueue('test_record')
+    old = datetime.utcnow() - timedelta(hours=1)
+    with db.engine.begin() as conn:
+        claim(conn, 'dead')
+        claim(conn, 'busy')
+        conn.execute(text("UPDATE job SET started_at = :old, heartbeat_at = :old WHERE id = :id"),
+                     {'old': old, 'id': stale})
+        # Started long ago but still beating
+        conn.execute(text("UPDATE job SET started_at = :old, heartbeat_at = :now WHERE id = :id"),
+                     {'old': old, 'now': datetime.utcnow(), 'id': alive})
+
+    JobWorker(queue, worker_id='w')._maintain()
+
+    row = job_row(stale)
+    assert row['status'] == 'queued' and row['locked_by'] is None
+    assert row['last_error'] == 'Worker stopped before the job finished'
+    assert job_row(alive)['status'] == 'running'
+
+
+def test_taken_over_job_is_not_completed_by_its_old_worker(queue):
+    job_id = enqueue('test_record')
+    with db.engine.begin() as conn:
+        claim(conn, 'old')
+        # Recovered as stale and claimed again by another worker
+        conn.execute(text("UPDATE job SET locked_by = 'new' WHERE id = :id"), {'id': job_id})
+        completed = conn.execute(COMPLETE, {'id': job_id, 'worker': 'old', 'now': datetime.utcnow()}).scalar()
+    assert completed is None
+    row = job_row(job_id)
+    assert row['status'] == 'running' and row['locked_by'] == 'new'
+
+
+def test_heartbeat_while_running(queue):
+    queue.config['JOB_HEARTBEAT_INTERVAL'] = 0.05
+    job_id = enqueue('test_slow', {'seconds': 0.3})
+    assert JobWorker(queue, worker_id='w').run(burst=True)['succeeded'] == 1
+    row = job_row(job_id)
+    assert row['heartbeat_at'] > row['started_at']
+
+
+def test_queue_stats(queue):
+    enqueue('test_record', {'value': 1})
+    enqueue('test_record', {'value': 2}, delay=3600)
+    JobWorker(queue, worker_id='w').run(burst=True)
+    stats = queue_stats()['jobs']['test_record']
+    assert stats['queued'] == 1 and stats['due'] == 0
+    assert stats['done_24h'] == 1 and stats['failed_24h'] == 0
+    assert stats['avg_ms'] is not None
@@ -0,0 +1,146 @@
+import smtplib
+import threading
+
+import pytest
+from flask import Flask
+from flask_mail import Mail, Message
+
+from app.utils import mail_pool as module
+from app.utils.mail_pool import MailDispatcher, MailStats, SMTPPool
+
+
+class FakeSMTP:
+    """Records what each session delivers; fail_on maps a recipient to the error to raise once"""
+    sessions = []
+    delivered = []
+    fail_on = {}
+
+    def __init__(self, host, port, timeout=None):
+        self.timeout = timeout
+        self.closed = False
+        FakeSMTP.sessions.append(self)
+
+    def set_debuglevel(self, level):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def sendmail(self, sender, recipients, body, mail_options=(), rcpt_options=()):
+        error = FakeSMTP.fail_on.pop(recipients[0], None)
+        if error is not None:
+            raise error
+        FakeSMTP.delivered.append((self, recipients[0]))
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def app(monkeypatch):
+    FakeSMTP.sessions, FakeSMTP.delivered, FakeSMTP.fail_on = [], [], {}
+    monkeypatch.setattr(smtplib, 'SMTP_SSL', FakeSMTP)
+    monkeypatch.setattr(module, 'mail_stats', MailStats())
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_SERVER='smtp.example.com', MAIL_PORT=465, MAIL_USE_SSL=True, MAIL_USE_TLS=False,
+        MAIL_USERNAME='user', MAIL_PASSWORD='secret', MAIL_DEFAULT_SENDER='noreply@example.com',
+        MAIL_RETRY_BACKOFF=0, MAIL_MAX_ATTEMPTS=3, MAIL_TIMEOUT=5
+    )
+    Mail(app)
+    with app.app_context():
+        yield app
+
+
+def messages(count):
+    return [Message('Hello', recipients=[f'user{i}@example.com'], body='Hi') for i in range(count)]
+
+
+def recipients():
+    return [recipient for _, recipient in FakeSMTP.delivered]
+
+
+def test_batches_reuse_one_session(app):
+    pool = SMTPPool()
+    assert pool.send_batch(messages(5)) == [None] * 5
+    assert pool.send_batch(messages(3)) == [None] * 3
+    assert len(FakeSMTP.sessions) == 1
+    assert FakeSMTP.sessions[0].timeout == 5
+    assert pool.idle_count() == 1
+    stats = module.mail_stats.summary()
+    assert stats['sent'] == 8 and stats['batches'] == 2 and stats['connections_opened'] == 1
+
+
+def test_transient_error_retries_the_rest_on_a_new_session(app):
+    FakeSMTP.fail_on['user2@example.com'] = smtplib.SMTPServerDisconnected("gone")
+    pool = SMTPPool()
+    assert pool.send_batch(messages(4)) == [None] * 4
+    # Each message is delivered exactly once, the rest of the batch on a fresh session
+    assert recipients() == [f'user{i}@example.com' for i in range(4)]
+    assert len(FakeSMTP.sessions) == 2 and FakeSMTP.sessions[0].closed
+    assert module.mail_stats.summary()['retries'] == 1
+
+
+def test_permanent_rejection_is_not_retried(app):
+    refused = smtplib.SMTPRecipientsRefused({'user1@example.com': (550, b'no such user')})
+    FakeSMTP.fail_on['user1@example.com'] = refused
+    results = SMTPPool().send_batch(messages(3))
+    assert results == [None, refused, None]
+    assert len(FakeSMTP.sessions) == 1
+    stats = module.mail_stats.summary()
+    assert stats['sent'] == 2 and stats['failed'] == 1 and stats['retries'] == 0
+
+
+def test_gives_up_after_max_attempts(app, monkeypatch):
+    def refuse_connection(*args, **kwargs):
+        raise ConnectionRefusedError("smtp down")
+
+    monkeypatch.setattr(smtplib, 'SMTP_SSL', refuse_connection)
+    results = SMTPPool().send_batch(messages(2))
+    assert all(isinstance(error, ConnectionRefusedError) for error in results)
+    stats = module.mail_stats.summary()
+    assert stats['failed'] == 2 and stats['retries'] == 2
+
+
+def test_idle_sessions_expire(app):
+    app.config['MAIL_POOL_IDLE_SECONDS'] = 0
+    pool = SMTPPool()
+    pool.send_batch(messages(1))
+    pool.close_idle()
+    assert pool.idle_count() == 0 and FakeSMTP.sessions[0].closed
+    pool.send_batch(messages(1))
+    assert len(FakeSMTP.sessions) == 2
+
+
+def test_dispatcher_sends_queued_mail_in_batches(app, monkeypatch):
+    app.config.update(MAIL_SENDER_THREADS=1, MAIL_BATCH_SIZE=50)
+    sending, release = threading.Event(), threading.Event()
+    sendmail = FakeSMTP.sendmail
+
+    def slow_sendmail(self, *args):
+        sending.set()
+        release.wait(5)
+        sendmail(self, *args)
+
+    monkeypatch.setattr(FakeSMTP, 'sendmail', slow_sendmail)
+    monkeypatch.setattr(module, 'smtp_pool', SMTPPool())
+    dispatcher = MailDispatcher()
+    first, *rest = messages(10)
+    assert dispatcher.submit(first)
+    # Everything queued while the first message is in flight goes out as one batch
+    assert sending.wait(5)
+    assert all(dispatcher.submit(message) for message in rest)
+    release.set()
+    dispatcher.drain(5)
+    assert recipients() == [f'user{i}@example.com' for i in range(10)]
+    assert len(FakeSMTP.sessions) == 1
+    stats = module.mail_stats.summary()
+    assert stats['submitted'] == 10 and stats['batches'] == 2
+
+
+def test_full_queue_refuses_instead_of_blocking(app):
+    app.config.update(MAIL_SENDER_THREADS=0, MAIL_QUEUE_SIZE=2)
+    dispatcher = MailDispatcher()
+    assert [dispatcher.submit(message) for message in messages(3)] == [True, True, False]
+    assert module.mail_stats.summary()['overflow'] == 1
+    assert dispatcher.stats()['queued'] == 2
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.utils import page_data as module
+from app.utils.db_pool import plan_pool
+from app.utils.page_data import (
+    STRATEGY_PIPELINE,
+    STRATEGY_SEQUENTIAL,
+    STRATEGY_THREADS,
+    PageQuery,
+    choose_strategy,
+    load_page_data
+)
+
+SLEEP = 0.3
+
+
+@pytest.fixture
+def app(pg_app, monkeypatch):
+    monkeypatch.setattr(module, '_executor', None)
+    pg_app.config.update(PAGE_DATA_STRATEGY='threads', PAGE_DATA_MAX_QUERIES=6,
+                          GUNICORN_WORKER_CLASS='gthread', GUNICORN_THREADS=2)
+    pg_app.extensions['db_pool_plan'] = plan_pool(pg_app.config)
+    yield pg_app
+    if module._executor is not None:
+        module._executor.shutdown()
+
+
+def sleepy_queries(count):
+    return [
+        PageQuery(f'q{i}', text("SELECT :i FROM pg_sleep(:seconds)"), {'seconds': SLEEP, 'i': i}, shape='scalar')
+        for i in range(count)
+    ]
+
+
+def test_queries_run_concurrently_and_keep_their_names(app):
+    start = time.perf_counter()
+    results = load_page_data(sleepy_queries(4))
+    assert time.perf_counter() - start < SLEEP * 2
+    assert results == {f'q{i}': i for i in range(4)}
+    assert choose_strategy(sleepy_queries(4)) == STRATEGY_THREADS
+
+
+def test_executor_covers_every_concurrent_request(app):
+    # Two requests loading the largest page at once must not queue behind
+    # each other for executor threads
+    assert app.extensions['db_pool_plan']['page_data_threads'] == 2 * app.config['PAGE_DATA_MAX_QUERIES']
+    queries = sleepy_queries(app.config['PAGE_DATA_MAX_QUERIES'])
+    elapsed = []
+
+    def request():
+        with app.app_context():
+            start = time.perf_counter()
+            load_page_data(queries)
+            elapsed.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(elapsed) < SLEEP * 2
+    assert module._executor._max_workers == 12
+
+
+def test_loads_sequentially_without_spare_connections(app):
+    app.config.update(DB_POOL_SIZE='2', DB_MAX_OVERFLOW='0')
+    app.extensions['db_pool_plan'] = plan_pool(app.config)
+    assert app.extensions['db_pool_plan']['page_data_threads'] == 0
+    assert choose_strategy(sleepy_queries(2)) == STRATEGY_SEQUENTIAL
+
+
+def test_a_request_that_wrote_loads_sequentially(app):
+    from app.extensions import db
+    db.session.info['wrote'] = True
+    assert choose_strategy(sleepy_queries(2)) == STRATEGY_SEQUENTIAL
+
+
+def test_strategy_follows_config_and_driver(app, monkeypatch):
+    queries = sleepy_queries(2)
+    assert choose_strategy(queries[:1]) == STRATEGY_SEQUENTIAL
+    app.config['PAGE_DATA_STRATEGY'] = 'sequential'
+    assert choose_strategy(queries) == STRATEGY_SEQUENTIAL
+    # psycopg2 cannot pipeline, so auto uses threads; psycopg 3 pipelines
+    app.config['PAGE_DATA_STRATEGY'] = 'auto'
+    assert choose_strategy(queries) == STRATEGY_THREADS
+    monkeypatch.setattr(module, 'pipeline_enabled', lambda bind: True)
+    assert choose_strategy(queries) == STRATEGY_PIPELINE
+
+
+def test_pending_orm_changes_load_sequentially(app):
+    from app.extensions import db
+    from app.models import State
+
+    db.session.add(State(name='Lagos'))
+    assert choose_strategy(sleepy_queries(2)) == STRATEGY_SEQUENTIAL
+    db.session.expunge_all()
+    assert choose_strategy(sleepy_queries(2)) == STRATEGY_THREADS
+
+
+def test_reads_after_a_write_see_it(app):
+    from app.extensions import db
+
+    assert choose_strategy(sleepy_queries(2)) == STRATEGY_THREADS
+    # A temporary table only exists on this session's connection, like an
+    # uncommitted row only being visible to it
+    db.session.execute(text("CREATE TEMP TABLE page_note (id integer)"))
+    db.session.execute(text("INSERT INTO page_note VALUES (1), (2)"))
+    queries = [
+        PageQuery('count', text("SELECT count(*) FROM page_note"), shape='scalar'),
+        PageQuery('ids', text("SELECT id FROM page_note ORDER BY id"), shape='scalars')
+    ]
+    assert choose_strategy(queries) == STRATEGY_SEQUENTIAL
+    assert load_page_data(queries) == {'count': 2, 'ids': [1, 2]}
+    db.session.rollback()
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+from sqlalchemy import bindparam, column, select, table, text
+from sqlalchemy.dialects.postgresql import psycopg
+
+from app.utils.pipeline import PipelineResult, compile_statement, pipeline_enabled, run_pipelined
+
+dialect = psycopg.dialect()
+university = table('university', column('id'), column('state_id'), column('university_name'))
+
+
+def test_expanding_params_are_rendered_one_placeholder_per_value():
+    statement = select(university.c.id).where(
+        university.c.state_id.in_(bindparam('states', expanding=True)),
+        university.c.id > bindparam('min_id')
+    )
+    sql, params = compile_statement(statement, {'states': [1, 2, 3], 'min_id': 5}, dialect)
+    assert 'IN (%(states_1)s, %(states_2)s, %(states_3)s)' in sql
+    assert params == {'states_1': 1, 'states_2': 2, 'states_3': 3, 'min_id': 5}
+
+
+def test_the_same_statement_compiles_for_different_list_lengths():
+    statement = select(university.c.id).where(university.c.state_id.in_(bindparam('states', expanding=True)))
+    one_sql, one = compile_statement(statement, {'states': [7]}, dialect)
+    two_sql, two = compile_statement(statement, {'states': [7, 8]}, dialect)
+    assert one == {'states_1': 7} and two == {'states_1': 7, 'states_2': 8}
+    assert one_sql != two_sql
+
+
+def test_empty_list_matches_nothing():
+    statement = select(university.c.id).where(university.c.state_id.in_(bindparam('states', expanding=True)))
+    sql, params = compile_statement(statement, {'states': []}, dialect)
+    assert '%(' not in sql and params == {}
+
+
+def test_literal_in_lists_and_text_statements():
+    sql, params = compile_statement(select(university.c.id).where(university.c.state_id.in_([4, 5])), None, dialect)
+    assert sorted(params.values()) == [4, 5] and sql.count('%(') == 2
+
+    statement = text("SELECT id FROM university WHERE state_id IN :states AND university_name ILIKE :name")\
+        .bindparams(bindparam('states', expanding=True))
+    sql, params = compile_statement(statement, {'states': [1, 2], 'name': '%lagos%'}, dialect)
+    assert 'IN (%(states_1)s, %(states_2)s)' in sql
+    assert params == {'states_1': 1, 'states_2': 2, 'name': '%lagos%'}
+
+
+def test_pipeline_result_accessors():
+    result = PipelineResult([(1, 'a'), (2, 'b')])
+    assert result.all() == [(1, 'a'), (2, 'b')]
+    assert result.scalars().all() == [1, 2]
+    assert result.scalar() == 1
+    assert PipelineResult([]).scalar() is None
+
+
+def test_pipelining_needs_psycopg_3_and_the_setting():
+    app = Flask(__name__)
+    with app.app_context():
+        assert pipeline_enabled(SimpleNamespace(dialect=dialect))
+        assert not pipeline_enabled(SimpleNamespace(dialect=SimpleNamespace(driver='psycopg2')))
+        app.config['DB_PIPELINE'] = False
+        assert not pipeline_enabled(SimpleNamespace(dialect=dialect))
+
+
+@pytest.mark.usefixtures('pg_app')
+def test_other_drivers_run_statements_in_order():
+    statement = text("SELECT x FROM unnest(CAST(:values AS integer[])) AS x ORDER BY x")
+    results = run_pipelined([
+        (statement, {'values': [3, 1, 2]}),
+        (text("SELECT 42"), None)
+    ])
+    assert [row[0] for row in results[0].all()] == [1, 2, 3]
+    assert results[1].scalar() == 42
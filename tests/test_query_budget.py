@@ -0,0 +1,128 @@
+import pytest
+from flask import Blueprint, Flask, jsonify
+
+from app.extensions import db
+from app.utils import query_budget as module
+from app.utils.query_budget import (
+    DEGRADED_HEADER, BudgetStats, budget_exceeded, current_budget_ms, init_app, query_budget, record_overrun
+)
+
+
+class DBAPIError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+TIMEOUT = DBAPIError('57014')
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(module, 'budget_stats', BudgetStats())
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        QUERY_BUDGETS_MS={'default': 2000, 'search': 800, 'admin': 30000}
+    )
+    db.init_app(app)
+    init_app(app)
+    calls = []
+    seen = {}
+
+    def fallback(**kwargs):
+        calls.append(kwargs)
+        return jsonify(results=[], degraded=True)
+
+    def failing_fallback(**kwargs):
+        raise RuntimeError("snapshot unavailable")
+
+    @app.route('/search/<outcome>')
+    @query_budget('search', fallback=fallback)
+    def search(outcome):
+        seen['budget_ms'] = current_budget_ms()
+        if outcome in ('overrun', 'overrun-ok'):
+            record_overrun(TIMEOUT, 'SELECT slow')
+        if outcome == 'overrun-ok':
+            return jsonify(results=['partial'])
+        if outcome in ('overrun', 'error'):
+            return jsonify(error='failed'), 500
+        return jsonify(results=['fast'])
+
+    @app.route('/fragile')
+    @query_budget('search', fallback=failing_fallback)
+    def fragile():
+        record_overrun(TIMEOUT)
+        return jsonify(error='failed'), 500
+
+    @app.route('/plain')
+    @query_budget('search')
+    def plain():
+        record_overrun(TIMEOUT)
+        return jsonify(error='failed'), 500
+
+    admin = Blueprint('admin', __name__)
+
+    @admin.route('/admin/report')
+    def report():
+        seen['budget_ms'] = current_budget_ms()
+        return 'ok'
+
+    app.register_blueprint(admin)
+    app.calls, app.seen = calls, seen
+    return app
+
+
+def test_overrun_with_server_error_serves_the_fallback(app):
+    response = app.test_client().get('/search/overrun')
+    assert response.status_code == 200
+    assert response.get_json() == {'results': [], 'degraded': True}
+    assert response.headers[DEGRADED_HEADER] == 'statement-timeout'
+    assert app.calls == [{'outcome': 'overrun'}]
+    assert module.budget_stats.summary()['search'] == {'requests': 1, 'overruns': 1, 'fallbacks': 1}
+
+
+def test_overrun_that_the_view_survived_is_served_as_is(app):
+    response = app.test_client().get('/search/overrun-ok')
+    assert response.get_json() == {'results': ['partial']}
+    assert DEGRADED_HEADER not in response.headers
+    assert app.calls == []
+
+
+def test_server_error_without_overrun_is_not_masked(app):
+    response = app.test_client().get('/search/error')
+    assert response.status_code == 500
+    assert DEGRADED_HEADER not in response.headers
+    assert app.calls == []
+
+
+def test_failing_fallback_returns_the_original_error(app):
+    response = app.test_client().get('/fragile')
+    assert response.status_code == 500 and DEGRADED_HEADER not in response.headers
+    assert module.budget_stats.summary()['search']['fallbacks'] == 0
+
+
+def test_view_without_fallback_keeps_its_error(app):
+    response = app.test_client().get('/plain')
+    assert response.status_code == 500 and DEGRADED_HEADER not in response.headers
+
+
+def test_requests_run_under_their_budget_class(app):
+    client = app.test_client()
+    client.get('/search/ok')
+    assert app.seen['budget_ms'] == 800
+    client.get('/admin/report')
+    assert app.seen['budget_ms'] == 30000
+    assert current_budget_ms() is None
+    summary = module.budget_stats.summary()
+    assert summary['search']['requests'] == 1 and summary['admin']['requests'] == 1
+
+
+def test_only_statement_timeouts_count_as_overruns(app):
+    assert budget_exceeded(TIMEOUT)
+    assert not budget_exceeded(DBAPIError('40001'))
+    assert not budget_exceeded(ValueError('no sqlstate'))
+    with app.test_request_context('/search/ok'):
+        assert not record_overrun(DBAPIError('23505'))
+    # Outside a request there is no budget to charge
+    assert not record_overrun(TIMEOUT)
@@ -0,0 +1,38 @@
+import pytest
+
+from app.utils.query_normalize import like_pattern, normalize_query, query_tokens, search_key
+
+
+@pytest.mark.parametrize('query, normalised', [
+    (' The  MATHS ', 'mathematics'),
+    ('Mathematics', 'mathematics'),
+    ('econs', 'economics'),
+    ('Eng Lang', 'english'),
+    ('lit in eng', 'literature'),
+    ('further maths', 'further mathematics'),
+    ('Law and Order', 'law order'),
+    ('the', 'the'),
+    ('', ''),
+    (None, '')
+])
+def test_normalize_query(query, normalised):
+    assert normalize_query(query) == normalised
+
+
+@pytest.mark.parametrize('query', ['eng', 'bio', 'engineering', 'biochemistry', 'agric', 'commerce'])
+def test_prefixes_and_other_subjects_are_left_alone(query):
+    assert query_tokens(query) == [query]
+
+
+def test_like_pattern_tolerates_stripped_stopwords():
+    assert like_pattern('Faculty of Law') == '%faculty%law%'
+    assert like_pattern('MATHS') == '%mathematics%'
+
+
+def test_search_key_is_shared_by_every_spelling():
+    key = search_key('search', 'The Maths', 'Lagos', ('Federal', 'State'))
+    assert key == search_key('search', '  mathematics ', 'Lagos', ('Federal', 'State'))
+    assert key.startswith('search:') and len(key) == len('search:') + 40
+    assert key != search_key('search', 'maths', 'Oyo', ('Federal', 'State'))
+    assert key != search_key('courses', 'maths', 'Lagos', ('Federal', 'State'))
+    assert search_key('search', 'law', None) != search_key('search', 'law', 'None')
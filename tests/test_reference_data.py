@@ -0,0 +1,135 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.utils import reference_data as module
+from app.utils.reference_data import ReferenceData, encode_payload, encoded_response
+
+
+def make_snapshot(states, types_by_state):
+    """The parts of a catalogue snapshot reference data reads"""
+    type_names = sorted({name for names in types_by_state.values() for name in names})
+    return SimpleNamespace(
+        strings={
+            'state_names': ('', *states),
+            'type_names': tuple(type_names),
+            'type_categories': tuple('University' for _ in type_names),
+            'type_institution_types': tuple(name.split()[0] for name in type_names)
+        },
+        programme_types_by_state=lambda: {
+            state: [type_names.index(name) for name in names]
+            for state, names in types_by_state.items()
+        }
+    )
+
+
+@pytest.fixture
+def catalogue(monkeypatch):
+    """Current catalogue version and snapshot, counting snapshot reads"""
+    current = {'version': 1, 'snapshot': make_snapshot(['Lagos', 'Oyo'], {'Lagos': ['Federal University']})}
+    reads = []
+
+    def snapshot():
+        reads.append(current['version'])
+        return current['snapshot']
+
+    monkeypatch.setattr(module, 'get_catalogue_version', lambda: current['version'])
+    monkeypatch.setattr(module, 'get_catalogue_snapshot', snapshot)
+    return current, reads
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def serve(app, encoded, headers=None):
+    with app.test_request_context('/api/locations', headers=headers or {}):
+        return encoded_response(encoded)
+
+
+def test_response_carries_etag_and_cache_control(app):
+    encoded = encode_payload(['ALL', 'Lagos'])
+    response = serve(app, encoded)
+    assert response.status_code == 200
+    assert json.loads(response.get_data()) == ['ALL', 'Lagos']
+    assert response.get_etag() == (encoded.etag, False)
+    assert response.headers['Cache-Control'] == f'public, max-age={module.REFERENCE_MAX_AGE}'
+
+
+@pytest.mark.parametrize('if_none_match', ['"{etag}"', 'W/"{etag}"', '"other", "{etag}"', '*'])
+def test_matching_validator_gets_304(app, if_none_match):
+    encoded = encode_payload(['ALL', 'Lagos'])
+    response = serve(app, encoded, {'If-None-Match': if_none_match.format(etag=encoded.etag)})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.get_etag() == (encoded.etag, False)
+
+
+def test_stale_validator_gets_the_body(app):
+    encoded = encode_payload(['ALL', 'Lagos'])
+    response = serve(app, encoded, {'If-None-Match': '"stale"'})
+    assert response.status_code == 200 and response.get_data() == encoded.body
+
+
+def test_error_payloads_are_not_validated_or_cached(app):
+    encoded = encode_payload({'status': 'error'}, status=404)
+    response = serve(app, encoded, {'If-None-Match': f'"{encoded.etag}"'})
+    assert response.status_code == 404
+    assert response.get_etag() == (None, None)
+    assert 'Cache-Control' not in response.headers
+
+
+def test_payloads_are_encoded_once_per_version(catalogue):
+    current, reads = catalogue
+    data = ReferenceData()
+    first = data.locations()
+    assert json.loads(first.body) == ['ALL', 'Lagos', 'Oyo']
+    assert data.programme_types() is data.programme_types()
+    assert reads == [1]
+
+    current['version'] = 2
+    current['snapshot'] = make_snapshot(['Lagos', 'Ogun'], {'Lagos': ['Federal University']})
+    second = data.locations()
+    assert json.loads(second.body) == ['ALL', 'Lagos', 'Ogun']
+    assert second.etag != first.etag
+    assert reads == [1, 2]
+
+
+def test_same_content_keeps_its_etag_across_versions(catalogue):
+    current, reads = catalogue
+    data = ReferenceData()
+    etag = data.locations().etag
+    current['version'] = 2
+    assert data.locations().etag == etag
+    assert reads == [1, 2]
+
+
+def test_invalidate_rebuilds_on_the_next_read(catalogue):
+    current, reads = catalogue
+    data = ReferenceData()
+    data.locations()
+    data.invalidate()
+    data.locations()
+    assert reads == [1, 1]
+
+
+def test_programme_types_by_state(catalogue):
+    data = ReferenceData()
+    lagos = data.programme_types_for_state(' lagos ')
+    assert json.loads(lagos.body) == {
+        'status': 'success',
+        'data': [{'name': 'Federal University', 'category': 'University', 'institution_type': 'Federal'}]
+    }
+    assert data.programme_types_for_state('Oyo').status == 404
+    assert data.programme_types_for_state('Atlantis') is None
+
+
+def test_empty_catalogue_reports_404(catalogue):
+    current, reads = catalogue
+    current['snapshot'] = make_snapshot([], {})
+    data = ReferenceData()
+    assert data.locations().status == 404
+    assert data.programme_types().status == 404
@@ -0,0 +1,124 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils import serialization
+from app.utils.serialization import (
+    COURSE_REQUIREMENT_SCHEMA, UNIVERSITY_CARD_SCHEMA, UNIVERSITY_SCHEMA, FastJSONProvider, Schema
+)
+
+
+def university(**overrides):
+    values = dict(
+        id=7, university_name='University of Lagos', website='https://unilag.edu.ng',
+        established=1962, abbrv='UNILAG', course_count=120,
+        state_info=SimpleNamespace(name='Lagos'),
+        programme_type_info=SimpleNamespace(name='Federal')
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def requirement(**overrides):
+    values = dict(
+        university=university(), direct_entry_requirements='Two A level passes',
+        utme_requirements='English, Maths', subject_requirement=SimpleNamespace(subjects='Physics')
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+PAYLOAD = {
+    'name': 'Lagos',
+    'count': 3,
+    'ratio': 0.5,
+    'flags': [True, False, None],
+    'posted': datetime(2024, 5, 1, 12, 30),
+    'day': date(2024, 5, 1),
+    'fee': Decimal('1500.50'),
+    'nested': {'ids': [1, 2], 'empty': {}},
+    'unicode': 'Ọ̀yọ́'
+}
+
+
+def render(provider_class, payload, debug=False):
+    app = Flask(__name__)
+    app.debug = debug
+    app.json = provider_class(app)
+    with app.app_context():
+        response = jsonify(payload)
+        return response.mimetype, json.loads(response.get_data())
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_provider_matches_default_jsonify(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, 'orjson', None)
+    assert render(FastJSONProvider, PAYLOAD) == render(DefaultJSONProvider, PAYLOAD)
+
+
+def test_provider_matches_default_jsonify_in_debug():
+    assert render(FastJSONProvider, PAYLOAD, debug=True) == render(DefaultJSONProvider, PAYLOAD)
+
+
+def test_provider_dumps_and_loads_round_trip():
+    provider = FastJSONProvider(Flask(__name__))
+    assert provider.loads(provider.dumps(PAYLOAD)) == json.loads(DefaultJSONProvider(Flask(__name__)).dumps(PAYLOAD))
+
+
+def test_university_schema_matches_the_old_payload():
+    uni = university()
+    old = {
+        "id": uni.id,
+        "university_name": uni.university_name,
+        "state": uni.state_info.name,
+        "program_type": uni.programme_type_info.name,
+        "website": uni.website,
+        "established": uni.established,
+        "abbrv": uni.abbrv,
+    }
+    assert UNIVERSITY_SCHEMA.dump(uni) == old
+    assert UNIVERSITY_SCHEMA.dump(uni, courses=[]) == dict(old, courses=[])
+
+
+def test_card_schema_matches_the_old_institution_listing():
+    institutions = [university(), university(id=8, university_name='Covenant University')]
+    old = [{
+        'id': inst.id,
+        'name': inst.university_name,
+        'state': inst.state_info.name,
+        'type': inst.programme_type_info.name,
+        'courses_count': inst.course_count
+    } for inst in institutions]
+    assert UNIVERSITY_CARD_SCHEMA.dump_many(institutions) == old
+
+
+def test_missing_relationships_serialise_as_null():
+    uni = university(state_info=None, programme_type_info=None)
+    card = UNIVERSITY_CARD_SCHEMA.dump(uni)
+    assert card['state'] is None and card['type'] is None
+
+
+def test_requirement_schema_matches_the_old_payload():
+    requirements = [requirement(), requirement(subject_requirement=None)]
+    old = [{
+        "university_name": req.university.university_name,
+        "abbrv": req.university.abbrv,
+        "direct_entry_requirements": req.direct_entry_requirements,
+        "utme_requirements": req.utme_requirements,
+        "subjects": req.subject_requirement.subjects if req.subject_requirement else None
+    } for req in requirements]
+    assert COURSE_REQUIREMENT_SCHEMA.dump_many(requirements) == old
+
+
+def test_only_and_extend_derive_new_schemas():
+    schema = Schema(id='id', name='university_name')
+    assert schema.only('id').dump(university()) == {'id': 7}
+    extended = schema.extend(name=lambda uni: uni.abbrv, count='course_count')
+    assert extended.dump(university()) == {'id': 7, 'name': 'UNILAG', 'count': 120}
+    assert schema.dump(university()) == {'id': 7, 'name': 'University of Lagos'}
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from app.extensions import cache
+from app.utils.single_flight import SingleFlight
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['CACHE_TYPE'] = 'SimpleCache'
+    cache.init_app(app)
+    with app.app_context():
+        yield app
+        cache.clear()
+
+
+def run_concurrently(app, count, target):
+    results, errors = [], []
+
+    def run():
+        with app.app_context():
+            try:
+                results.append(target())
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_computation(app):
+    flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'answer': 42}
+
+    results, errors = run_concurrently(app, 8, lambda: flight.do('search:q', compute))
+    assert errors == [] and len(calls) == 1
+    assert results == [{'answer': 42}] * 8
+    stats = flight.stats()
+    assert stats['leaders'] == 1 and stats['local_waits'] == 7 and stats['in_flight'] == 0
+    assert cache.get('search:q') == {'answer': 42}
+    assert cache.get('search:q:lock') is None
+
+
+def test_errors_reach_every_waiter_and_are_not_cached(app):
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise RuntimeError("database down")
+
+    results, errors = run_concurrently(app, 4, lambda: flight.do('search:q', fail))
+    assert results == [] and len(errors) == 4
+    assert all(str(e) == "database down" for e in errors)
+    assert cache.get('search:q:lock') is None
+    assert flight.do('search:q', lambda: 'recovered') == 'recovered'
+
+
+def test_waits_for_another_worker_holding_the_lock(app):
+    flight = SingleFlight(poll_interval=0.01)
+    cache.add('search:q:lock', 'other-worker')
+
+    def other_worker_finishes():
+        time.sleep(0.1)
+        with app.app_context():
+            cache.set('search:q', 'from other worker')
+            cache.delete('search:q:lock')
+
+    other = threading.Thread(target=other_worker_finishes)
+    other.start()
+    assert flight.do('search:q', lambda: pytest.fail("computed twice")) == 'from other worker'
+    other.join()
+    assert flight.stats()['remote_waits'] == 1
+
+
+def test_computes_itself_when_the_holder_disappears(app):
+    flight = SingleFlight(wait_timeout=0.2, poll_interval=0.01)
+    cache.add('search:q:lock', 'dead-worker')
+    assert flight.do('search:q', lambda: 'computed here') == 'computed here'
+    assert flight.stats()['wait_timeouts'] == 1
+    assert cache.get('search:q') == 'computed here'
+
+
+def test_leader_reuses_a_value_stored_just_before_it_took_the_lock(app):
+    flight = SingleFlight()
+    cache.set('search:q', 'already there')
+    assert flight.do('search:q', lambda: pytest.fail("recomputed")) == 'already there'
@@ -0,0 +1,231 @@
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from app.utils import snapshot as module
+from app.utils.snapshot import (
+    MISSING,
+    CatalogueSnapshot,
+    SnapshotHolder,
+    StringColumn,
+    current_snapshot_path,
+    load_catalogue_snapshot,
+    save_catalogue_snapshot
+)
+
+
+def make_snapshot(version=1):
+    """Three universities, two courses: Law at A (Lagos) and B (Oyo), Medicine at A and C"""
+    arrays = {
+        'uni_id': np.array([10, 20, 30], dtype=np.int32),
+        'uni_state': np.array([0, 1, MISSING], dtype=np.int16),
+        'uni_type': np.array([0, 0, 1], dtype=np.int16),
+        'uni_course_count': np.array([2, 1, 1], dtype=np.int32),
+        'uni_featured': np.array([True, False, False]),
+        'uni_name_rank': np.array([1, 0, 2], dtype=np.int32),
+        'course_id': np.array([1, 2], dtype=np.int32),
+        'course_name_rank': np.array([0, 1], dtype=np.int32),
+        'req_id': np.array([100, 101, 102, 103], dtype=np.int32),
+        'req_uni': np.array([0, 0, 1, 2], dtype=np.int32),
+        'req_course': np.array([0, 1, 0, 1], dtype=np.int32),
+        'req_utme': np.array([0, 1, 0, MISSING], dtype=np.int32),
+        'req_de': np.array([MISSING, MISSING, MISSING, MISSING], dtype=np.int32),
+        'req_subjects': np.array([0, MISSING, 0, MISSING], dtype=np.int32),
+        'uni_req_offsets': np.array([0, 2, 3, 4], dtype=np.int32)
+    }
+    strings = {
+        'state_names': ('Lagos', 'Oyo'),
+        'type_names': ('Federal University', 'Polytechnic'),
+        'type_categories': ('university', 'polytechnic'),
+        'type_institution_types': (None, None),
+        'university_names': ('Uni B', 'Uni A', 'Uni C'),
+        'university_abbrvs': ('UB', None, 'UC'),
+        'university_websites': (None, None, None),
+        'course_names': ('Law', 'Medicine'),
+        'course_codes': ('LAW', None),
+        'utme_texts': ('English and Literature', 'Biology, Chemistry and Physics'),
+        'de_texts': (),
+        'subject_texts': ('English, Literature, Government',)
+    }
+    return CatalogueSnapshot(version, arrays, strings)
+
+
+def test_views_and_csr_slices():
+    snapshot = make_snapshot()
+    university = snapshot.university(10)
+    assert university.university_name == 'Uni B'
+    assert university.state == 'Lagos' and university.programme_type == 'Federal University'
+    assert [r.course.course_name for r in university.requirements()] == ['Law', 'Medicine']
+    assert snapshot.university(30).state is None
+    assert snapshot.university(99) is None
+    assert snapshot.requirements_for(20)[0].utme_requirements == 'English and Literature'
+    assert snapshot.requirements_for(30)[0].utme_requirements is None
+
+
+def test_filters_and_aggregates():
+    snapshot = make_snapshot()
+    assert [u.university_name for u in snapshot.universities()] == ['Uni A', 'Uni B', 'Uni C']
+    assert [u.id for u in snapshot.universities(snapshot.university_mask(state='Oyo'))] == [20]
+    assert [u.id for u in snapshot.universities(snapshot.university_mask(name_contains='uni c'))] == [30]
+    assert [(c.course_name, n) for c, n in snapshot.course_institution_counts()] == [('Law', 2), ('Medicine', 2)]
+    assert [(c.course_name, n) for c, n in snapshot.course_institution_counts(programme_types=['Polytechnic'])] == [
+        ('Medicine', 1)
+    ]
+    assert snapshot.facet_counts() == ({'Lagos': 1, 'Oyo': 1}, {'Federal University': 2, 'Polytechnic': 1})
+
+
+def test_course_and_classified_filters():
+    snapshot = make_snapshot()
+    assert [u.id for u in snapshot.universities(snapshot.university_mask(course='Medicine'))] == [10, 30]
+    assert [u.id for u in snapshot.universities(snapshot.university_mask(course='Medicine', classified=True))] == [10]
+    assert [u.id for u in snapshot.universities(snapshot.university_mask(course='ALL'))] == [20, 10, 30]
+    assert not snapshot.university_mask(course='Dentistry').any()
+    assert snapshot.programme_types_by_state() == {'Lagos': [0], 'Oyo': [0]}
+
+
+def test_recommendations_are_read_from_the_snapshot(monkeypatch):
+    from app.views import university
+
+    monkeypatch.setattr(university, 'get_catalogue_snapshot', make_snapshot)
+    data = university._recommendation_data('', [''], 'Law', 1)
+    assert [(r['university_name'], r['state'], r['total_courses']) for r in data['recommendations']] == [
+        ('Uni A', 'Oyo', 1), ('Uni B', 'Lagos', 2)
+    ]
+    assert data['total_results'] == 2 and data['total_pages'] == 1 and not data['has_next']
+    assert data['state_counts'] == {'Lagos': 1, 'Oyo': 1}
+    assert data['available_program_types'] == ['Federal University', 'Polytechnic']
+    assert data['active_program_types'] == ['Federal University']
+
+    data = university._recommendation_data('Lagos', ['Federal University'], '', 1)
+    assert [r['id'] for r in data['recommendations']] == [10]
+    assert data['active_states'] == ['Lagos', 'Oyo']
+    assert university._recommendation_data('', [''], '', 2)['recommendations'] == []
+
+
+def test_published_snapshot_round_trips(tmp_path):
+    save_catalogue_snapshot(make_snapshot(1), str(tmp_path))
+    save_catalogue_snapshot(make_snapshot(2), str(tmp_path))
+    path = current_snapshot_path(str(tmp_path))
+    assert path.endswith('v2')
+    loaded = load_catalogue_snapshot(path)
+    assert loaded.version == 2
+    assert isinstance(loaded.arrays['uni_id'], np.memmap)
+    assert loaded.university(20).university_name == 'Uni A'
+    assert [(c.course_name, n) for c, n in loaded.course_institution_counts()] == [('Law', 2), ('Medicine', 2)]
+
+
+def test_published_strings_are_mapped_not_copied(tmp_path):
+    built = make_snapshot()
+    built.strings['university_websites'] = ('https://ub.edu.ng', None, 'https://ç.example')
+    save_catalogue_snapshot(built, str(tmp_path))
+    loaded = load_catalogue_snapshot(current_snapshot_path(str(tmp_path)))
+
+    for table, values in built.strings.items():
+        column = loaded.strings[table]
+        assert isinstance(column, StringColumn)
+        assert isinstance(column.data, np.memmap) and isinstance(column.offsets, np.memmap)
+        assert list(column) == list(values)
+        assert [column[i] for i in range(len(column))] == list(values)
+    assert loaded.university(30).website == 'https://ç.example'
+    assert loaded.university(20).abbrv is None
+    with pytest.raises(IndexError):
+        loaded.strings['course_names'][2]
+    assert loaded.memory_usage()['strings'] < built.memory_usage()['strings']
+
+
+def test_reference_payloads_are_read_from_the_snapshot(monkeypatch):
+    from app.utils import reference_data
+
+    monkeypatch.setattr(reference_data, 'get_catalogue_version', lambda: 1)
+    monkeypatch.setattr(reference_data, 'get_catalogue_snapshot', make_snapshot)
+    data = reference_data.ReferenceData()
+    assert json.loads(data.locations().body) == ['ALL', 'Lagos', 'Oyo']
+    assert [t['name'] for t in json.loads(data.programme_types().body)['data']] == [
+        'Federal University', 'Polytechnic'
+    ]
+    assert json.loads(data.programme_types_for_state(' lagos ').body)['data'] == [
+        {'name': 'Federal University', 'category': 'university', 'institution_type': None}
+    ]
+    assert data.programme_types_for_state('Kano') is None
+
+
+@pytest.fixture
+def catalogue_version(monkeypatch):
+    version = [1]
+    monkeypatch.setattr(module, 'get_catalogue_version', lambda: version[0])
+    return version
+
+
+@pytest.fixture
+def builds(monkeypatch, catalogue_version):
+    calls = []
+
+    def build(version=None):
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return make_snapshot(catalogue_version[0] if version is None else version)
+
+    monkeypatch.setattr(module, 'build_catalogue_snapshot', build)
+    return calls
+
+
+def test_workers_map_what_the_master_published(tmp_path, builds):
+    app = Flask(__name__)
+    app.config['CATALOGUE_SNAPSHOT_DIR'] = str(tmp_path)
+    with app.app_context():
+        SnapshotHolder().refresh()
+        assert len(builds) == 1
+        worker = SnapshotHolder()
+        assert worker.get().university(10).university_name == 'Uni B'
+        assert len(builds) == 1
+
+
+def test_only_one_worker_builds_when_nothing_is_published(tmp_path, builds):
+    app = Flask(__name__)
+    app.config['CATALOGUE_SNAPSHOT_DIR'] = str(tmp_path)
+    snapshots = []
+
+    def worker():
+        with app.app_context():
+            snapshots.append(SnapshotHolder().get())
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert len(snapshots) == 3 and all(s.version == 1 for s in snapshots)
+
+
+def test_worker_never_reads_a_snapshot_older_than_the_catalogue(tmp_path, builds, catalogue_version):
+    app = Flask(__name__)
+    app.config.update(CATALOGUE_SNAPSHOT_DIR=str(tmp_path), CATALOGUE_SNAPSHOT_CHECK_INTERVAL=60)
+    with app.app_context():
+        SnapshotHolder().refresh()
+        worker = SnapshotHolder()
+        assert worker.get().version == 1
+
+        # Another process commits a change and publishes it
+        catalogue_version[0] = 2
+        publisher = threading.Thread(target=lambda: app.app_context().push() or SnapshotHolder().refresh())
+        publisher.start()
+        time.sleep(0.05)
+        assert worker.get().version == 2
+        publisher.join()
+        assert len(builds) == 2
+
+
+def test_in_process_snapshot_is_built_on_first_read(builds):
+    app = Flask(__name__)
+    app.config['CATALOGUE_SNAPSHOT_DIR'] = None
+    holder = SnapshotHolder()
+    with app.app_context():
+        assert builds == []
+        holder.get()
+        holder.get()
+    assert len(builds) == 1
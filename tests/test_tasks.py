@@ -0,0 +1,43 @@
+from app.extensions import db
+from app.models import Comment, User
+from app.tasks import reconcile_user_score, reconcile_user_scores
+
+
+def make_user(name, score, *comment_scores):
+    user = User(username=name, email=f'{name}@example.com', password='x', score=score)
+    db.session.add(user)
+    db.session.flush()
+    for likes, dislikes in comment_scores:
+        db.session.add(Comment(content='c', user_id=user.id, likes=likes, dislikes=dislikes))
+    db.session.commit()
+    return user.id
+
+
+def score(user_id):
+    return db.session.scalar(db.select(User.score).where(User.id == user_id))
+
+
+def test_reconcile_one_user(pg_schema):
+    target = make_user('target', 0, (5, 1), (2, 0))
+    other = make_user('other', 99, (1, 0))
+    empty = make_user('empty', 3)
+
+    reconcile_user_score(target)
+    reconcile_user_score(empty)
+    db.session.expire_all()
+
+    assert score(target) == 6
+    assert score(empty) == 0
+    # Only the requested users are touched
+    assert score(other) == 99
+
+
+def test_reconcile_all_users(pg_schema):
+    first = make_user('first', 0, (3, 0))
+    second = make_user('second', 7)
+
+    reconcile_user_scores()
+    db.session.expire_all()
+
+    assert score(first) == 3
+    assert score(second) == 0
@@ -0,0 +1,59 @@
+import pytest
+from flask import Flask
+
+from app.utils import template_cache as module
+from app.utils.template_cache import DIRECT_ENTRY, UTME, RequirementTemplateCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    state = {'version': 1, 'reads': 0, 'loads': 0}
+
+    def get_version():
+        state['reads'] += 1
+        return state['version']
+
+    def load(self, version):
+        state['loads'] += 1
+        self._texts = {UTME: {1: f'English v{version}'}, DIRECT_ENTRY: {}}
+        self._parsed = {}
+        self._version = version
+
+    monkeypatch.setattr(module, 'get_catalogue_version', get_version)
+    monkeypatch.setattr(RequirementTemplateCache, '_load', load)
+    return RequirementTemplateCache(), state
+
+
+def test_version_is_checked_once_per_request(cache):
+    templates, state = cache
+    app = Flask(__name__)
+    with app.test_request_context():
+        for _ in range(100):
+            assert templates.utme_text(1) == 'English v1'
+    assert state['reads'] == 1
+    assert state['loads'] == 1
+
+    state['version'] = 2
+    with app.test_request_context():
+        assert templates.utme_text(1) == 'English v2'
+        assert templates.utme_text(1) == 'English v2'
+    assert state['reads'] == 2
+    assert state['loads'] == 2
+
+
+def test_invalidate_reloads_within_a_request(cache):
+    templates, state = cache
+    with Flask(__name__).test_request_context():
+        templates.utme_text(1)
+        templates.invalidate()
+        templates.utme_text(1)
+    assert state['loads'] == 2
+
+
+def test_outside_requests_every_call_checks(cache):
+    templates, state = cache
+    templates.utme_text(1)
+    templates.utme_text(1)
+    assert state['reads'] == 2
+    assert state['loads'] == 1
+    assert templates.utme_text(None) is None
@@ -25,6 +25,37 @@ app.wsgi_app = ProxyFix(app.wsgi_app)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 app.config['MAX_LINE_SIZE'] = 0  # Disable line length check
 
+def warm_catalogue_snapshot():
+    """Build (and, when file-backed, publish and map) the catalogue snapshot."""
+    from app.utils.snapshot import catalogue_snapshot
+    try:
+        with app.app_context():
+            try:
+                catalogue_snapshot.refresh()
+            finally:
+                # Never hand pooled connections to forked workers
+                db.session.remove()
+                db.engine.dispose()
+    except Exception as e:
+        # Requests fall back to building it lazily
+        logging.warning(f"Could not build catalogue snapshot: {str(e)}")
+
+def release_inherited_connections():
+    """Drop pooled connections a forked worker inherited from the master."""
+    from app.utils.db_pool import pool_stats
+    with app.app_context():
+        db.engine.dispose(close=False)
+    pool_stats.reset()
+
+def start_cache_warmer():
+    """Recompute the most requested results in the background after a deploy."""
+    from app.utils.cache_warm import cache_warmer
+    try:
+        with app.app_context():
+            cache_warmer.warm_in_background('deploy')
+    except Exception as e:
+        logging.warning(f"Could not start cache warming: {str(e)}")
+
 # For Gunicorn configuration, add these lines before the if __name__ == "__main__": block
 gunicorn_config = {
     'limit_request_line': 0,  # Disable request line length limit
@@ -78,10 +109,6 @@ def init_db():
             if not wait_for_db():
                 raise Exception("Could not establish database connection")
 
-            # Configure SQLAlchemy engine with keepalive settings
-            db.engine.pool_pre_ping = True
-            db.engine.pool_recycle = 3600
-            
             # Check if tables exist
             required_tables = ['user', 'university', 'course', 'comment', 'vote']
             missing_tables = []
@@ -126,19 +153,7 @@ def init_db():
 if __name__ == "__main__":
     try:
         init_db()
-        # Configure the app to handle connection drops
-        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-            'pool_pre_ping': True,
-            'pool_recycle': 3600,
-            'connect_args': {
-                'connect_timeout': 30,
-                'keepalives': 1,
-                'keepalives_idle': 30,
-                'keepalives_interval': 10,
-                'keepalives_count': 5
-            }
-        }
-        
+
         # Get port from environment or use default
         port = int(os.environ.get("PORT", 5001))
         